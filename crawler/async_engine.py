@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+异步抓取引擎 (performance.engine: 'asyncio')
+- 搜索页与详情页均以协程运行，共享同一个全局并发上限 (performance.max_concurrency)
+  以及 RequestManager 的礼貌控制器 (PolitenessController)
+- 解析逻辑复用 DomainCrawler.parse_search_page / parse_detail，本模块只替换网络层
+- 依赖 aiohttp (可选依赖，仅启用该引擎时需要)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from metrics import METRICS
+
+try:
+    import aiohttp
+except ImportError:  # 可选依赖: 仅 asyncio 引擎需要
+    aiohttp = None
+
+# 与 v5_furniture.setup_logger 使用同一个 logger 名称，共享其 handler
+logger = logging.getLogger('domain_crawler_v2')
+
+
+class AsyncCrawlEngine:
+    def __init__(self, crawler: Any, config: Dict[str, Any]):
+        if aiohttp is None:
+            raise ImportError("performance.engine='asyncio' 需要安装 aiohttp: pip install aiohttp")
+        perf = config.get('performance', {}) or {}
+        net = config.get('network', {}) or {}
+        self.crawler = crawler
+        self.concurrency = max(1, int(perf.get('max_concurrency', 100)))
+        # 与同步引擎共享礼貌控制、重试预算与熔断状态
+        self.politeness = crawler.request_manager.politeness
+        self.retry_policy = crawler.request_manager.retry_policy
+        self.circuit_breaker = crawler.request_manager.circuit_breaker
+        self.res_thresh = perf.get('results_per_page_threshold', 10)
+        self.timeout = float(net.get('timeout', 30))
+        self.headers = dict(config.get('headers', {}) or {})
+
+    def search(self, input_url: str, using_temp_urls: bool) -> int:
+        """同步入口: 与 DomainCrawler.search 相同的签名和返回值 (处理的房源链接数)"""
+        return asyncio.run(self._search(input_url, using_temp_urls))
+
+    async def _fetch(self, session: 'aiohttp.ClientSession', url: str, endpoint: str = 'detail') -> Optional[Tuple[bytes, str]]:
+        """返回 (响应字节, 编码)；失败时返回 None"""
+        rm = self.crawler.request_manager
+        if rm.replay:
+            page = rm.replay_page(url)
+            METRICS.inc('cache', endpoint=endpoint, result='archive' if page else 'archive_miss')
+            return (page.body, page.encoding) if page else None
+        host = urlparse(url).netloc
+        attempt = 0
+        cache = rm.cache
+        ttl = rm.cache_ttl.get(endpoint, 0)
+        entry = cache.lookup(url) if cache else None
+        if entry and entry.fresh:
+            METRICS.inc('cache', endpoint=endpoint, result='hit')
+            rm.archive_page(url, endpoint, entry.body, entry.content_type, entry.encoding)
+            return entry.body, entry.encoding
+        req_headers = entry.conditional_headers() if entry else None
+        while True:
+            retry_after = None
+            try:
+                while (w := self.circuit_breaker.allow(host)) > 0: await asyncio.sleep(w)
+                async with self._semaphore:
+                    wait = self.politeness.reserve(endpoint)
+                    if wait > 0: await asyncio.sleep(wait)
+                    started = time.monotonic()
+                    try:
+                        resp = await session.get(url, headers=req_headers)
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e_fetch:
+                        METRICS.observe(f'fetch.{endpoint}', time.monotonic() - started)
+                        METRICS.inc('http_errors', endpoint=endpoint, error=type(e_fetch).__name__)
+                        self.politeness.record(endpoint, None, time.monotonic() - started); raise
+                    elapsed = time.monotonic() - started
+                    METRICS.observe(f'fetch.{endpoint}', elapsed)
+                    METRICS.inc('http_responses', endpoint=endpoint, status=resp.status)
+                    self.politeness.record(endpoint, resp.status, elapsed)
+                    async with resp:
+                        if resp.status == 304 and entry:
+                            METRICS.inc('cache', endpoint=endpoint, result='revalidated')
+                            self.circuit_breaker.record_success(host)
+                            entry = cache.revalidated(entry, ttl, resp.headers.get('ETag', ''), resp.headers.get('Last-Modified', ''))
+                            rm.archive_page(url, endpoint, entry.body, entry.content_type, entry.encoding)
+                            return entry.body, entry.encoding
+                        body = await resp.read() if resp.status < 400 else b''
+                        METRICS.inc('body_bytes', len(body), endpoint=endpoint)
+                        if self.retry_policy.is_retryable(resp.status) or (resp.status < 400 and not body):
+                            self.circuit_breaker.record_failure(host)
+                            retry_after = resp.headers.get('Retry-After')
+                            raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status, message=resp.reason or '')
+                        self.circuit_breaker.record_success(host)
+                        if resp.status >= 400:
+                            logger.error(f"HTTP错误: {url}, 状态码: {resp.status}"); return None
+                        ct = resp.headers.get('content-type', '')
+                        if not ('text/html' in ct or 'application/json' in ct):
+                            logger.error(f"请求异常: {url}, 错误: 意外的响应类型: {ct}"); return None
+                        try: encoding = resp.get_encoding()
+                        except RuntimeError: encoding = 'utf-8'
+                        if cache:
+                            cache.store(url, body, ct, encoding, resp.headers.get('ETag', ''), resp.headers.get('Last-Modified', ''), ttl)
+                        rm.archive_page(url, endpoint, body, ct, encoding)
+                        return body, encoding
+            except requests.exceptions.RequestException as e:  # CircuitOpenError: 主机已被熔断器放弃
+                logger.error(f"请求被熔断器拒绝: {url}, {e}"); return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not isinstance(e, aiohttp.ClientResponseError): self.circuit_breaker.record_failure(host)
+                reason = f"状态码: {e.status}" if isinstance(e, aiohttp.ClientResponseError) else f"错误: {e!r}"
+                delay = self.retry_policy.next_delay(attempt, retry_after)
+                if delay is None:
+                    logger.error(f"请求失败，已达到最大重试次数: {url}, {reason}"); return None
+                logger.warning(f"请求失败 ({attempt+1}/{self.retry_policy.max_retries})，{delay:.1f}s后重试: {url}, {reason}")
+                METRICS.inc('retries', endpoint=endpoint)
+                await asyncio.sleep(delay); attempt += 1
+
+    async def _crawl_detail(self, session: 'aiohttp.ClientSession', detail_url: str) -> Any:
+        logger.info(f"正在抓取详情页: {detail_url}")
+        fetched = await self._fetch(session, detail_url)
+        if not fetched: return None
+        item = self.crawler.parse_detail(detail_url, *fetched)
+        self.crawler.journal_detail(detail_url, item)  # 完成即记入预写日志，不等所在页写出
+        return item
+
+    async def _search(self, input_url: str, using_temp_urls: bool) -> int:
+        # 协程原语需在事件循环内创建
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        progress_file_name = "progress_temp.json" if using_temp_urls else "progress.json"
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        page = 1
+        total_links_processed = 0
+        queued = 0
+        # 已调度的搜索页按发现顺序交给写出协程；None 表示搜索结束
+        pages: 'asyncio.Queue[Optional[Tuple[int, List[str], Dict[str, asyncio.Task], Dict[str, str], Dict[str, str]]]]' = asyncio.Queue()
+        writer = asyncio.create_task(self._drain_pages(pages))
+        start_page = self.crawler.resume_page()
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout) as session:
+            total_pages: Optional[int] = None
+            search_tasks: Dict[int, asyncio.Task] = {}
+            while True:
+                s_url = self.crawler.build_page_url(input_url, page)
+                if page not in search_tasks:
+                    logger.info(f"[asyncio] 正在抓取第{page}页: {s_url}")
+                    search_tasks[page] = asyncio.create_task(self._fetch(session, s_url, endpoint='search'))
+                fetched = await search_tasks.pop(page)
+                html_text = fetched[0].decode(fetched[1], errors='replace') if fetched else None
+                links = self.crawler.parse_search_page(s_url, html_text) if html_text else []
+                if not links:
+                    logger.info(f"第 {page} 页无房源链接或已达末页, 结束对 {input_url} 搜索.")
+                    break
+                if page == 1:
+                    # 第 1 页给出总页数时，其余搜索页立即全部调度，不再逐页试探末页
+                    total_pages = self.crawler.parse_total_pages(html_text, len(links))
+                    first = max(2, start_page)
+                    if total_pages is not None:
+                        logger.info(f"[asyncio] 共 {total_pages} 页搜索结果，剩余 {max(0, total_pages - first + 1)} 页一次性调度")
+                        for p in range(first, total_pages + 1):
+                            search_tasks[p] = asyncio.create_task(
+                                self._fetch(session, self.crawler.build_page_url(input_url, p), endpoint='search'))
+                    if start_page > 1:
+                        # 断点续跑: 第 1 页只用于读取总页数，从预写日志游标之后的页继续
+                        logger.info(f"[asyncio] 断点续跑: 前 {start_page - 1} 页已完成，从第 {start_page} 页继续")
+                        if (total_pages is not None and total_pages < first) or (total_pages is None and len(links) < self.res_thresh):
+                            break
+                        page = first
+                        continue
+                total_links_processed += len(links)
+                cards = self.crawler.parse_search_cards(html_text) if self.crawler.listing_index is not None else None
+                to_crawl, reused, fingerprints = self.crawler.plan_details(links, cards)
+                queued += len(to_crawl)
+                logger.info(f"第{page}页找到{len(links)}个房源，{len(to_crawl)}个加入异步队列 (已排队 {queued})")
+                # 详情页立即调度，与后续搜索页并发执行
+                tasks = {u: asyncio.create_task(self._crawl_detail(session, u)) for u in to_crawl}
+                pages.put_nowait((page, links, tasks, reused, fingerprints))
+                if not using_temp_urls:
+                    self.crawler.save_progress(input_url, page + 1, progress_file_name)
+                if total_pages is not None:
+                    if page >= total_pages: break
+                elif len(links) < self.res_thresh:
+                    logger.info(f"当前页房源数 ({len(links)}) < 阈值 ({self.res_thresh})，判断为最后一页.")
+                    break
+                page += 1
+            for t in search_tasks.values(): t.cancel()
+            await asyncio.gather(*search_tasks.values(), return_exceptions=True)
+            pages.put_nowait(None)
+            succ_count = await writer
+        logger.info(f"[asyncio] 搜索完成，成功处理{succ_count}/{total_links_processed}个房源")
+        return total_links_processed
+
+    async def _drain_pages(self, pages: 'asyncio.Queue') -> int:
+        """
+        按发现顺序逐页写出: 等待第 N 页的详情任务全部完成后立即写入 BatchWriter 并记录游标，后续页面的任务继续并发运行。
+        输出顺序与同步引擎一致，内存中只保留尚未写出的页面
+        """
+        succ_count = 0
+        while (entry := await pages.get()) is not None:
+            page, links, tasks, reused, fingerprints = entry
+            await asyncio.gather(*tasks.values())
+            crawled = {u: t.result() for u, t in tasks.items()}
+            succ_count += sum(1 for r in self.crawler.collect_details(links, crawled, reused, fingerprints) if r)
+            self.crawler.checkpoint_page(page)
+        return succ_count
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+合成基准语料生成器 (benchmark_suite.py synth)
+- benchmarks/fixtures/ 中默认提交的页面由本模块按固定种子生成，不是录制的真实页面：
+  地址 (Example Street / Test Parade 等)、经纪人、电话、图片均为占位内容，页面外壳的 css-xxxxxx 类名为随机值
+- 页面结构按 Domain 的搜索页/详情页构造: __NEXT_DATA__ (listingsMap / listingByIdV2 等解析器实际读取的字段)、
+  data-testid 标记的 DOM 片段，以及包裹它们的 style/header/main/footer 外壳
+- 与真实页面的差异: 详情页约 50 KB (gzip 前)，真实页面通常大数倍；外壳标记为随机生成，
+  因此整页 DOM 解析 (parse_detail_dom) 的绝对耗时偏低，只适合前后对比
+- 相同种子生成的文件逐字节相同，基线数字可在任何机器上用同一语料复现；
+  需要真实页面时用 benchmark_suite.py record 从页面归档录制 (manifest.json 的 source 标明语料来源)
+"""
+
+import gzip
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+DEFAULT_SEED = 2024
+BASE = "https://www.domain.com.au"
+SUBURBS = [("epping", "Epping", "2121"), ("ryde", "Ryde", "2112"), ("burwood", "Burwood", "2134"),
+           ("ultimo", "Ultimo", "2007"), ("kensington", "Kensington", "2033"), ("haymarket", "Haymarket", "2000")]
+STREETS = ["Example Street", "Sample Avenue", "Placeholder Road", "Test Parade", "Demo Lane", "Fixture Close"]
+WORDS = ("spacious bright modern apartment close to station shops and parks with a sunny aspect quiet street walking "
+         "distance cafes light filled living open plan kitchen timber floors built-in wardrobes secure building lift "
+         "access internal laundry gas cooking stone benchtops generous bedrooms renovated bathroom district views").split()
+# 覆盖家具/空调/特征关键词各分支的描述片段
+DESC_VARIANTS = [
+    "<p>This fully furnished apartment comes with ducted air conditioning, dishwasher and a north facing balcony.</p>",
+    "<p>Unfurnished unit featuring split system air conditioning, built-in wardrobes and secure parking.</p>",
+    "<p>Furniture optional - the owner is happy to furnish or leave unfurnished. Reverse cycle air con.</p>",
+    "<p>Studio with kitchenette, no air conditioning, ceiling fans throughout. Pets considered on application.</p>",
+    "<ul><li>Gas cooking</li><li>Ensuite to master</li><li>Swimming pool and gym in complex</li><li>Furnished</li></ul>",
+]
+FEATURES = ["Air conditioning", "Dishwasher", "Built in wardrobes", "Balcony", "Secure parking", "Intercom",
+            "Internal laundry", "Gym", "Swimming pool", "Study", "Gas", "Floorboards", "Pets allowed", "Ensuite"]
+SEARCH_PAGES = 3
+DETAIL_PAGES = 8
+LISTINGS_PER_PAGE = 20
+
+
+def _sentence(rng: random.Random, k: int) -> str:
+    return ' '.join(rng.choices(WORDS, k=k)).capitalize() + '.'
+
+
+def _description(rng: random.Random) -> str:
+    parts = [f"<p>{_sentence(rng, rng.randint(12, 30))} {_sentence(rng, rng.randint(8, 20))}</p>" for _ in range(rng.randint(2, 6))]
+    parts.insert(rng.randint(0, len(parts)), rng.choice(DESC_VARIANTS))
+    parts.append("<p><b>Inspections:</b> please register to receive updates.<br/>Contact the agent on 0400 000 000 "
+                 "or agent@example.com.</p>")
+    return ''.join(parts)
+
+
+def _chrome(rng: random.Random, n: int) -> Tuple[str, str, str, str]:
+    """页面外壳 (style / header / main / footer)，模拟真实页面包裹房源内容的大量无关标记"""
+    nav = ''.join(f'<li class="css-{rng.randrange(16**6):06x}"><a href="/{w}">{w.title()}</a></li>'
+                  for w in rng.choices(WORDS, k=40))
+    items = [f'<div class="css-{rng.randrange(16**6):06x}"><span>{_sentence(rng, rng.randint(4, 12))}</span>'
+             f'<svg viewBox="0 0 24 24"><path d="M{rng.randint(0, 24)} {rng.randint(0, 24)}L{rng.randint(0, 24)} '
+             f'{rng.randint(0, 24)}z"></path></svg></div>' for _ in range(n)]
+    style = ''.join(f'.css-{rng.randrange(16**6):06x}{{display:flex;margin:{rng.randint(0, 32)}px;color:#{rng.randrange(16**6):06x}}}'
+                    for _ in range(n))
+    return (f'<style>{style}</style>', f'<header><nav><ul>{nav}</ul></nav></header>', f'<main>{"".join(items)}</main>',
+            '<footer>' + ''.join(items[:20]) + '</footer>')
+
+
+def detail_page(rng: random.Random, idx: int, lid: str, suburb: str, postcode: str) -> str:
+    beds = rng.choice([0, 1, 1, 2, 2, 3, 4]); rent = rng.randint(380, 1600)
+    street = f"{rng.randint(1, 400)} {rng.choice(STREETS)}"
+    agency = f"Agency {rng.randint(1, 30)} Property"
+    nd = {"props": {"pageProps": {"componentProps": {
+        "rootGraphQuery": {"listingByIdV2": {
+            "listingId": lid, "headline": _sentence(rng, rng.randint(4, 9)).rstrip('.'), "description": _description(rng),
+            "propertyType": rng.choice(["Apartment / Unit / Flat", "House", "Townhouse", "Studio", ""]),
+            "agents": [{"fullName": "Agent Name", "phoneNumber": rng.choice(["0400 000 000", "", "Call"]),
+                        "email": "agent@example.com", "profileUrl": f"{BASE}/real-estate-agent/agent-{idx}",
+                        "agency": {"logoUrl": rng.choice(["", f"https://images.example.com/logo/{idx}.png"])}}],
+            "agency": {"name": agency},
+            "displayableAddress": {"suburbName": suburb, "state": "NSW", "postcode": postcode,
+                                   "geolocation": {"latitude": round(-33.7 - rng.random() / 5, 6),
+                                                   "longitude": round(151.0 + rng.random() / 5, 6)}},
+            "largeMedia": [{"url": f"https://images.example.com/{lid}/{k}.jpg", "type": "image"} for k in range(rng.randint(5, 25))],
+            "priceDetails": {"bond": rent * 4, "displayPrice": f"${rent} per week"},
+            "dateAvailableV2": {"isoDate": rng.choice(["2026-11-01T00:00:00", "2026-10-20T00:00:00", ""])},
+            "structuredFeatures": [{"name": f} for f in rng.sample(FEATURES, rng.randint(2, 8))],
+            "schools": [{"name": f"School {k}", "distance": rng.randint(100, 3000), "type": "Government",
+                         "educationLevel": "primary"} for k in range(rng.randint(4, 10))],
+            "suburbInsights": {"medianRent": rng.randint(400, 900), "renterPercentage": round(rng.random(), 3),
+                               "history": [{"year": 2015 + y, "value": rng.randint(400, 900)} for y in range(10)]},
+        }},
+        "listingSummary": {"address": f"{street}, {suburb} NSW {postcode}", "title": f"${rent} per week",
+                           "beds": beds, "baths": rng.randint(1, 3), "parking": rng.randint(0, 2)},
+        "inspectionDetails": {"inspections": [{"startTime": f"2026-10-{18 + k}T10:00", "endTime": f"2026-10-{18 + k}T10:15"}
+                                              for k in range(rng.randint(0, 3))]},
+        "similarListings": [{"id": 2019500000 + k, "address": f"{k} {rng.choice(STREETS)}", "price": f"${rng.randint(400, 900)}",
+                             "media": [f"https://images.example.com/s/{k}/{m}.jpg" for m in range(4)]} for k in range(12)],
+    }}}, "page": "/listing", "buildId": "fixture"}
+    features = ''.join(f'<li>{f}</li>' for f in rng.sample(FEATURES, rng.randint(0, 9)))
+    # 三种申请入口 (Snug 链接 / OneForm / 普通表单)，对应 DETAIL_FIELDS 中的不同选择器
+    cta = rng.choice([
+        f'<div data-testid="listing-details__agent-details-cta-box"><a href="https://app.snug.com/apply/{lid}">Apply</a></div>',
+        f'<div data-testid="listing-details__agent-details-cta-box"><form data-testid="listing-details__oneform-button-form" action="/enquiry/{lid}"></form></div>',
+        f'<div data-testid="listing-details__agent-details-cta-box"><form class="css-1x2y3z" action="/enquire/{lid}"></form></div>'])
+    phone = '<a data-testid="listing-details__phone-cta-button" href="tel:0400000000"><span>Call</span></a>'
+    insp = ''.join('<div data-testid="listing-details__inspections-block"><span data-testid="listing-details__inspections-block-day">'
+                   f'Sat {18 + k} Oct</span><span data-testid="listing-details__inspections-block-time">10:00am - 10:15am</span></div>'
+                   for k in range(rng.randint(0, 2)))
+    style, header, main, footer = _chrome(rng, rng.randint(120, 260))
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"/><title>{street}, {suburb}</title>{style}</head><body>'
+            f'{header}{main[:-7]}<div id="property-features"><ul>{features}</ul></div>'
+            f'<span class="css-1efi8gv">Apartment / Unit / Flat</span>{cta}{phone}{insp}</main>{footer}'
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(nd)}</script></body></html>')
+
+
+def _search_card(rng: random.Random, lid: str, region: str, suburb: str, postcode: str) -> Tuple[str, Dict[str, Any], str]:
+    """返回 (详情页路径, listingsMap 条目, 结果列表 <li>)"""
+    street = f"{rng.randint(1, 400)} {rng.choice(STREETS)}"
+    path = f"/{street.lower().replace(' ', '-')}-{region}-{lid}"
+    rent = rng.randint(380, 1600)
+    entry = {"id": int(lid), "listingType": "listing", "listingModel": {
+        "url": path, "price": f"${rent} per week", "promoType": "standard",
+        "images": [f"https://images.example.com/{lid}/{m}.jpg" for m in range(6)],
+        "features": {"beds": rng.randint(0, 4), "baths": rng.randint(1, 3), "parking": rng.randint(0, 2),
+                     "propertyType": "ApartmentUnitFlat", "isRural": False},
+        "address": {"street": street, "suburb": suburb.upper(), "state": "NSW", "postcode": postcode,
+                    "lat": round(-33.7 - rng.random() / 5, 6), "lng": round(151.0 + rng.random() / 5, 6)},
+        "branding": {"agencyId": rng.randint(1000, 9999), "agentNames": "Agent Name", "brandName": "Agency"}}}
+    li = (f'<li class="css-1qp9106" data-testid="listing-{lid}"><div class="css-qrqvvg"><a href="{BASE}{path}">'
+          f'<img src="https://images.example.com/{lid}/0.jpg" alt=""/></a></div><div><p data-testid="listing-card-price">'
+          f'${rent} per week</p><a class="address" href="{BASE}{path}"><h2>{street}, {suburb} NSW {postcode}</h2></a>'
+          f'<div data-testid="property-features">{rng.randint(0, 4)} Beds {rng.randint(1, 3)} Baths</div></div></li>')
+    return path, entry, li
+
+
+def generate(out: Path, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    """生成 SEARCH_PAGES 个搜索页与 DETAIL_PAGES 个详情页 (gzip) 及 manifest.json，返回 manifest"""
+    rng = random.Random(seed)
+    manifest: Dict[str, Any] = {'source': {'kind': 'synthetic', 'generator': 'benchmark_fixtures.py', 'seed': seed},
+                                'search': [], 'detail': []}
+    for kind in ('search', 'detail'):
+        (out / kind).mkdir(parents=True, exist_ok=True)
+        for old in (out / kind).glob('*.html.gz'): old.unlink()
+    details: List[Dict[str, str]] = manifest['detail']
+    for s_i, (slug, suburb, postcode) in enumerate(SUBURBS[:SEARCH_PAGES]):
+        region = f"{slug}-nsw-{postcode}"
+        ids = [str(2019400000 + s_i * 1000 + k) for k in range(LISTINGS_PER_PAGE)]
+        listings_map, items = {}, []
+        for k, lid in enumerate(ids):
+            path, listings_map[lid], li = _search_card(rng, lid, region, suburb, postcode)
+            items.append(li)
+            # 每个搜索页的前 3 个房源生成详情页
+            if len(details) < DETAIL_PAGES and k < 3:
+                name = f"detail/detail_{len(details) + 1:02d}.html.gz"
+                html = detail_page(rng, len(details) + 1, lid, suburb, postcode)
+                (out / name).write_bytes(gzip.compress(html.encode(), 9, mtime=0))
+                details.append({'file': name, 'url': f"{BASE}{path}"})
+        nd = {"props": {"pageProps": {"componentProps": {"listingSearchResultIds": [int(x) for x in ids], "listingsMap": listings_map,
+                                                         "totalListings": 57, "totalPages": 3, "currentPage": 1}}}}
+        style, header, _main, footer = _chrome(rng, 150)
+        html = (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"/><title>Rent in {suburb}</title>{style}</head><body>'
+                f'{header}<main><ul data-testid="results">{"".join(items)}</ul></main>{footer}'
+                f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(nd)}</script></body></html>')
+        name = f"search/search_{s_i + 1:02d}.html.gz"
+        (out / name).write_bytes(gzip.compress(html.encode(), 9, mtime=0))
+        manifest['search'].append({'file': name, 'url': f"{BASE}/rent/{region}/?page=1"})
+    (out / 'manifest.json').write_text(json.dumps(manifest, indent=2) + '\n', encoding='utf-8')
+    return manifest
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+FeatureExtractor 关键词匹配吞吐量基准
+对比逐个关键词扫描 (旧实现) 与 KeywordMatcher 一次扫描 (当前实现)，并校验两者结果完全一致。
+
+用法:
+    python benchmark_keywords.py                                   # 合成语料, features_config.yaml
+    python benchmark_keywords.py --features config/features_config_full.yaml
+    python benchmark_keywords.py --csv output/xxx.csv              # 使用已抓取数据的描述/特征列作为语料
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import pandas as pd
+import yaml
+
+import v5_furniture as vf
+
+Sample = Tuple[str, str, List[str], dict]  # (headline, description, feature_list, json_data)
+
+
+class LegacyFeatureExtractor(vf.FeatureExtractor):
+    """旧实现: 每个特征关键词一个正则，家具/空调关键词逐个做子串判断"""
+    def __init__(self, features_config: dict):
+        super().__init__(features_config)
+        self._feature_matcher = None
+        for feature_config in features_config.get('features', []):
+            column_name, keywords = feature_config.get('column_name'), feature_config.get('keywords', [])
+            if column_name and keywords:
+                self.compiled_patterns.setdefault(column_name, []).extend(
+                    re.compile(r'\b' + re.escape(kw) + r'\b', re.IGNORECASE) for kw in keywords)
+
+    def _get_furnishing_status(self, text: str) -> str:
+        if not text: return 'optional'
+        text_lower = text.lower()
+        if any(keyword in text_lower for keyword in self._negative_keywords): return 'unfurnished'
+        if any(keyword in text_lower for keyword in self._optional_keywords): return 'optional'
+        if any(keyword in text_lower for keyword in self._positive_keywords): return 'furnished'
+        return 'optional'
+
+    def _get_air_conditioning_type(self, text: str) -> str:
+        if not text or not self._aircon_keywords: return 'none'
+        text_lower = text.lower()
+        for key in self._aircon_keyword_order:
+            for keyword in self._aircon_keywords.get(key, ()):
+                if keyword in text_lower:
+                    return 'none' if key == 'negative_keywords' else key.replace('_keywords', '')
+        return 'none'
+
+
+def synthetic_corpus(extractor: vf.FeatureExtractor, features_config: dict, n: int, seed: int = 7) -> List[Sample]:
+    """由配置中的关键词与普通词汇随机拼出房源文本，保证各类关键词 (含大小写变化) 都会出现"""
+    rng = random.Random(seed)
+    vocab = [kw for f in features_config.get('features', []) for kw in f.get('keywords', [])]
+    vocab += sorted(extractor._positive_keywords | extractor._negative_keywords | extractor._optional_keywords)
+    vocab += sorted(kw for kws in extractor._aircon_keywords.values() for kw in kws)
+    filler = ("spacious bright modern apartment close to station shops and parks with a sunny aspect "
+              "quiet street walking distance cafes light filled living open plan kitchen timber floors").split()
+    samples = []
+    for _ in range(n):
+        words = rng.choices(filler, k=rng.randint(60, 250))
+        for _ in range(rng.randint(0, 6)):
+            kw = rng.choice(vocab)
+            words.insert(rng.randrange(len(words) + 1), kw.title() if rng.random() < 0.2 else kw)
+        description = ' '.join(words) + rng.choice(['.', '!', ''])
+        feature_list = [rng.choice(vocab) for _ in range(rng.randint(0, 5))]
+        samples.append((f"{rng.choice(filler).title()} {rng.choice(vocab)}", description, feature_list,
+                        {"structuredFeatures": [{"name": rng.choice(vocab)} for _ in range(rng.randint(0, 3))]}))
+    return samples
+
+
+def csv_corpus(path: Path) -> List[Sample]:
+    df = pd.read_csv(path)
+    samples = []
+    for _, row in df.iterrows():
+        try: feature_list = json.loads(row.get('property_features') or '[]')
+        except (TypeError, ValueError): feature_list = []
+        samples.append((str(row.get('property_headline') or ''), str(row.get('property_description') or ''), feature_list, {}))
+    return samples
+
+
+def run(extractor: vf.FeatureExtractor, corpus: List[Sample], repeat: int) -> Tuple[float, list]:
+    results = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = [extractor.extract(js, headline, desc, feats).to_dict() for headline, desc, feats, js in corpus]
+    return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FeatureExtractor 关键词匹配吞吐量基准")
+    parser.add_argument('--features', type=Path, default=vf.CONFIG_DIR / 'features_config.yaml', help="特征关键词配置文件")
+    parser.add_argument('--csv', type=Path, help="使用已抓取的 CSV 作为语料 (默认使用合成语料)")
+    parser.add_argument('-n', type=int, default=2000, help="合成语料条数")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    vf.logger.setLevel(logging.WARNING)
+
+    with open(args.features, 'r', encoding='utf-8') as f:
+        features_config = yaml.safe_load(f)
+    current = vf.FeatureExtractor(features_config)
+    legacy = LegacyFeatureExtractor(features_config)
+    corpus = csv_corpus(args.csv) if args.csv else synthetic_corpus(current, features_config, args.n)
+    avg_chars = sum(len(h) + len(d) + sum(map(len, fl)) for h, d, fl, _ in corpus) / max(len(corpus), 1)
+    print(f"语料: {len(corpus)} 条, 平均 {avg_chars:.0f} 字符; 特征关键词配置: {args.features.name}")
+
+    legacy_s, legacy_results = run(legacy, corpus, args.repeat)
+    current_s, current_results = run(current, corpus, args.repeat)
+    mismatches = sum(1 for a, b in zip(legacy_results, current_results) if a != b)
+    total = len(corpus) * args.repeat
+    print(f"逐关键词扫描 (旧): {total / legacy_s:10.0f} 条/秒  ({legacy_s / total * 1e6:.0f} µs/条)")
+    print(f"一次扫描 (当前):   {total / current_s:10.0f} 条/秒  ({current_s / total * 1e6:.0f} µs/条)")
+    print(f"加速: {legacy_s / current_s:.1f}x; 结果不一致: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
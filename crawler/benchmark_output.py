@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+输出写入基准: 对比旧的 BatchWriter.flush (逐列拼装空 DataFrame + pandas.to_excel 构建完整工作簿)
+与当前的流式写入 (按 batch_size 追加到暂存文件，finalize 时 openpyxl 只写模式逐行写出)，
+分别测量耗时和 Python 内存峰值 (tracemalloc)，并校验两者读回的数据一致；
+另外给出同一批房源以记录列表和列式批次 (ColumnBatch) 保存时的常驻内存。
+
+用法:
+    python benchmark_output.py                 # 10000 条合成房源
+    python benchmark_output.py -n 50000 --format csv
+"""
+
+import argparse
+import gc
+import logging
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pandas as pd
+
+import v5_furniture as vf
+
+
+def synthetic_listings(n: int, seed: int = 7) -> List[vf.PropertyData]:
+    """长描述、重复的中介/区域等字段，接近真实房源的数据形态"""
+    rng = random.Random(seed)
+    words = ("spacious bright modern apartment close to station shops and parks with a sunny aspect quiet street "
+             "walking distance cafes light filled living open plan kitchen timber floors built-in wardrobes").split()
+    suburbs = [('Epping', '2121'), ('Ryde', '2112'), ('Burwood', '2134'), ('Kensington', '2033'), ('Ultimo', '2007')]
+    agencies = [f"Agency {i} Real Estate" for i in range(40)]
+    items = []
+    for i in range(n):
+        suburb, postcode = rng.choice(suburbs)
+        agency = rng.choice(agencies)
+        items.append(vf.PropertyData(
+            listing_id=str(2010000000 + i), property_url=f"https://www.domain.com.au/{i}", address=f"{i} Foo St, {suburb}",
+            suburb=suburb, state='NSW', postcode=postcode, property_type='Apartment / Unit / Flat',
+            rent_pw=float(rng.randint(300, 1500)), bond=float(rng.randint(1200, 6000)),
+            bedrooms=rng.randint(0, 4), bathrooms=rng.randint(1, 3), parking_spaces=rng.randint(0, 2),
+            bedroom_display=str(rng.randint(1, 4)), available_date='Available Now',
+            inspection_times=['Sat 12 Oct 10:00am - 10:15am'] * rng.randint(0, 3),
+            agency_name=agency, agent_name=f"Agent {rng.randint(1, 200)}", cover_image=f"https://img/{i}.jpg",
+            agent_phone='02 9000 0000', property_headline=' '.join(rng.choices(words, k=8)).title(),
+            property_description=' '.join(rng.choices(words, k=rng.randint(150, 500))),
+            features=vf.PropertyFeatures(furnishing_status=rng.choice(['furnished', 'unfurnished', 'optional']),
+                                         has_balcony=rng.random() < 0.5, has_dishwasher=rng.random() < 0.5),
+            latitude=-33.7 - rng.random(), longitude=151.1 + rng.random(),
+            images='["' + '", "'.join(f"https://img/{i}_{k}.jpg" for k in range(10)) + '"]',
+            property_features='["Air conditioning", "Dishwasher", "Balcony"]',
+            agent_logo_url=f"https://img/logo/{agency.replace(' ', '_')}.png"))
+    return items
+
+
+def legacy_flush(items: List[vf.PropertyData], path: Path, output_format: str) -> None:
+    """旧实现 (BatchWriter.flush)"""
+    temp_df = pd.DataFrame([item.to_dict() for item in items])
+    df_final = pd.DataFrame(columns=vf.EXPECTED_COLUMNS)
+    for col in vf.EXPECTED_COLUMNS:
+        df_final[col] = temp_df[col] if col in temp_df.columns else ""
+    if output_format == 'csv': df_final.to_csv(path, index=False, encoding='utf-8-sig')
+    else: df_final.to_excel(path, index=False, engine='openpyxl')
+
+
+def streaming_write(items: List[vf.PropertyData], output_format: str, batch_size: int) -> str:
+    """当前实现: BatchWriter 按批追加 + OutputStream.finalize"""
+    writer = vf.BatchWriter(batch_size)
+    writer.open('bench', 'Benchmark', output_format)
+    for item in items: writer.add(item, 'bench')
+    return writer.close('bench')
+
+
+def record_memory(items: List[vf.PropertyData]) -> Tuple[float, float]:
+    """
+    常驻内存 (MB): PropertyData 记录列表 vs 同样数据的 ColumnBatch。
+    记录经 JSON 往返重建，使重复的区域/中介字符串与真实解析时一样是各自独立的对象。
+    """
+    payload = [item.to_json() for item in items]
+    gc.collect(); tracemalloc.start()
+    records = [vf.PropertyData.from_json(text) for text in payload]
+    records_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    batch = vf.ColumnBatch.from_items(records)
+    del records; gc.collect()
+    batch_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    del batch
+    return records_mb, batch_mb
+
+
+def measure(fn: Callable[[], object]) -> Tuple[float, float, object]:
+    """返回 (耗时秒, 内存峰值 MB, 返回值)；耗时与内存分两次运行测量，避免 tracemalloc 开销影响计时"""
+    gc.collect()
+    started = time.perf_counter(); fn(); elapsed = time.perf_counter() - started
+    gc.collect(); tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="输出写入 (XLSX/CSV) 耗时与内存峰值基准")
+    parser.add_argument('-n', type=int, default=10000, help="合成房源条数")
+    parser.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx')
+    parser.add_argument('--batch-size', type=int, default=vf.CONFIG.get('performance', {}).get('batch_size', 20))
+    args = parser.parse_args()
+    vf.logger.setLevel(logging.WARNING)
+
+    items = synthetic_listings(args.n)
+    with tempfile.TemporaryDirectory() as tmp:
+        vf.OUTPUT_DIR = Path(tmp)
+        legacy_path = Path(tmp) / f"legacy.{args.format}"
+        legacy_s, legacy_mb, _ = measure(lambda: legacy_flush(items, legacy_path, args.format))
+        stream_s, stream_mb, stream_path = measure(lambda: streaming_write(items, args.format, args.batch_size))
+        read = pd.read_csv if args.format == 'csv' else pd.read_excel
+        same = read(legacy_path).equals(read(stream_path))
+
+    print(f"{args.n} 条房源 -> {args.format.upper()} (batch_size={args.batch_size})")
+    print(f"旧 flush (整表 DataFrame):            {legacy_s:7.2f}s, 内存峰值 {legacy_mb:8.1f} MB")
+    print(f"流式写入 (按批暂存 + finalize):       {stream_s:7.2f}s, 内存峰值 {stream_mb:8.1f} MB")
+    print(f"加速: {legacy_s / stream_s:.1f}x; 内存峰值降低: {legacy_mb / max(stream_mb, 1e-6):.1f}x; 读回数据一致: {same}")
+    print("注: 内存峰值不含 items 本身 (两种方式共用同一批记录)")
+
+    records_mb, batch_mb = record_memory(items)
+    print(f"{args.n} 条记录常驻内存: PropertyData 列表 {records_mb:.1f} MB, ColumnBatch (列式 + 字符串驻留) {batch_mb:.1f} MB")
+    return 0 if same else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,438 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热点路径微基准套件 (基于固定的页面样本，不发任何网络请求)
+- 语料: benchmarks/fixtures/ 下 Domain 结构的搜索页与详情页 (gzip)，manifest.json 记录每个文件对应的 URL 和语料来源 (source)；
+  提交的语料是 benchmark_fixtures.py 按固定种子合成的页面 (占位地址、随机外壳标记、详情页约 50 KB，比真实页面小)，
+  可用 synth 子命令逐字节重新生成；输出写入类基准使用合成房源 (benchmark_output.synthetic_listings)，按 --rows 生成 1k/10k/100k 行
+- 每个基准报告每秒操作数 (多次重复取中位数) 与 Python 内存峰值 (tracemalloc，单独一次运行测量，不影响计时)
+- compare 子命令与保存的基线 JSON 对比，吞吐下降或内存峰值上升超过阈值即标记为回退并以退出码 1 结束，可用于 CI
+- record 子命令从页面归档 (archive.enabled 录制的 page_archive 目录) 抽取真实页面，匿名化后替换合成语料
+
+基准:
+    parse_search         搜索页提取房源链接 (DomainCrawler.parse_search_page)
+    parse_search_cards   搜索卡片数据 (DomainCrawler.parse_search_cards，增量索引使用)
+    parse_detail         详情页完整解析 (crawl_detail 去掉网络部分: DetailParser.parse_detail，快速路径)
+    parse_detail_dom     同上，关闭快速路径 (整页 DOM 解析)
+    feature_extract      FeatureExtractor.extract
+    clean_description    DataCleaner.clean_description
+    write_csv_<rows>     BatchWriter 按批写入 + finalize (旧 BatchWriter.flush 路径)，CSV
+    write_xlsx_<rows>    同上，XLSX (默认只到 10k 行)
+    canva_<rows>         canva_converter 的 process_excel_file (XLSX -> Canva CSV)；未安装 flask 时跳过
+    startup_import       新解释器进程导入 v5_furniture 的耗时 (Web UI 触发的每次运行都要付出)
+    startup_cold         导入并构建 DetailParser，关闭关键词索引缓存 (首次启动或关键词修改后)
+    startup_warm         同上，从关键词索引缓存加载
+
+用法:
+    python benchmark_suite.py run                                   # 全部基准，结果打印到终端
+    python benchmark_suite.py run --rows 1000,10000 --bench parse_detail,write_csv -o current.json
+    python benchmark_suite.py run --save-baseline                   # 写入 benchmarks/baseline.json
+    python benchmark_suite.py compare current.json                  # 与 benchmarks/baseline.json 对比
+    python benchmark_suite.py compare current.json --baseline old.json --threshold 0.15
+    python benchmark_suite.py record --archive output/page_archive --detail 8 --search 3
+    python benchmark_suite.py synth                                 # 重新生成提交的合成语料 (--seed 2024)
+"""
+
+import argparse
+import gc
+import gzip
+import json
+import logging
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import v5_furniture as vf
+from benchmark_output import synthetic_listings
+
+BENCH_DIR = Path(__file__).resolve().parent / 'benchmarks'
+FIXTURES_DIR = BENCH_DIR / 'fixtures'
+BASELINE_PATH = BENCH_DIR / 'baseline.json'
+DEFAULT_ROWS = (1000, 10000, 100000)
+XLSX_MAX_ROWS = 10000          # openpyxl 写 10 万行需要数分钟，默认不跑
+CANVA_MAX_ROWS = 10000
+SYNTHETIC_POOL = 1000          # 合成房源循环使用，避免 10 万行基准本身占用大量内存
+
+
+# =============================================================================
+# 语料
+# =============================================================================
+@dataclass
+class Fixture:
+    url: str
+    html: bytes
+
+
+def load_fixtures(kind: str, directory: Path = FIXTURES_DIR) -> List[Fixture]:
+    manifest = json.loads((directory / 'manifest.json').read_text(encoding='utf-8'))
+    return [Fixture(entry['url'], gzip.decompress((directory / entry['file']).read_bytes())) for entry in manifest.get(kind, [])]
+
+
+def cycle_listings(rows: int) -> Iterator[vf.PropertyData]:
+    pool = synthetic_listings(min(rows, SYNTHETIC_POOL))
+    for i in range(rows): yield pool[i % len(pool)]
+
+
+# =============================================================================
+# 基准定义: 每个基准返回 (一次运行的函数, 每次运行处理的单位数, 单位名称)
+# =============================================================================
+Bench = Tuple[Callable[[], Any], int, str]
+
+
+def bench_parse_search(crawler: vf.DomainCrawler) -> Bench:
+    pages = [(f.url, f.html.decode('utf-8')) for f in load_fixtures('search')]
+    def run() -> None:
+        for url, html in pages:
+            if not crawler.parse_search_page(url, html): raise RuntimeError(f"搜索页样本未解析出链接: {url}")
+    return run, len(pages), 'page'
+
+
+def bench_parse_search_cards(crawler: vf.DomainCrawler) -> Bench:
+    pages = [f.html.decode('utf-8') for f in load_fixtures('search')]
+    def run() -> None:
+        for html in pages: crawler.parse_search_cards(html)
+    return run, len(pages), 'page'
+
+
+def _bench_parse_detail(fast: bool) -> Bench:
+    parser = vf.DetailParser(fast=fast)
+    pages = load_fixtures('detail')
+    def run() -> None:
+        for f in pages:
+            if parser.parse_detail(f.url, f.html, 'utf-8') is None: raise RuntimeError(f"详情页样本解析失败: {f.url}")
+    return run, len(pages), 'page'
+
+
+def _detail_inputs() -> List[Tuple[dict, str, str, List[str]]]:
+    """从详情页样本取出 FeatureExtractor.extract 的输入 (listingByIdV2, 标题, 描述, 特征列表)"""
+    inputs = []
+    for f in load_fixtures('detail'):
+        page = vf.DetailPage(f.html, 'utf-8', fast=True)
+        root_q = page.next_data()['props']['pageProps']['componentProps']['rootGraphQuery']['listingByIdV2']
+        feature_list = vf.DETAIL_FIELDS.extract(page, {'property_features'})['property_features']
+        inputs.append((root_q, root_q.get('headline', ''), root_q.get('description', ''), feature_list))
+    return inputs
+
+
+def bench_feature_extract() -> Bench:
+    extractor = vf.FeatureExtractor(); inputs = _detail_inputs()
+    def run() -> None:
+        for root_q, headline, description, feature_list in inputs: extractor.extract(root_q, headline, description, feature_list)
+    return run, len(inputs), 'listing'
+
+
+def bench_clean_description() -> Bench:
+    descriptions = [description for _, _, description, _ in _detail_inputs()]
+    def run() -> None:
+        for text in descriptions: vf.DataCleaner.clean_description(text, preserve_format=True)
+    return run, len(descriptions), 'listing'
+
+
+def bench_write(output_format: str, rows: int, workdir: Path) -> Bench:
+    def run() -> None:
+        writer = vf.BatchWriter()
+        writer.open('bench', 'Benchmark', output_format)
+        for item in cycle_listings(rows): writer.add(item, 'bench')
+        Path(writer.close('bench')).unlink()
+    vf.OUTPUT_DIR = workdir
+    return run, rows, 'row'
+
+
+def load_canva() -> Optional[Any]:
+    """导入 canva_converter/web_generate_canva_sheet.py (导入时会创建 Flask 应用及 uploads/processed 目录)"""
+    sys.path.insert(0, str(vf.PROJECT_ROOT / 'canva_converter'))
+    try:
+        import web_generate_canva_sheet
+        return web_generate_canva_sheet
+    except ImportError as e:
+        logging.getLogger(__name__).warning(f"无法导入 canva_converter ({e})，跳过 canva 基准")
+        return None
+    finally:
+        sys.path.pop(0)
+
+
+def bench_canva(canva: Any, rows: int, workdir: Path) -> Bench:
+    # 先用 BatchWriter 生成与爬虫输出相同列的源 XLSX (不计入耗时)
+    vf.OUTPUT_DIR = workdir
+    writer = vf.BatchWriter()
+    writer.open('canva', f'CanvaSource{rows}', 'xlsx')
+    for item in cycle_listings(rows): writer.add(item, 'canva')
+    source = writer.close('canva')
+    features_map = canva.load_features_config()
+    out_dir = workdir / f'canva_{rows}'; out_dir.mkdir(exist_ok=True)
+    def run() -> None:
+        if canva.process_excel_file(source, str(out_dir), features_map) is None: raise RuntimeError("process_excel_file 失败")
+    return run, rows, 'row'
+
+
+_STARTUP_CODE = {
+    'import': "import v5_furniture",
+    'cold': "import v5_furniture as vf; vf.OUTPUT_DIR = vf.Path(sys.argv[1]); vf.CONFIG['keyword_cache'] = {'enabled': False}; vf.DetailParser()",
+    'warm': "import v5_furniture as vf; vf.OUTPUT_DIR = vf.Path(sys.argv[1]); vf.CONFIG['keyword_cache'] = {'enabled': True}; vf.DetailParser()",
+}
+
+
+def bench_startup(kind: str, workdir: Path) -> Bench:
+    """每次运行启动一个新的解释器进程 (包含解释器自身的启动时间)；缓存写在 workdir 下，首次 (预热) 运行时生成"""
+    cmd = [sys.executable, '-c', 'import sys, logging; logging.disable(logging.INFO); ' + _STARTUP_CODE[kind], str(workdir)]
+    crawler_dir = str(Path(vf.__file__).resolve().parent)
+    def run() -> None:
+        proc = subprocess.run(cmd, cwd=crawler_dir, capture_output=True, text=True)
+        if proc.returncode != 0: raise RuntimeError(f"启动基准 {kind} 失败: {proc.stderr[-500:]}")
+    return run, 1, 'start'
+
+
+def build_benches(names: Optional[List[str]], rows: List[int], workdir: Path, include_canva: bool = True) -> Dict[str, Callable[[], Bench]]:
+    """按名称 (或名称前缀，如 write_csv) 过滤；值为延迟构造函数，未选中的基准不做准备工作"""
+    crawler = vf.DomainCrawler()
+    benches: Dict[str, Callable[[], Bench]] = {
+        'parse_search': lambda: bench_parse_search(crawler),
+        'parse_search_cards': lambda: bench_parse_search_cards(crawler),
+        'parse_detail': lambda: _bench_parse_detail(True),
+        'parse_detail_dom': lambda: _bench_parse_detail(False),
+        'feature_extract': bench_feature_extract,
+        'clean_description': bench_clean_description,
+        'startup_import': lambda: bench_startup('import', workdir),
+        'startup_cold': lambda: bench_startup('cold', workdir),
+        'startup_warm': lambda: bench_startup('warm', workdir),
+    }
+    for n in rows:
+        benches[f'write_csv_{n}'] = lambda n=n: bench_write('csv', n, workdir)
+        if n <= XLSX_MAX_ROWS or (names and f'write_xlsx_{n}' in names):
+            benches[f'write_xlsx_{n}'] = lambda n=n: bench_write('xlsx', n, workdir)
+    canva = load_canva() if include_canva and (not names or any(name.startswith('canva') for name in names)) else None
+    if canva is not None:
+        for n in rows:
+            if n <= CANVA_MAX_ROWS or (names and f'canva_{n}' in names):
+                benches[f'canva_{n}'] = lambda n=n: bench_canva(canva, n, workdir)
+    if names:
+        benches = {key: fn for key, fn in benches.items() if any(key == name or key.startswith(name + '_') for name in names)}
+    return benches
+
+
+# =============================================================================
+# 测量
+# =============================================================================
+def measure(run: Callable[[], Any], units: int, repeat: int, min_time: float) -> Dict[str, Any]:
+    """
+    先预热一次并按 min_time 确定每轮内循环次数，重复 repeat 轮，按中位数和最快一轮分别计算每秒操作数
+    (compare 使用最快一轮，受机器上其他负载的干扰最小)；内存峰值在计时之外单独运行一次 (tracemalloc 会使代码变慢数倍)
+    """
+    gc.collect()
+    started = time.perf_counter(); run(); once = time.perf_counter() - started
+    inner = max(1, int(min_time / max(once, 1e-9)))
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        for _ in range(inner): run()
+        timings.append((time.perf_counter() - started) / inner)
+    timings.sort()
+    median = timings[len(timings) // 2]
+    gc.collect(); tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    run()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {'ops_per_sec': round(units / median, 3), 'best_ops_per_sec': round(units / timings[0], 3), 'median_s': round(median, 6), 'min_s': round(timings[0], 6),
+            'units': units, 'loops': inner * repeat, 'peak_mb': round(peak / 1024 / 1024, 3)}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=vf.PROJECT_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def run_suite(args: argparse.Namespace) -> int:
+    rows = [int(n) for n in args.rows.split(',') if n.strip()]
+    names = [n.strip() for n in args.bench.split(',') if n.strip()] if args.bench else None
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = vf.OUTPUT_DIR
+        try:
+            benches = build_benches(names, rows, Path(tmp), include_canva=not args.no_canva)
+            if not benches: print(f"没有匹配的基准: {args.bench}"); return 2
+            for name, factory in benches.items():
+                run, units, unit = factory()
+                res = measure(run, units, args.repeat, args.min_time)
+                res['unit'] = unit
+                results[name] = res
+                print(f"{name:22s} {res['ops_per_sec']:12.1f} {unit}/s   中位 {res['median_s'] * 1000:9.2f} ms/轮   "
+                      f"内存峰值 {res['peak_mb']:8.2f} MB", flush=True)
+        finally:
+            vf.OUTPUT_DIR = output_dir
+    report = {'meta': {'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'revision': git_revision(),
+                       'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(),
+                       'repeat': args.repeat, 'rows': rows},
+              'benchmarks': results}
+    for path in filter(None, [args.output, BASELINE_PATH if args.save_baseline else None]):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+        print(f"结果已保存: {path}")
+    return 0
+
+
+# =============================================================================
+# 对比
+# =============================================================================
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float,
+                    memory_threshold: float, memory_floor_mb: float = 1.0) -> Tuple[List[str], List[str]]:
+    """
+    返回 (报告行, 回退列表)。吞吐 (最快一轮) 低于基线 (1 - threshold) 倍，或内存峰值高于基线 (1 + memory_threshold) 倍
+    且增量超过 memory_floor_mb (避免很小的峰值因噪声误报) 时记为回退
+    """
+    lines, regressions = [], []
+    base_b, cur_b = baseline.get('benchmarks', {}), current.get('benchmarks', {})
+    lines.append(f"{'基准':20s} {'基线 ops/s':>12s} {'当前 ops/s':>12s} {'变化':>8s} {'基线 MB':>9s} {'当前 MB':>9s}")
+    for name in sorted(set(base_b) | set(cur_b)):
+        if name not in cur_b: lines.append(f"{name:22s} (当前结果中缺失)"); continue
+        if name not in base_b: lines.append(f"{name:22s} (基线中没有，新增)"); continue
+        b, c = base_b[name], cur_b[name]
+        b_ops, c_ops = b.get('best_ops_per_sec', b['ops_per_sec']), c.get('best_ops_per_sec', c['ops_per_sec'])
+        speed = c_ops / b_ops - 1 if b_ops else 0.0
+        flags = []
+        if speed < -threshold: flags.append('吞吐回退')
+        if c['peak_mb'] > b['peak_mb'] * (1 + memory_threshold) and c['peak_mb'] - b['peak_mb'] > memory_floor_mb:
+            flags.append('内存回退')
+        if flags: regressions.append(f"{name}: {', '.join(flags)}")
+        lines.append(f"{name:22s} {b_ops:12.1f} {c_ops:12.1f} {speed:+8.1%} {b['peak_mb']:9.2f} {c['peak_mb']:9.2f}"
+                     + (f"  <-- {', '.join(flags)}" if flags else ''))
+    return lines, regressions
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+    current = json.loads(Path(args.current).read_text(encoding='utf-8'))
+    b_meta, c_meta = baseline.get('meta', {}), current.get('meta', {})
+    print(f"基线: {args.baseline} ({b_meta.get('revision') or '?'}, {b_meta.get('created', '?')}, {b_meta.get('machine', '?')})")
+    print(f"当前: {args.current} ({c_meta.get('revision') or '?'}, {c_meta.get('created', '?')}, {c_meta.get('machine', '?')})")
+    if b_meta.get('platform') != c_meta.get('platform'): print("注意: 两次结果来自不同平台，吞吐对比仅供参考")
+    lines, regressions = compare_results(baseline, current, args.threshold, args.memory_threshold)
+    print('\n'.join(lines))
+    if regressions:
+        print(f"\n发现 {len(regressions)} 项回退 (吞吐阈值 {args.threshold:.0%}, 内存阈值 {args.memory_threshold:.0%}):")
+        for r in regressions: print(f"  - {r}")
+        return 1
+    print("\n未发现回退")
+    return 0
+
+
+# =============================================================================
+# 录制语料
+# =============================================================================
+_NEXT_DATA_RE = re.compile(r'(<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>)(.*?)(</script>)', re.S)
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+_PHONE_RE = re.compile(r'(?:\+?61[ -]?\(?|\(?\b0)[2-478]\)?(?:[ -]?\d){8}\b')
+_TEL_RE = re.compile(r'tel:[+\d ]+')
+_AGENT_KEYS = {'fullName': 'Agent Name', 'email': 'agent@example.com', 'phoneNumber': '0400 000 000',
+               'mobileNumber': '0400 000 000', 'agentNames': 'Agent Name'}
+_NAME_KEYS = ('fullName', 'agentNames')
+
+
+def _scrub_json(node: Any, names: Set[str]) -> Any:
+    if isinstance(node, dict):
+        for key in _NAME_KEYS:
+            if isinstance(node.get(key), str) and node[key].strip(): names.add(node[key].strip())
+        return {k: (_AGENT_KEYS[k] if k in _AGENT_KEYS and isinstance(v, str) and v else _scrub_json(v, names)) for k, v in node.items()}
+    if isinstance(node, list): return [_scrub_json(v, names) for v in node]
+    if isinstance(node, str): return _PHONE_RE.sub('0400 000 000', _EMAIL_RE.sub('agent@example.com', node))
+    return node
+
+
+def _scrub_text(text: str, names: Set[str]) -> str:
+    text = _TEL_RE.sub('tel:0400000000', _PHONE_RE.sub('0400 000 000', _EMAIL_RE.sub('agent@example.com', text)))
+    # 中介姓名: 先替换全名，再替换其中的单词 (描述中常只写名字)
+    words = {w for name in names for w in re.split(r'[\s,&]+', name) if len(w) >= 3}
+    for name in sorted(names, key=len, reverse=True) + sorted(words, key=len, reverse=True):
+        text = re.sub(r'\b' + re.escape(name) + r'\b', 'Agent', text)
+    return text
+
+
+def anonymize(html: str) -> str:
+    """去掉中介姓名、电话、邮箱 (__NEXT_DATA__ 中按字段替换，其中出现的中介姓名在整页文本中一并替换)"""
+    names: Set[str] = set()
+    def scrub_next_data(m: re.Match) -> str:
+        try: data = _scrub_json(json.loads(m.group(2)), names)
+        except ValueError: return m.group(0)
+        return m.group(1) + json.dumps(data, ensure_ascii=False) + m.group(3)
+    html = _NEXT_DATA_RE.sub(scrub_next_data, html)
+    # __NEXT_DATA__ 之外的部分 (HTML 及描述字段内的文本) 按正则替换
+    parts = _NEXT_DATA_RE.split(html)
+    for i in range(0, len(parts), 4): parts[i] = _scrub_text(parts[i], names)
+    if names:
+        for i in range(2, len(parts), 4): parts[i] = _scrub_text(parts[i], names)
+    return ''.join(parts)
+
+
+def record(args: argparse.Namespace) -> int:
+    from page_archive import PageArchive
+    archive = PageArchive(Path(args.archive))
+    out = Path(args.output)
+    manifest: Dict[str, Any] = {'source': {'kind': 'recorded', 'anonymized': True}, 'search': [], 'detail': []}
+    try:
+        for kind, limit in (('search', args.search), ('detail', args.detail)):
+            (out / kind).mkdir(parents=True, exist_ok=True)
+            for old in (out / kind).glob('*.html.gz'): old.unlink()
+            for page in archive.iter_pages(kind):
+                if len(manifest[kind]) >= limit: break
+                html = anonymize(page.body.decode(page.encoding or 'utf-8', errors='replace'))
+                name = f"{kind}/{kind}_{len(manifest[kind]) + 1:02d}.html.gz"
+                (out / name).write_bytes(gzip.compress(html.encode('utf-8'), 9, mtime=0))
+                manifest[kind].append({'file': name, 'url': page.url})
+    finally:
+        archive.close()
+    (out / 'manifest.json').write_text(json.dumps(manifest, indent=2) + '\n', encoding='utf-8')
+    print(f"已录制 {len(manifest['search'])} 个搜索页、{len(manifest['detail'])} 个详情页到 {out}；提交前请人工检查是否仍有个人信息")
+    print("语料变化后旧基线不再可比，请重新运行 run --save-baseline")
+    return 0
+
+
+def synth(args: argparse.Namespace) -> int:
+    from benchmark_fixtures import generate
+    manifest = generate(Path(args.output), args.seed)
+    print(f"已生成 {len(manifest['search'])} 个搜索页、{len(manifest['detail'])} 个详情页到 {args.output} (合成，种子 {args.seed})")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="热点路径微基准 (固定页面样本 + 合成输出)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_run = sub.add_parser('run', help="运行基准")
+    p_run.add_argument('--rows', default=','.join(map(str, DEFAULT_ROWS)), help="输出写入类基准的行数 (逗号分隔)")
+    p_run.add_argument('--bench', help="只运行这些基准 (逗号分隔，可用前缀，如 write_csv,parse_detail)")
+    p_run.add_argument('--repeat', type=int, default=5, help="重复轮数 (取中位数)")
+    p_run.add_argument('--min-time', type=float, default=0.2, help="每轮最短耗时 (秒)，快的基准在一轮内循环多次")
+    p_run.add_argument('--no-canva', action='store_true', help="跳过 canva_converter 基准")
+    p_run.add_argument('-o', '--output', help="结果 JSON 路径")
+    p_run.add_argument('--save-baseline', action='store_true', help=f"同时保存为基线 ({BASELINE_PATH.relative_to(vf.PROJECT_ROOT)})")
+    p_cmp = sub.add_parser('compare', help="与基线对比，发现回退时退出码为 1")
+    p_cmp.add_argument('current', help="run -o 保存的结果 JSON")
+    p_cmp.add_argument('--baseline', default=str(BASELINE_PATH))
+    p_cmp.add_argument('--threshold', type=float, default=0.10, help="吞吐下降超过该比例视为回退")
+    p_cmp.add_argument('--memory-threshold', type=float, default=0.20, help="内存峰值上升超过该比例视为回退")
+    p_rec = sub.add_parser('record', help="从页面归档录制匿名化语料")
+    p_rec.add_argument('--archive', required=True, help="页面归档目录 (archive.dir)")
+    p_rec.add_argument('--search', type=int, default=3, help="搜索页数量")
+    p_rec.add_argument('--detail', type=int, default=8, help="详情页数量")
+    p_rec.add_argument('--output', default=str(FIXTURES_DIR))
+    p_syn = sub.add_parser('synth', help="重新生成合成语料 (benchmark_fixtures.py，相同种子逐字节相同)")
+    p_syn.add_argument('--seed', type=int, default=2024)
+    p_syn.add_argument('--output', default=str(FIXTURES_DIR))
+    args = parser.parse_args()
+    vf.logger.setLevel(logging.WARNING)
+    return {'run': run_suite, 'compare': compare, 'record': record, 'synth': synth}[args.command](args)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
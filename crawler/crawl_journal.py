@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+房源级预写日志 (journal.enabled)，用于崩溃后断点续跑
+- 追加写入的 JSON Lines 文件: 首行为本次运行的 URL 列表，其后每条记录一个已完成的房源 (所属 URL + 完整记录)
+  或一个搜索页游标 (该页房源已全部写出)，每个 URL 处理完毕再写一条完成标记
+- 进程崩溃后重新运行 (URL 列表不变) 时: 已记录的房源从日志重建到输出文件，不再请求；
+  已完成的 URL 整体跳过，未完成的 URL 从游标之后的搜索页继续
+- 崩溃时写了一半的末行在加载时截掉；游标记录后 fsync (fsync: 'item' 时每条房源都 fsync)
+- 运行正常结束时压缩: 丢弃房源记录，只保留 URL 列表、各 URL 的游标和完成标记
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger('domain_crawler_v2')
+
+
+class CrawlJournal:
+    def __init__(self, path: Path, fsync: str = 'page'):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self.urls: List[str] = []
+        self.completed_run = False
+        self.links: Set[str] = set()            # 日志中已有记录的房源
+        self.cursors: Dict[str, int] = {}       # lane -> 已写出的最后一页
+        self.done: Set[str] = set()             # 已处理完毕的 lane
+        self.stats = {'recovered': 0, 'replayed': 0, 'appended': 0}
+
+    # --- 加载 / 开始 ---
+    def _load(self) -> None:
+        """读取已有日志；末尾不完整的行 (崩溃时写了一半) 被截掉"""
+        good_end = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    break
+                if not raw.endswith(b'\n'): break
+                good_end += len(raw)
+                if 'run' in rec:
+                    self.urls = rec['run'].get('urls', []); self.completed_run = rec['run'].get('completed', False)
+                elif 'item' in rec:
+                    self.links.add(rec['link']); self.stats['recovered'] += 1
+                elif 'page' in rec:
+                    self.cursors[rec['lane']] = max(self.cursors.get(rec['lane'], 0), rec['page'])
+                elif 'done' in rec:
+                    self.done.add(rec['lane'])
+        if good_end < self.path.stat().st_size:
+            logger.warning(f"预写日志末尾有不完整的记录 (崩溃时写入中断)，已截掉: {self.path}")
+            with open(self.path, 'r+b') as f: f.truncate(good_end)
+
+    def _reset(self) -> None:
+        self.urls = []; self.completed_run = False
+        self.links.clear(); self.cursors.clear(); self.done.clear()
+        self.stats['recovered'] = 0
+
+    def begin(self, urls: List[str]) -> bool:
+        """开始一次运行；上次运行未完成且 URL 列表相同时返回 True (断点续跑)，否则清空日志重新开始"""
+        resume = False
+        if self.path.exists():
+            try:
+                self._load()
+                resume = self.urls == list(urls) and not self.completed_run
+                if not resume and not self.completed_run:
+                    logger.warning(f"预写日志对应的URL列表与本次不同，丢弃上次未完成的进度: {self.path}")
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"读取预写日志失败，将重新开始: {self.path}, {e}")
+        if resume:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            logger.info(f"从预写日志断点续跑: 已完成房源 {len(self.links)}, 已完成URL {len(self.done)}/{len(self.urls)}")
+        else:
+            self._reset()
+            self.urls = list(urls)
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._append({'run': {'urls': self.urls, 'started': time.strftime('%Y-%m-%d %H:%M:%S')}}, sync=True)
+        return resume
+
+    # --- 追加 ---
+    def _append(self, rec: Dict[str, Any], sync: bool = False) -> None:
+        line = json.dumps(rec, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None: return
+            self._file.write(line); self._file.flush()
+            if sync: os.fsync(self._file.fileno())
+
+    def record_item(self, lane: Optional[str], link: str, record_json: str) -> None:
+        """房源详情页已完成 (record_json: PropertyData.to_json())；各引擎在每个房源完成时调用，不等所在搜索页写出"""
+        self._append({'lane': lane or '', 'link': link, 'item': record_json}, sync=self.fsync == 'item')
+        with self._lock:
+            self.links.add(link); self.stats['appended'] += 1
+
+    def record_page(self, lane: Optional[str], page: int) -> None:
+        """该搜索页的房源已全部写出"""
+        self._append({'lane': lane or '', 'page': page}, sync=self.fsync != 'off')
+        with self._lock:
+            lane = lane or ''
+            self.cursors[lane] = max(self.cursors.get(lane, 0), page)
+
+    def record_done(self, lane: Optional[str]) -> None:
+        self._append({'lane': lane or '', 'done': True}, sync=self.fsync != 'off')
+        with self._lock: self.done.add(lane or '')
+
+    # --- 查询 / 重放 ---
+    def has(self, link: str) -> bool:
+        with self._lock: return link in self.links
+
+    def cursor(self, lane: Optional[str]) -> int:
+        with self._lock: return self.cursors.get(lane or '', 0)
+
+    def is_done(self, lane: Optional[str]) -> bool:
+        with self._lock: return (lane or '') in self.done
+
+    def replay(self, lane: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        """按写入顺序产出 (link, record_json)；lane 为 None 时产出全部"""
+        with self._lock:
+            if self._file is not None: self._file.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                rec = json.loads(line)
+                if 'item' in rec and (lane is None or rec['lane'] == lane):
+                    if lane is not None: self.stats['replayed'] += 1
+                    yield rec['link'], rec['item']
+
+    # --- 结束 ---
+    def compact(self) -> None:
+        """运行正常结束: 改写为只含 URL 列表、游标和完成标记的小文件 (临时文件 + 原子替换)"""
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with self._lock:
+            if self._file is not None: self._file.close(); self._file = None
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'run': {'urls': self.urls, 'completed': True, 'listings': len(self.links),
+                                            'finished': time.strftime('%Y-%m-%d %H:%M:%S')}}, ensure_ascii=False) + '\n')
+                for lane, page in self.cursors.items(): f.write(json.dumps({'lane': lane, 'page': page}) + '\n')
+                for lane in sorted(self.done): f.write(json.dumps({'lane': lane, 'done': True}) + '\n')
+                f.flush(); os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self.completed_run = True
+
+    def close(self) -> None:
+        """异常退出时只关闭文件，保留完整日志供下次续跑"""
+        with self._lock:
+            if self._file is not None: self._file.close(); self._file = None
+
+    def summary(self) -> str:
+        st = self.stats
+        return f"续跑恢复房源 {st['recovered']} (已重建到输出 {st['replayed']}), 新记录 {st['appended']}, 已完成URL {len(self.done)}/{len(self.urls)}"
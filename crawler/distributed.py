@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多节点抓取 (distributed.enabled)
+- 协调进程 (正常运行 v5_furniture.py) 为每个搜索 URL 放入第 1 页搜索任务，启动 distributed.local_workers 个本机
+  worker 进程，自身也作为一个 worker 参与抓取，直到队列中没有待处理/处理中的任务
+- 其他节点运行 `python v5_furniture.py --worker` (queue_file 指向同一共享队列文件) 即可加入
+- 搜索任务: 抓取一页搜索结果，详情页入队；第 1 页读到总页数时其余搜索页一次性入队，否则逐页串联
+- 详情任务: 抓取并解析详情页，记录 JSON 存回队列
+- 协调进程在队列完成后按 URL、页码、页内顺序把结果合并到常规 BatchWriter 输出 (单 URL 文件 / 合并文件)
+- 协调进程中途退出后以相同 URL 列表重新运行，会接着处理队列中剩余的任务
+- 每个 worker 进程有各自的 politeness 令牌桶: 协调进程把参与的进程总数 (distributed.processes，为 0 时为本机
+  1 + local_workers) 写入队列，各进程领取第一个任务前把 search_rps / detail_rps 按该数平分，总请求速率与单机相同
+"""
+
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from seen_set import listing_key
+from work_queue import QueueTask, WorkQueue
+
+# 与 v5_furniture.setup_logger 使用同一个 logger 名称，共享其 handler
+logger = logging.getLogger('domain_crawler_v2')
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class QueueWorker:
+    def __init__(self, crawler: Any, config: Dict[str, Any], queue: WorkQueue, worker_id: Optional[str] = None):
+        dist = config.get('distributed', {}) or {}
+        perf = config.get('performance', {}) or {}
+        self.crawler = crawler; self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = float(dist.get('lease_seconds', 120))
+        self.heartbeat_interval = float(dist.get('heartbeat_interval', 30))
+        self.poll_interval = float(dist.get('poll_interval', 1.0))
+        self.idle_timeout = float(dist.get('worker_idle_timeout', 300))
+        self.threads = max(1, int(perf.get('max_workers', 4) or 1))
+        self.res_thresh = perf.get('results_per_page_threshold', 10)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._rate_share: Optional[int] = None
+        self.stats = {'search': 0, 'detail': 0, 'failed': 0, 'lost_lease': 0}
+
+    # --- 任务处理 ---
+    def _handle_search(self, task: QueueTask) -> bool:
+        crawler = self.crawler
+        html_text, links, _cards = crawler.load_search_page(crawler.build_page_url(task.url, task.page))
+        if html_text is None: return False
+        if links:
+            logger.info(f"[worker {self.worker_id}] URL{task.lane} 第{task.page}页找到{len(links)}个房源")
+            self.queue.add_many('detail', [(self._detail_key(task.lane, link), link, task.lane, task.page, seq, False)
+                                           for seq, link in enumerate(links)])
+            total_pages = crawler.parse_total_pages(html_text, len(links)) if task.page == 1 else None
+            if total_pages is not None:
+                for page in range(2, total_pages + 1): self.queue.add_search(task.url, task.lane, page)
+            elif (task.page == 1 or task.chain) and len(links) >= self.res_thresh:
+                # 没有总页数: 与单机模式一样逐页试探，本页满阈值才放入下一页
+                self.queue.add_search(task.url, task.lane, task.page + 1, chain=True)
+        return self._complete(task, None)
+
+    def _detail_key(self, lane: int, link: str) -> str:
+        """详情任务去重键: 启用 dedupe 时跨 URL 去重 (与单机一致)；关闭时按 URL 区分，每个 URL 的文件都包含重叠房源"""
+        key = listing_key(link)
+        return key if self.crawler.seen is not None else f"{lane}:{key}"
+
+    def _handle_detail(self, task: QueueTask) -> bool:
+        fetched = self.crawler.fetch_detail(task.url)
+        if not fetched: return False
+        item = self.crawler.parse_detail(task.url, *fetched)
+        if item is None: return False
+        return self._complete(task, item.to_json())
+
+    def _complete(self, task: QueueTask, result: Optional[str]) -> bool:
+        if not self.queue.complete(task, self.worker_id, result):
+            logger.warning(f"[worker {self.worker_id}] 任务租约已过期并被其他 worker 领取，结果丢弃: {task.url}")
+            with self._lock: self.stats['lost_lease'] += 1
+        return True
+
+    def _apply_rate_share(self) -> None:
+        """首次领到任务时 (运行已开始，协调进程已写入进程总数) 按进程总数平分本进程的请求速率"""
+        with self._lock:
+            if self._rate_share is not None: return
+            self._rate_share = self.queue.rate_share()
+            politeness = self.crawler.request_manager.politeness
+            politeness.split(self._rate_share)
+        if self._rate_share > 1:
+            logger.info(f"[worker {self.worker_id}] {self._rate_share} 个进程共同抓取，本进程速率: {politeness.summary()}")
+
+    # --- 循环 ---
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            try: self.queue.heartbeat(self.worker_id, self.lease_seconds)
+            except Exception as e: logger.error(f"[worker {self.worker_id}] 续约失败: {e}")
+
+    def _work_loop(self) -> None:
+        idle_since = None
+        while not self._stop.is_set():
+            task = self.queue.claim(self.worker_id, self.lease_seconds)
+            if task is None:
+                # 运行进行中且队列完成 -> 退出；尚无运行 (worker 先于协调进程启动) 时等待最多 idle_timeout
+                if self.queue.state() == 'running' and self.queue.drained(): return
+                idle_since = idle_since or time.monotonic()
+                if self.queue.state() != 'running' and time.monotonic() - idle_since > self.idle_timeout: return
+                time.sleep(self.poll_interval); continue
+            idle_since = None
+            self._apply_rate_share()
+            try:
+                ok = self._handle_search(task) if task.kind == 'search' else self._handle_detail(task)
+            except Exception as e:
+                logger.error(f"[worker {self.worker_id}] 处理任务失败: {task.url}, {e}", exc_info=True); ok = False
+            with self._lock: self.stats[task.kind if ok else 'failed'] += 1
+            if not ok:
+                self.crawler.request_manager.politeness.backoff('search' if task.kind == 'search' else 'detail')
+                self.queue.fail(task, self.worker_id)
+
+    def run(self) -> Dict[str, int]:
+        """处理任务直到队列完成，返回本 worker 的处理统计"""
+        logger.info(f"[worker {self.worker_id}] 启动 {self.threads} 个线程，队列: {self.queue.path}")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name='heartbeat', daemon=True)
+        heartbeat.start()
+        threads = [threading.Thread(target=self._work_loop, name=f'queue-{i}', daemon=True) for i in range(self.threads)]
+        try:
+            for t in threads: t.start()
+            for t in threads: t.join()
+        finally:
+            self._stop.set(); heartbeat.join()
+        st = self.stats
+        logger.info(f"[worker {self.worker_id}] 结束: 搜索页 {st['search']}, 详情页 {st['detail']}, 失败 {st['failed']}, 租约丢失 {st['lost_lease']}")
+        return st
+
+
+class DistributedEngine:
+    def __init__(self, crawler: Any, config: Dict[str, Any], queue_path: Path, spawn_cmd: Optional[List[str]] = None):
+        """spawn_cmd: 启动本机 worker 进程的命令 (不含 --worker-id)"""
+        dist = config.get('distributed', {}) or {}
+        self.crawler = crawler; self.config = config
+        self.queue = WorkQueue(queue_path, max_attempts=int(dist.get('max_attempts', 3)))
+        self.local_workers = int(dist.get('local_workers', 0)) if spawn_cmd else 0
+        self.spawn_cmd = spawn_cmd or []
+        # 共同抓取的进程总数 (含其他节点的 worker)；未配置时只计本机的协调进程和 worker 进程
+        self.processes = max(1, int(dist.get('processes', 0) or 0) or 1 + self.local_workers)
+
+    def crawl(self, urls: List[str]) -> None:
+        """放入搜索任务并参与抓取，直到所有节点处理完队列"""
+        if self.queue.begin(urls, rate_share=self.processes):
+            logger.info(f"[distributed] 继续上次未完成的队列: {self.queue.summary()}")
+        procs = []
+        for i in range(self.local_workers):
+            procs.append(subprocess.Popen(self.spawn_cmd + ['--worker-id', f"{default_worker_id()}-w{i + 1}"]))
+        logger.info(f"[distributed] 队列 {self.queue.path}，本机 worker 进程 {len(procs)} 个 + 协调进程，"
+                    f"请求速率按 {self.processes} 个进程平分")
+        try:
+            QueueWorker(self.crawler, self.config, self.queue, f"{default_worker_id()}-coordinator").run()
+        finally:
+            for proc in procs:
+                if proc.wait() != 0: logger.warning(f"[distributed] worker 进程 {proc.pid} 退出码 {proc.returncode}")
+        logger.info(f"[distributed] 队列处理完成: {self.queue.summary()}")
+
+    def results(self, lane: int) -> Iterator[str]:
+        return self.queue.results(lane)
+
+    def finish(self) -> None:
+        """输出已合并: 标记本次运行完成 (下次运行重新开始)"""
+        self.queue.finish(); self.queue.close()
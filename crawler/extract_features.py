@@ -1,3 +1,5 @@
+import os
+
 import pandas as pd
 import yaml
 import ast
@@ -30,7 +32,11 @@ def extract_and_update_features(csv_path, yaml_path, feature_column_name='featur
     """Extracts features from CSV, finds new ones, and updates the YAML config."""
     print(f"Loading data from: {csv_path}")
     try:
-        df = pd.read_csv(csv_path)
+        if str(csv_path).endswith('.parquet') or os.path.isdir(csv_path):
+            # Parquet output (file or partitioned dataset directory): only load the feature column
+            df = pd.read_parquet(csv_path, columns=[feature_column_name])
+        else:
+            df = pd.read_csv(csv_path)
     except FileNotFoundError:
         print(f"Error: The file was not found at {csv_path}")
         return
@@ -100,7 +106,7 @@ def extract_and_update_features(csv_path, yaml_path, feature_column_name='featur
 
 if __name__ == '__main__':
     # --- CONFIGURATION ---
-    # 1. Path to your CSV data file
+    # 1. Path to your CSV data file (or a Parquet file / dataset directory, e.g. output/parquet/Combined)
     CSV_FILE_PATH = r'C:\Users\nuoai\Downloads\20250729_234048_Combined_2274properties - 工作表1.csv'
     
     # 2. Path to your features configuration file
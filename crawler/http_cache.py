@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+持久化 HTTP 缓存 (cache.enabled)
+- 以 URL 为键，响应体 zlib 压缩后与 ETag / Last-Modified 一起存入 SQLite
+- 新鲜条目 (未过 TTL) 直接命中，不发请求；过期条目用 If-None-Match / If-Modified-Since 重新验证，
+  304 时复用本地响应体，省去传输
+- 总大小超过上限时按最近访问时间 (LRU) 淘汰
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger('domain_crawler_v2')
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: bytes
+    content_type: str
+    encoding: str
+    etag: str
+    last_modified: str
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag: headers['If-None-Match'] = self.etag
+        if self.last_modified: headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    def __init__(self, path: Path, max_size_mb: float = 512, compress_level: int = 6):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY, body BLOB NOT NULL, content_type TEXT, encoding TEXT,
+            etag TEXT, last_modified TEXT, fetched_at REAL, expires_at REAL, last_access REAL, size INTEGER)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.stats = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bytes_saved': 0}
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute("SELECT body, content_type, encoding, etag, last_modified, expires_at FROM responses WHERE url=?",
+                                     (url,)).fetchone()
+            if not row:
+                self.stats['misses'] += 1; return None
+            self._conn.execute("UPDATE responses SET last_access=? WHERE url=?", (time.time(), url))
+        body = zlib.decompress(row[0])
+        entry = CacheEntry(url, body, row[1] or '', row[2] or '', row[3] or '', row[4] or '', row[5] or 0.0)
+        if entry.fresh:
+            with self._lock:
+                self.stats['fresh_hits'] += 1; self.stats['bytes_saved'] += len(body)
+        return entry
+
+    def store(self, url: str, body: bytes, content_type: str, encoding: str, etag: str, last_modified: str, ttl: float) -> None:
+        blob = zlib.compress(body, self.compress_level)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE url=?", (url,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?,?,?,?,?,?,?,?,?,?)",
+                               (url, blob, content_type, encoding, etag, last_modified, now, now + ttl, now, len(blob)))
+            self._total_bytes += len(blob) - (old[0] if old else 0)
+            self.stats['stores'] += 1
+            if self._total_bytes > self.max_bytes: self._evict()
+
+    def revalidated(self, entry: CacheEntry, ttl: float, etag: str = '', last_modified: str = '') -> CacheEntry:
+        """收到 304: 延长有效期并沿用本地响应体"""
+        entry.expires_at = time.time() + ttl
+        entry.etag = etag or entry.etag; entry.last_modified = last_modified or entry.last_modified
+        with self._lock:
+            self._conn.execute("UPDATE responses SET expires_at=?, etag=?, last_modified=?, last_access=? WHERE url=?",
+                               (entry.expires_at, entry.etag, entry.last_modified, time.time(), entry.url))
+            self.stats['revalidated'] += 1; self.stats['bytes_saved'] += len(entry.body)
+        return entry
+
+    def _evict(self) -> None:
+        # 淘汰到上限的 90%，避免每次写入都触发
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY last_access ASC").fetchall()
+        victims = []
+        for url, size in rows:
+            if self._total_bytes <= target: break
+            victims.append((url,)); self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE url=?", victims)
+        self.stats['evictions'] += len(victims)
+
+    def close(self) -> None:
+        with self._lock: self._conn.close()
+
+    def summary(self) -> str:
+        st = self.stats
+        return (f"新鲜命中 {st['fresh_hits']}, 304重新验证 {st['revalidated']}, 未命中 {st['misses']}, 写入 {st['stores']}, "
+                f"淘汰 {st['evictions']}, 节省流量 {st['bytes_saved'] / 1024 / 1024:.1f} MB, 缓存大小 {self._total_bytes / 1024 / 1024:.1f} MB")
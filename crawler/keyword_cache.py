@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+关键词索引缓存 (FeatureExtractor 启动加速)
+- 缓存键为各源文件 (关键词 YAML 以及构建索引的代码) 内容的 sha256，任一文件变化即自动失效并重建
+- 索引 (已构建的 KeywordMatcher 与关键词集合) 以 pickle 保存，先写临时文件再原子替换；写入新键时删除旧键的缓存文件
+- 热启动跳过 YAML 解析与 trie 正则/前缀闭包的构建；re 的编译结果无法持久化，
+  反序列化时会重新编译已生成好的表达式 (与 re.compile 相同，约为冷启动构建耗时的一小部分)
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger('domain_crawler_v2')
+
+FORMAT_VERSION = 1
+_PREFIX = 'keyword_index_'
+
+
+def source_digest(paths: Iterable[Path]) -> str:
+    """按文件名与内容计算缓存键；不存在的文件同样参与 (之后创建该文件也会使缓存失效)"""
+    h = hashlib.sha256(f"{FORMAT_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}".encode())
+    for path in paths:
+        h.update(Path(path).name.encode('utf-8') + b'\0')
+        try:
+            h.update(Path(path).read_bytes())
+        except OSError:
+            h.update(b'\0missing')
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+class KeywordIndexCache:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def path_for(self, digest: str) -> Path:
+        return self.directory / f"{_PREFIX}{digest[:32]}.pickle"
+
+    def load(self, digest: str) -> Optional[Dict[str, Any]]:
+        """返回缓存的索引；不存在、损坏或键不一致时返回 None (调用方重新构建)"""
+        path = self.path_for(digest)
+        try:
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"关键词索引缓存无法读取，重新构建: {path} ({e})")
+            return None
+        if not isinstance(payload, dict) or payload.get('digest') != digest:
+            return None
+        return payload.get('state')
+
+    def store(self, digest: str, state: Dict[str, Any]) -> Optional[Path]:
+        """写入失败只记录警告 (缓存只影响启动速度)"""
+        path = self.path_for(digest)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                pickle.dump({'digest': digest, 'state': state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"写入关键词索引缓存失败: {path} ({e})")
+            try: tmp.unlink()
+            except OSError: pass
+            return None
+        for stale in self.directory.glob(f"{_PREFIX}*.pickle"):
+            if stale != path:
+                try: stale.unlink()
+                except OSError: pass
+        return path
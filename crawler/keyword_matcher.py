@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多关键词一次扫描匹配 (FeatureExtractor 使用)
+- 所有关键词按公共前缀合并为一个 trie 正则，文本只扫描一遍即可得到全部命中的关键词
+- 每个起始位置取最长命中，再由预先计算的"前缀闭包"补全同一位置上更短的关键词，
+  因此结果与逐个关键词搜索完全一致
+- word_boundary=True 等价于逐个 re.search(r'\\b关键词\\b')；否则等价于子串判断 (keyword in text)
+"""
+
+import re
+from typing import Dict, FrozenSet, Hashable, Iterable, Mapping, Optional, Set
+
+_TERMINAL = ''
+
+
+def _is_word(ch: str) -> bool:
+    # 与 re 的 \w (Unicode) 一致
+    return ch.isalnum() or ch == '_'
+
+
+def _trie_regex(node: dict) -> str:
+    alts = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch != _TERMINAL]
+    if not alts: return ''
+    body = alts[0] if len(alts) == 1 else '(?:' + '|'.join(alts) + ')'
+    # 贪婪的 ? 保证同一位置优先匹配更长的关键词
+    return f'(?:{body})?' if _TERMINAL in node else body
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Mapping[Hashable, Iterable[str]], word_boundary: bool = False, ignore_case: bool = False):
+        """keywords: 标签 -> 关键词列表；labels(text) 返回文本中命中了关键词的标签集合"""
+        self.word_boundary = word_boundary
+        self.ignore_case = ignore_case
+        kw_labels: Dict[str, Set[Hashable]] = {}
+        for label, words in keywords.items():
+            for kw in words:
+                if not kw: continue
+                kw_labels.setdefault(kw.lower() if ignore_case else kw, set()).add(label)
+        self.keyword_count = len(kw_labels)
+
+        trie: dict = {}
+        for kw in kw_labels:
+            node = trie
+            for ch in kw: node = node.setdefault(ch, {})
+            node[_TERMINAL] = True
+
+        # 前缀闭包: 某位置最长命中为 L 时，同一位置上同样成立的更短关键词就是 L 中 (满足词边界的) 关键词前缀
+        self._closure: Dict[str, FrozenSet[Hashable]] = {}
+        for kw in kw_labels:
+            labels: Set[Hashable] = set()
+            for end in range(1, len(kw) + 1):
+                prefix = kw[:end]
+                if prefix not in kw_labels: continue
+                if word_boundary and end < len(kw) and _is_word(kw[end - 1]) == _is_word(kw[end]): continue
+                labels |= kw_labels[prefix]
+            self._closure[kw] = frozenset(labels)
+
+        self._pattern: Optional['re.Pattern[str]'] = None
+        if kw_labels:
+            body = _trie_regex(trie)
+            expr = rf'\b(?=({body})\b)' if word_boundary else f'(?=({body}))'
+            self._pattern = re.compile(expr, re.IGNORECASE if ignore_case else 0)
+
+    def labels(self, text: str) -> Set[Hashable]:
+        found: Set[Hashable] = set()
+        if not text or self._pattern is None: return found
+        seen: Set[str] = set()
+        for m in self._pattern.finditer(text):
+            hit = m.group(1)
+            if hit in seen: continue
+            seen.add(hit)
+            found |= self._closure.get(hit.lower() if self.ignore_case else hit, frozenset())
+        return found
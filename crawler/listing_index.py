@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+持久化房源索引 (index.enabled)，用于增量抓取
+- 以 property_url 为主键，记录 listing_id、搜索卡片指纹 (价格/卧室/标题等)、上次抓取时间和上次的完整记录
+- 搜索页卡片指纹未变且记录未超过 max_age 的房源直接复用旧记录，不再请求详情页
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('domain_crawler_v2')
+
+# 参与指纹计算的搜索卡片字段
+FINGERPRINT_FIELDS = ('price', 'beds', 'baths', 'parking', 'headline', 'property_type')
+
+
+class ListingIndex:
+    def __init__(self, path: Path, max_age_days: float = 7):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS listings (
+            property_url TEXT PRIMARY KEY, listing_id TEXT, fingerprint TEXT, last_crawled REAL, record TEXT)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_listings_listing_id ON listings(listing_id)")
+        self.stats = {'new': 0, 'changed': 0, 'expired': 0, 'unchanged': 0, 'no_card': 0}
+
+    @staticmethod
+    def fingerprint(card: Optional[Dict[str, Any]]) -> str:
+        if not card: return ''
+        if 'text' in card and not any(card.get(f) for f in FINGERPRINT_FIELDS):
+            payload = card['text']  # 无 __NEXT_DATA__ 时退化为卡片文本
+        else:
+            payload = json.dumps([card.get(f) for f in FINGERPRINT_FIELDS], ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def partition(self, links: List[str], cards: Dict[str, Dict[str, Any]]) -> Tuple[List[str], Dict[str, str], Dict[str, str]]:
+        """
+        将一页链接分为需要抓取的与可复用的。
+        返回 (to_crawl, reused: url -> 旧记录 JSON, fingerprints: url -> 当前指纹)
+        """
+        if not links: return [], {}, {}
+        fingerprints = {link: self.fingerprint(cards.get(link)) for link in links}
+        with self._lock:
+            placeholders = ','.join('?' * len(links))
+            rows = {r[0]: r[1:] for r in self._conn.execute(
+                f"SELECT property_url, fingerprint, last_crawled, record FROM listings WHERE property_url IN ({placeholders})", links)}
+        now = time.time()
+        to_crawl, reused = [], {}
+        for link in links:
+            fp, row = fingerprints[link], rows.get(link)
+            if not fp: self.stats['no_card'] += 1; to_crawl.append(link)
+            elif row is None: self.stats['new'] += 1; to_crawl.append(link)
+            elif row[0] != fp: self.stats['changed'] += 1; to_crawl.append(link)
+            elif self.max_age and now - row[1] > self.max_age: self.stats['expired'] += 1; to_crawl.append(link)
+            else: self.stats['unchanged'] += 1; reused[link] = row[2]
+        return to_crawl, reused, fingerprints
+
+    def update(self, property_url: str, listing_id: str, fingerprint: str, record_json: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO listings VALUES (?,?,?,?,?)",
+                               (property_url, listing_id, fingerprint, time.time(), record_json))
+
+    def close(self) -> None:
+        with self._lock: self._conn.close()
+
+    def summary(self) -> str:
+        st = self.stats
+        return f"新房源 {st['new']}, 有变化 {st['changed']}, 超期重抓 {st['expired']}, 无卡片数据 {st['no_card']}, 未变化复用 {st['unchanged']}"
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+各阶段运行指标 (计数器 + 延迟直方图)
+- 阶段: fetch.<search|detail> (单次 HTTP 请求)、parse (详情页解析全程)、parse_search、extract (特征提取)、
+  clean (数据清洗)、validate (数据校验)、write (批次写入暂存文件)、finalize (生成正式输出文件)
+- 计数器: 响应正文字节数 (body_bytes，解压后的大小，不是线上传输字节数)、HTTP 状态码、重试、缓存命中、解析/写出的房源数等
+- 直方图为固定的对数分桶 (与 Prometheus 的 le 桶一致)，内存固定，分位数按桶上界估计
+- 本地 HTTP 端点 (metrics.port > 0): /metrics 为 Prometheus 文本格式，/metrics.json 为 JSON 快照
+- 每个输出文件旁写入 <输出文件>.metrics.json (metrics.write_summary)
+- 解析进程池中的指标通过 drain() / merge() 回传主进程 (与 ParseStats 相同)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger('domain_crawler_v2')
+
+# 延迟分桶上界 (秒)，最后一个桶为 +Inf
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CounterKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'sum', 'max')
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1); self.count = 0; self.sum = 0.0; self.max = 0.0
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1; self.sum += seconds
+        if seconds > self.max: self.max = seconds
+    def merge(self, other: Dict[str, Any]) -> None:
+        for i, n in enumerate(other['counts']): self.counts[i] += n
+        self.count += other['count']; self.sum += other['sum']; self.max = max(self.max, other['max'])
+    def quantile(self, q: float) -> float:
+        """按桶上界估计分位数 (落在 +Inf 桶时返回最大值)"""
+        if not self.count: return 0.0
+        target = q * self.count; seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target: return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'sum': round(self.sum, 6), 'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+                'p50': self.quantile(0.5), 'p90': self.quantile(0.9), 'p99': self.quantile(0.99), 'max': round(self.max, 6)}
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.counters: Dict[CounterKey, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    # --- 记录 ---
+    def inc(self, name: str, n: float = 1, **labels: Any) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock: self.counters[key] = self.counters.get(key, 0) + n
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None: hist = self.histograms[stage] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try: yield
+        finally: self.observe(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str) -> Callable[[Callable], Callable]:
+        """装饰器: 记录函数每次调用的耗时"""
+        def decorator(fn: Callable) -> Callable:
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try: return fn(*args, **kwargs)
+                finally: self.observe(stage, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    # --- 跨进程合并 ---
+    def drain(self) -> Dict[str, Any]:
+        """取出并清零当前指标 (解析进程回传给主进程合并)"""
+        with self._lock:
+            snap = {'counters': list(self.counters.items()),
+                    'histograms': {stage: {'counts': h.counts, 'count': h.count, 'sum': h.sum, 'max': h.max}
+                                   for stage, h in self.histograms.items()}}
+            self.counters = {}; self.histograms = {}
+        return snap
+
+    def merge(self, snap: Dict[str, Any]) -> None:
+        with self._lock:
+            for key, n in snap['counters']: self.counters[key] = self.counters.get(key, 0) + n
+            for stage, other in snap['histograms'].items():
+                hist = self.histograms.get(stage)
+                if hist is None: hist = self.histograms[stage] = Histogram()
+                hist.merge(other)
+
+    # --- 输出 ---
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON 快照: 各阶段延迟统计、计数器 (按名称分组) 和运行时长内的平均吞吐"""
+        with self._lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            counters: Dict[str, Any] = {}
+            for (name, labels), n in sorted(self.counters.items()):
+                if labels: counters.setdefault(name, {})[','.join(f"{k}={v}" for k, v in labels)] = n
+                else: counters[name] = n
+            stages = {stage: h.to_dict() for stage, h in sorted(self.histograms.items())}
+        throughput = {name: round((sum(v.values()) if isinstance(v, dict) else v) / elapsed, 3)
+                      for name, v in counters.items() if name in ('listings_parsed', 'listings_written', 'body_bytes')}
+        return {'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)), 'elapsed_seconds': round(elapsed, 3),
+                'stages': stages, 'counters': counters, 'per_second': throughput}
+
+    def prometheus(self) -> str:
+        """Prometheus 文本格式"""
+        lines: List[str] = []
+        with self._lock:
+            for (name, labels), n in sorted(self.counters.items()):
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"crawler_{name}_total{{{label_text}}} {n}" if label_text else f"crawler_{name}_total {n}")
+            if self.histograms:
+                lines.append("# TYPE crawler_stage_seconds histogram")
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for i, n in enumerate(h.counts):
+                    cumulative += n
+                    le = f"{BUCKETS[i]}" if i < len(BUCKETS) else "+Inf"
+                    lines.append(f'crawler_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'crawler_stage_seconds_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'crawler_stage_seconds_count{{stage="{stage}"}} {h.count}')
+            lines.append(f"crawler_uptime_seconds {time.time() - self.started:.3f}")
+        return '\n'.join(lines) + '\n'
+
+    def write_summary(self, output_path: str, **extra: Any) -> Optional[Path]:
+        """在输出文件旁写入 <输出文件>.metrics.json"""
+        path = Path(f"{output_path}.metrics.json")
+        try:
+            tmp = path.with_name(f".{path.name}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'output': os.path.basename(output_path), **extra, **self.snapshot()}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, path)
+            return path
+        except OSError as e:
+            logger.error(f"写入指标摘要失败: {path}, {e}"); return None
+
+    def summary(self) -> str:
+        with self._lock:
+            parts = [f"{stage} {h.count}次/平均 {h.sum / h.count * 1000:.1f} ms/p90 {h.quantile(0.9) * 1000:.1f} ms"
+                     for stage, h in sorted(self.histograms.items()) if h.count]
+        return '; '.join(parts) or '无'
+
+
+class MetricsServer:
+    """在后台线程提供 /metrics (Prometheus) 与 /metrics.json"""
+    def __init__(self, metrics: Metrics, host: str = '127.0.0.1', port: int = 9108):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.startswith('/metrics.json'):
+                    body, ctype = json.dumps(metrics.snapshot(), ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+                elif self.path.startswith('/metrics'):
+                    body, ctype = metrics.prometheus().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    self.send_error(404); return
+                self.send_response(200)
+                self.send_header('Content-Type', ctype); self.send_header('Content-Length', str(len(body)))
+                self.end_headers(); self.wfile.write(body)
+            def log_message(self, fmt: str, *args: Any) -> None:
+                pass
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}/metrics"
+        self._thread = threading.Thread(target=self.server.serve_forever, name='metrics', daemon=True)
+
+    def start(self) -> 'MetricsServer':
+        self._thread.start(); return self
+
+    def stop(self) -> None:
+        self.server.shutdown(); self.server.server_close()
+
+
+# 进程内全局指标 (与 CONFIG 一样为模块级单例)
+METRICS = Metrics()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+原始页面归档 (archive.enabled) 与离线回放 (archive.replay)
+- 每个交给解析器的搜索页/详情页响应体单独 zlib 压缩后追加写入分段文件 (segment_000001.bin ...)，
+  段文件超过 segment_size_mb 时滚动到新段
+- SQLite 偏移索引记录 URL、类型、段号、偏移、长度和内容哈希，单条记录可直接 seek 读取
+- 同一 URL 内容未变 (哈希相同) 时不重复写入
+- 回放模式下 RequestManager 从归档读取页面，不发任何网络请求，可用于修正解析逻辑后重新生成输出、
+  以及用真实页面对解析器做基准测试
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional
+
+logger = logging.getLogger('domain_crawler_v2')
+
+
+@dataclass
+class ArchivedPage:
+    url: str
+    kind: str
+    body: bytes
+    content_type: str
+    encoding: str
+    fetched_at: float
+
+
+class PageArchive:
+    def __init__(self, directory: Path, segment_size_mb: float = 256, compress_level: int = 6):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = int(segment_size_mb * 1024 * 1024)
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / 'index.sqlite3'), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS pages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, kind TEXT, fetched_at REAL, content_type TEXT,
+            encoding TEXT, sha1 TEXT, segment INTEGER, offset INTEGER, length INTEGER, raw_size INTEGER)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_url ON pages(url, id)")
+        self._segment = self._conn.execute("SELECT COALESCE(MAX(segment), 1) FROM pages").fetchone()[0]
+        self._writer: Optional[BinaryIO] = None
+        self._readers: Dict[int, BinaryIO] = {}
+        self.stats = {'appended': 0, 'unchanged': 0, 'raw_bytes': 0, 'stored_bytes': 0, 'replayed': 0, 'missing': 0}
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"segment_{segment:06d}.bin"
+
+    def _open_writer(self) -> BinaryIO:
+        if self._writer is None:
+            self._writer = open(self._segment_path(self._segment), 'ab')
+        if self._writer.tell() >= self.segment_bytes:
+            self._writer.close(); self._segment += 1
+            self._writer = open(self._segment_path(self._segment), 'ab')
+        return self._writer
+
+    def append(self, url: str, kind: str, body: bytes, content_type: str = '', encoding: str = '') -> bool:
+        """追加一条记录；内容与该 URL 最近一条记录相同时跳过，返回是否写入"""
+        digest = hashlib.sha1(body).hexdigest()
+        blob = zlib.compress(body, self.compress_level)
+        with self._lock:
+            last = self._conn.execute("SELECT sha1 FROM pages WHERE url=? ORDER BY id DESC LIMIT 1", (url,)).fetchone()
+            if last and last[0] == digest:
+                self.stats['unchanged'] += 1; return False
+            writer = self._open_writer()
+            offset = writer.tell()
+            writer.write(blob); writer.flush()
+            self._conn.execute("INSERT INTO pages (url, kind, fetched_at, content_type, encoding, sha1, segment, offset, length, raw_size) "
+                               "VALUES (?,?,?,?,?,?,?,?,?,?)",
+                               (url, kind, time.time(), content_type, encoding, digest, self._segment, offset, len(blob), len(body)))
+            self.stats['appended'] += 1; self.stats['raw_bytes'] += len(body); self.stats['stored_bytes'] += len(blob)
+        return True
+
+    def _read(self, segment: int, offset: int, length: int) -> bytes:
+        with self._lock:
+            if self._writer is not None and segment == self._segment: self._writer.flush()
+            reader = self._readers.get(segment)
+            if reader is None: reader = self._readers[segment] = open(self._segment_path(segment), 'rb')
+            reader.seek(offset)
+            blob = reader.read(length)
+        return zlib.decompress(blob)
+
+    def _page(self, row: tuple) -> ArchivedPage:
+        url, kind, fetched_at, content_type, encoding, segment, offset, length = row
+        return ArchivedPage(url, kind or '', self._read(segment, offset, length), content_type or '', encoding or '', fetched_at or 0.0)
+
+    def lookup(self, url: str) -> Optional[ArchivedPage]:
+        """返回该 URL 最近一次归档的页面 (回放使用)"""
+        with self._lock:
+            row = self._conn.execute("SELECT url, kind, fetched_at, content_type, encoding, segment, offset, length "
+                                     "FROM pages WHERE url=? ORDER BY id DESC LIMIT 1", (url,)).fetchone()
+            self.stats['replayed' if row else 'missing'] += 1
+        return self._page(row) if row else None
+
+    def iter_pages(self, kind: Optional[str] = None, latest_only: bool = True) -> Iterator[ArchivedPage]:
+        """按归档顺序遍历页面，默认每个 URL 只取最近一条"""
+        query = "SELECT url, kind, fetched_at, content_type, encoding, segment, offset, length FROM pages"
+        conds, params = [], []
+        if kind: conds.append("kind=?"); params.append(kind)
+        if latest_only: conds.append("id IN (SELECT MAX(id) FROM pages GROUP BY url)")
+        if conds: query += " WHERE " + " AND ".join(conds)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        for row in rows: yield self._page(row)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None: self._writer.close(); self._writer = None
+            for reader in self._readers.values(): reader.close()
+            self._readers.clear()
+            self._conn.close()
+
+    def summary(self) -> str:
+        st = self.stats
+        ratio = st['stored_bytes'] / st['raw_bytes'] if st['raw_bytes'] else 0.0
+        return (f"新归档 {st['appended']}, 内容未变跳过 {st['unchanged']}, 原始 {st['raw_bytes'] / 1024 / 1024:.1f} MB -> "
+                f"压缩后 {st['stored_bytes'] / 1024 / 1024:.1f} MB ({ratio:.0%}), 回放命中 {st['replayed']}, 回放缺失 {st['missing']}")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+类型化、分区的 Parquet 输出 (output.per_url_format / output.combined_format: 'parquet')
+- 列类型由 PropertyData / PropertyFeatures 的字段类型推导 (bool / float / int / str)，下游读取无需再从字符串解析
+- 低基数字符串列 (区域、中介、家具状态等) 使用字典编码
+- 按 Hive 风格目录分区: <数据集>/crawl_date=YYYY-MM-DD/suburb=<区域>/<文件名>.parquet，
+  下游可只读需要的列和分区，例如:
+      pd.read_parquet('output/parquet/Combined', columns=['suburb', 'rent_pw'], filters=[('suburb', '=', 'Epping')])
+- 每个分区文件先写为同目录下的隐藏临时文件 (.xxx.tmp，读取时被忽略)，全部写完后再原子重命名
+- 依赖 pyarrow (可选依赖，仅启用 parquet 输出时需要)
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+from urllib.parse import quote
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 可选依赖
+    pa = pq = None
+
+logger = logging.getLogger('domain_crawler_v2')
+
+# 分区值为空时使用的目录值 (pyarrow 读取时无法合并含 null 的字典编码分区列)
+EMPTY_PARTITION = 'Unknown'
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("parquet 输出需要安装 pyarrow: pip install pyarrow")
+
+
+def arrow_schema(column_types: Mapping[str, type], dictionary_columns: Sequence[str] = ()) -> 'pa.Schema':
+    """column_types: 列名 -> Python 类型 (按输出列顺序)；未知类型按字符串处理"""
+    require_pyarrow()
+    scalar = {bool: pa.bool_(), float: pa.float64(), int: pa.int64()}
+    dict_cols = set(dictionary_columns)
+    schema_fields = []
+    for name, py_type in column_types.items():
+        if name in dict_cols: arrow_type = pa.dictionary(pa.int32(), pa.string())
+        else: arrow_type = scalar.get(py_type, pa.string())
+        schema_fields.append(pa.field(name, arrow_type))
+    return pa.schema(schema_fields)
+
+
+def _partition_dir(values: Sequence[Tuple[str, Any]]) -> str:
+    return '/'.join(f"{name}={quote(str(value), safe='') if value not in (None, '') else EMPTY_PARTITION}" for name, value in values)
+
+
+class PartitionedParquetWriter:
+    def __init__(self, root: Path, schema: 'pa.Schema', partition_by: Sequence[str], basename: str,
+                 compression: str = 'zstd'):
+        """
+        schema 为完整列 (含分区列)；分区列只体现在目录名中，不写入文件。
+        每个分区一个 ParquetWriter，每次 write 为各分区追加一个 row group。
+        """
+        require_pyarrow()
+        self.root = Path(root); self.basename = basename; self.compression = compression
+        self.partition_by = list(partition_by)
+        self.schema = schema
+        self.file_schema = pa.schema([f for f in schema if f.name not in self.partition_by])
+        self._writers: Dict[Tuple[Any, ...], Tuple[Path, Path, 'pq.ParquetWriter']] = {}
+        self.rows = 0
+
+    def _writer(self, key: Tuple[Any, ...]) -> 'pq.ParquetWriter':
+        entry = self._writers.get(key)
+        if entry is None:
+            directory = self.root / _partition_dir(list(zip(self.partition_by, key)))
+            directory.mkdir(parents=True, exist_ok=True)
+            final = directory / f"{self.basename}.parquet"
+            tmp = directory / f".{self.basename}.parquet.tmp"
+            entry = self._writers[key] = (tmp, final, pq.ParquetWriter(str(tmp), self.file_schema, compression=self.compression))
+        return entry[2]
+
+    def write(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        """rows: 列名 -> 值；缺失的列写为 null"""
+        groups: Dict[Tuple[Any, ...], List[Mapping[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row.get(col) for col in self.partition_by), []).append(row)
+        for key, group in groups.items():
+            columns = {f.name: [r.get(f.name) for r in group] for f in self.file_schema}
+            self._writer(key).write_table(pa.Table.from_pydict(columns, schema=self.file_schema))
+        self.rows += len(rows)
+
+    def commit(self) -> List[Path]:
+        """关闭所有分区文件并原子重命名为正式文件名"""
+        written = []
+        for tmp, final, writer in self._writers.values():
+            writer.close(); os.replace(tmp, final); written.append(final)
+        self._writers.clear()
+        return written
+
+    def abort(self) -> None:
+        for tmp, _final, writer in self._writers.values():
+            try: writer.close()
+            except Exception: pass
+            tmp.unlink(missing_ok=True)
+        self._writers.clear()
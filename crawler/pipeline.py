@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流水线抓取引擎 (performance.engine: 'pipeline')
+- 抓取 → 解析 → 写入 三段，段间为有界队列:
+  抓取线程 (performance.max_workers) 只下载详情页字节；
+  解析进程池 (performance.parse_workers) 将页面转为 PropertyData，每个进程只初始化一次解析器
+  (预编译的选择器与关键词匹配器)，lxml / json / 特征提取不再与抓取线程争用 GIL；
+  单个写入线程按房源发现顺序调用 DomainCrawler.collect_details 写入 BatchWriter
+- 在途房源数不超过 performance.pipeline_queue_size，队列满时搜索页生产者阻塞 (背压)，内存占用与搜索规模无关
+- 各段队列深度可通过 depths() 读取，每个搜索页记录一次，搜索结束时输出峰值
+"""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import METRICS
+
+# 与 v5_furniture.setup_logger 使用同一个 logger 名称，共享其 handler
+logger = logging.getLogger('domain_crawler_v2')
+
+# =============================================================================
+# 解析进程
+# =============================================================================
+_parser: Any = None
+
+def _init_parser(parser_cls: type, fast: bool) -> None:
+    global _parser
+    _parser = parser_cls(fast)
+    METRICS.drain()  # fork 时继承了主进程已有的指标，清零后只回传本进程新增部分
+
+def _parse(url: str, body: bytes, encoding: Optional[str]) -> Tuple[Any, Dict[str, Any], Dict[str, Any]]:
+    """返回 (PropertyData 或 None, 本页解析统计, 本页各阶段指标)"""
+    item = _parser.parse_detail(url, body, encoding)
+    return item, _parser.parse_stats.drain(), METRICS.drain()
+
+# =============================================================================
+# 流水线
+# =============================================================================
+class _DetailJob:
+    __slots__ = ('url', 'fetched', 'result', 'done')
+    def __init__(self, url: str):
+        self.url = url; self.fetched: Optional[Tuple[bytes, Optional[str]]] = None
+        self.result: Any = None; self.done = threading.Event()
+
+class _PageJob:
+    __slots__ = ('page', 'links', 'jobs', 'reused', 'fingerprints')
+    def __init__(self, page: int, links: List[str], jobs: List[_DetailJob], reused: Dict[str, str], fingerprints: Dict[str, str]):
+        self.page = page; self.links = links; self.jobs = jobs; self.reused = reused; self.fingerprints = fingerprints
+
+
+class PipelineEngine:
+    def __init__(self, crawler: Any, config: Dict[str, Any]):
+        perf = config.get('performance', {}) or {}
+        self.crawler = crawler
+        self.fetch_workers = max(1, int(perf.get('max_workers', 4) or 1))
+        parse_workers = perf.get('parse_workers')
+        if parse_workers is None: parse_workers = os.cpu_count() or 1
+        self.parse_workers = max(0, int(parse_workers))
+        self.queue_size = max(1, int(perf.get('pipeline_queue_size', 200)))
+        self._fetch_q: 'queue.Queue[Optional[_DetailJob]]' = queue.Queue(maxsize=self.queue_size)
+        self._parse_q: 'queue.Queue[Optional[_DetailJob]]' = queue.Queue(maxsize=self.queue_size)
+        self._write_q: 'queue.Queue[Optional[_PageJob]]' = queue.Queue()
+        self._in_flight = threading.BoundedSemaphore(self.queue_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._awaiting_write = 0
+        self._written = 0
+        self.max_depths = {'fetch': 0, 'parse': 0, 'write': 0}
+        # 工作线程继承创建者 (搜索线程) 所属的 URL，用于公平排队和输出路由
+        self._lane = crawler.request_manager.politeness.lane_binding()
+
+    def depths(self) -> Dict[str, int]:
+        """各段当前积压: 待抓取、待解析、已解析待写入的房源数"""
+        with self._lock:
+            d = {'fetch': self._fetch_q.qsize(), 'parse': self._parse_q.qsize(), 'write': self._awaiting_write}
+            for k, v in d.items(): self.max_depths[k] = max(self.max_depths[k], v)
+        return d
+
+    # --- 各段工作线程 ---
+    def _fetch_loop(self) -> None:
+        self.crawler.request_manager.politeness.bind_lane(*self._lane)
+        while (job := self._fetch_q.get()) is not None:
+            try:
+                job.fetched = self.crawler.fetch_detail(job.url)
+            except Exception as e:
+                logger.error(f"处理房源 {job.url} 失败: {e}", exc_info=True)
+                self.crawler.request_manager.politeness.backoff('detail')
+            self._parse_q.put(job)
+
+    def _parse_one(self, job: _DetailJob) -> Any:
+        if self._pool is not None:
+            try:
+                item, stats, metrics = self._pool.submit(_parse, job.url, *job.fetched).result()
+                self.crawler.parse_stats.merge(stats); METRICS.merge(metrics)
+                return item
+            except BrokenProcessPool:
+                logger.error("解析进程池异常退出，改为在线程内解析")
+                self._pool = None
+        return self.crawler.parse_detail(job.url, *job.fetched)
+
+    def _parse_loop(self) -> None:
+        while (job := self._parse_q.get()) is not None:
+            try:
+                if job.fetched:
+                    job.result = self._parse_one(job)
+                    # 解析完成即记入预写日志 (写入线程按发现顺序等待，可能滞后于后续房源)
+                    self.crawler.journal_detail(job.url, job.result, self._lane[0])
+            except Exception as e:
+                logger.error(f"解析详情页失败: {job.url}, {e}", exc_info=True)
+            finally:
+                job.fetched = None
+                with self._lock: self._awaiting_write += 1
+                job.done.set()
+
+    def _write_loop(self) -> None:
+        self.crawler.request_manager.politeness.bind_lane(*self._lane)  # collect_details 按所属 URL 写入
+        while (page := self._write_q.get()) is not None:
+            crawled = {}
+            for job in page.jobs:
+                job.done.wait()
+                crawled[job.url] = job.result
+                with self._lock: self._awaiting_write -= 1
+                self._in_flight.release()
+            try:
+                results = self.crawler.collect_details(page.links, crawled, page.reused, page.fingerprints)
+                with self._lock: self._written += sum(1 for r in results if r)
+                self.crawler.checkpoint_page(page.page)
+            except Exception as e:
+                logger.error(f"写入房源数据失败: {e}", exc_info=True)
+
+    def search(self, input_url: str, using_temp_urls: bool) -> int:
+        """同步入口: 与 DomainCrawler.search 相同的签名和返回值 (处理的房源链接数)"""
+        crawler = self.crawler
+        progress_file_name = "progress_temp.json" if using_temp_urls else "progress.json"
+        if self.parse_workers > 0:
+            parser = crawler.detail_parser
+            self._pool = ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_parser,
+                                             initargs=(type(parser), parser.fast_detail_parse))
+        threads = [threading.Thread(target=self._fetch_loop, name=f'fetch-{i}', daemon=True) for i in range(self.fetch_workers)]
+        parse_threads = [threading.Thread(target=self._parse_loop, name=f'parse-{i}', daemon=True)
+                         for i in range(max(1, self.parse_workers))]
+        writer = threading.Thread(target=self._write_loop, name='writer', daemon=True)
+        for t in threads + parse_threads + [writer]: t.start()
+        logger.info(f"[pipeline] 抓取线程 {self.fetch_workers}, 解析进程 {self.parse_workers}, 在途上限 {self.queue_size}")
+
+        total_links_processed = 0
+        try:
+            for page, links, cards in crawler.iter_search_pages(input_url, prefix="[pipeline] "):
+                total_links_processed += len(links)
+                to_crawl, reused, fingerprints = crawler.plan_details(links, cards)
+                jobs = [_DetailJob(u) for u in to_crawl]
+                # 先登记页面，写入线程据此按发现顺序输出
+                self._write_q.put(_PageJob(page, links, jobs, reused, fingerprints))
+                for job in jobs:
+                    self._in_flight.acquire()  # 背压: 在途房源达到上限时阻塞
+                    self._fetch_q.put(job)
+                d = self.depths()
+                logger.info(f"第{page}页找到{len(links)}个房源，{len(to_crawl)}个进入流水线 (队列: 待抓取 {d['fetch']}, 待解析 {d['parse']}, 待写入 {d['write']})")
+                if not using_temp_urls:
+                    crawler.save_progress(input_url, page + 1, progress_file_name)
+        finally:
+            for _ in threads: self._fetch_q.put(None)
+            for t in threads: t.join()
+            for _ in parse_threads: self._parse_q.put(None)
+            for t in parse_threads: t.join()
+            self._write_q.put(None); writer.join()
+            if self._pool is not None: self._pool.shutdown(); self._pool = None
+
+        m = self.max_depths
+        logger.info(f"[pipeline] 搜索完成，成功处理{self._written}/{total_links_processed}个房源; "
+                    f"队列峰值: 待抓取 {m['fetch']}, 待解析 {m['parse']}, 待写入 {m['write']}")
+        return total_links_processed
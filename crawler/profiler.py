@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行时性能剖析 (profiling.enabled 或 python v5_furniture.py --profile)
+- CPU: 每个线程一个 cProfile (主线程 + 启动剖析后创建的 URL/详情页线程池线程)，默认按线程 CPU 时间计时
+  (cpu_clock: 'wall' 时按墙钟时间，包含等待网络的时间)，结束时合并写出:
+    cpu.prof    pstats 格式 (python -m pstats / snakeviz / gprof2dot)
+    cpu.folded  折叠调用栈 (flamegraph.pl / speedscope / inferno；两次运行可用 difffolded.pl 生成差分火焰图)，
+                cProfile 只记录调用关系，调用栈上的耗时按各调用方所占比例估算
+- 内存: tracemalloc 在搜索页边界 (该页房源全部交给输出后，与预写日志游标同一位置) 拍快照:
+    memory/NNN_<URL>_p<页码>.tracemalloc   tracemalloc.Snapshot.load 可读，可用本模块的 diff 子命令对比
+    memory_report.txt                      每个快照的已追踪内存/峰值/进程常驻内存峰值/GC 次数与暂停时间，
+                                           以及相对上一快照增长最多的分配位置
+- 关闭时 (默认) 爬虫只在每个搜索页结束时做一次 None 判断，不安装任何钩子
+- 解析进程池 (performance.engine: pipeline) 中的解析耗时不在 CPU 剖析内 (主进程只看到等待结果)
+
+用法:
+    python profiler.py diff old/cpu.prof new/cpu.prof                  # 各函数自身/累计耗时变化
+    python profiler.py diff memory/001_start.tracemalloc memory/010_url1_p9.tracemalloc --top 30
+    python profiler.py folded cpu.prof > cpu.folded                    # 从已有 pstats 文件重新生成折叠栈
+"""
+
+import argparse
+import cProfile
+import gc
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger('domain_crawler_v2')
+
+FuncKey = Tuple[str, int, str]
+_OWN_FILES = (tracemalloc.__file__, __file__)  # 剖析本身的分配 (快照汇总结果)，不计入报告
+_UNSAFE_NAME_RE = re.compile(r'[^\w-]')
+
+
+class _StatsSnapshot:
+    """供 pstats.Stats 加载的已有统计 (不能在其他线程上调用 Profile.create_stats，它会停用当前线程的剖析)"""
+    def __init__(self, stats: Dict[FuncKey, Any]):
+        self.stats = stats
+    def create_stats(self) -> None:
+        pass
+
+
+def _func_label(func: FuncKey) -> str:
+    filename, line, name = func
+    if filename == '~': return name  # 内置函数，如 <method 'join' of 'str' objects>
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def folded_stacks(stats: pstats.Stats, min_us: int = 10, max_depth: int = 64) -> List[str]:
+    """
+    把 pstats 调用图展开为折叠调用栈 ("a;b;c 微秒")。
+    cProfile 只记录直接调用关系: 函数在某条调用路径上的耗时按该路径在其所有调用方中所占的累计耗时比例分摊
+    """
+    raw = stats.stats
+    callees: Dict[FuncKey, List[FuncKey]] = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in raw.items():
+        for caller in callers: callees.setdefault(caller, []).append(func)
+    totals: Dict[str, float] = {}
+
+    def visit(func: FuncKey, path: Tuple[str, ...], on_path: Tuple[FuncKey, ...], share: float) -> None:
+        _cc, _nc, tt, ct, _callers = raw[func]
+        path = path + (_func_label(func),)
+        own = tt * share
+        if own * 1e6 >= 1: totals[';'.join(path)] = totals.get(';'.join(path), 0.0) + own
+        if len(path) >= max_depth: return
+        for callee in callees.get(func, ()):
+            if callee in on_path: continue  # 递归调用: 耗时已计入外层
+            c_ct = raw[callee][3]
+            edge_ct = raw[callee][4][func][3]
+            child_share = share * edge_ct / c_ct if c_ct else 0.0
+            if c_ct * child_share * 1e6 >= min_us: visit(callee, path, on_path + (callee,), child_share)
+
+    roots = [func for func, entry in raw.items() if not entry[4] or set(entry[4]) == {func}]
+    for root in roots: visit(root, (), (root,), 1.0)
+    return [f"{stack} {int(seconds * 1e6)}" for stack, seconds in sorted(totals.items()) if seconds * 1e6 >= 1]
+
+
+class RunProfiler:
+    def __init__(self, directory: Path, cpu: bool = True, memory: bool = True, cpu_clock: str = 'thread',
+                 memory_frames: int = 1, snapshot_every: int = 1, top: int = 25):
+        self.directory = Path(directory)
+        self.cpu = cpu; self.memory = memory
+        self.timer = time.thread_time if cpu_clock == 'thread' else time.perf_counter
+        self.memory_frames = max(1, int(memory_frames)); self.snapshot_every = max(1, int(snapshot_every))
+        self.top = int(top)
+        self._lock = threading.Lock()
+        self._main: Optional[cProfile.Profile] = None
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._by_thread: Dict[int, cProfile.Profile] = {}   # 线程 -> 该线程的 cProfile (拍快照时暂停)
+        self._pages = 0; self._seq = 0
+        self._previous: Dict[tracemalloc.Traceback, Tuple[int, int]] = {}   # 上一快照各分配位置的 (字节数, 块数)
+        self._report: Optional[TextIO] = None
+        self._gc_started: Dict[int, float] = {}
+        self.gc_pause = 0.0; self.gc_collections = 0
+        self._last_gc = (0.0, 0)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], output_dir: Path, label: str = 'run') -> Optional['RunProfiler']:
+        """profiling.enabled 为假时返回 None (不产生任何开销)"""
+        cfg = config.get('profiling', {}) or {}
+        if not cfg.get('enabled', False): return None
+        directory = Path(cfg.get('dir') or 'profiles')
+        if not directory.is_absolute(): directory = Path(output_dir) / directory
+        return cls(directory / f"{time.strftime('%Y%m%d_%H%M%S')}_{label}_{os.getpid()}",
+                   cpu=cfg.get('cpu', True), memory=cfg.get('memory', True), cpu_clock=cfg.get('cpu_clock', 'thread'),
+                   memory_frames=cfg.get('memory_frames', 1), snapshot_every=cfg.get('snapshot_every', 1), top=cfg.get('top', 25))
+
+    # --- CPU ---
+    def _thread_hook(self, frame: Any, event: str, arg: Any) -> None:
+        """threading.setprofile 钩子: 新线程的第一个事件时为其创建并启用自己的 cProfile (替换掉本钩子)"""
+        prof = cProfile.Profile(self.timer)
+        with self._lock:
+            self._thread_profiles.append(prof); self._by_thread[threading.get_ident()] = prof
+        prof.enable()
+
+    # --- 内存 ---
+    def _gc_callback(self, phase: str, info: Dict[str, Any]) -> None:
+        tid = threading.get_ident()
+        if phase == 'start': self._gc_started[tid] = time.perf_counter()
+        else:
+            started = self._gc_started.pop(tid, None)
+            if started is not None: self.gc_pause += time.perf_counter() - started; self.gc_collections += 1
+
+    @staticmethod
+    def _max_rss_mb() -> float:
+        if resource is None: return 0.0
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+    def snapshot(self, label: str) -> None:
+        """拍一个内存快照并在报告中追加与上一快照的差异 (期间暂停本线程的 CPU 剖析，快照耗时不计入)"""
+        if not self.memory or not tracemalloc.is_tracing(): return
+        prof = self._by_thread.get(threading.get_ident()) if self._main is not None else None
+        if prof is not None: prof.disable()
+        try: self._snapshot(label)
+        finally:
+            if prof is not None: prof.enable()
+
+    def _snapshot(self, label: str) -> None:
+        with self._lock:
+            self._seq += 1
+            snap = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            name = f"{self._seq:03d}_{_UNSAFE_NAME_RE.sub('_', label)}.tracemalloc"
+            snap.dump(str(self.directory / 'memory' / name))
+            gc_pause, gc_count = self.gc_pause - self._last_gc[0], self.gc_collections - self._last_gc[1]
+            self._last_gc = (self.gc_pause, self.gc_collections)
+            report = self._report
+            report.write(f"\n=== [{self._seq:03d}] {label} ({time.strftime('%H:%M:%S')}) -> memory/{name}\n")
+            report.write(f"已追踪 {current / 1024 / 1024:.1f} MB, 区间峰值 {peak / 1024 / 1024:.1f} MB, "
+                         f"进程常驻内存峰值 {self._max_rss_mb():.1f} MB, GC {gc_count} 次/暂停 {gc_pause * 1000:.1f} ms\n")
+            # 只保留上一快照按行汇总的结果 (保留整个快照会使其本身占用大量被追踪的内存)，
+            # 也不做 filter_traces (对每条记录做 fnmatch，堆大时需数秒)
+            current_stats = {stat.traceback: (stat.size, stat.count) for stat in snap.statistics('lineno')
+                             if stat.traceback[0].filename not in _OWN_FILES}
+            if self._seq > 1:
+                growth = sorted(((size - self._previous.get(tb, (0, 0))[0], tb, size, count) for tb, (size, count) in current_stats.items()),
+                                key=lambda row: row[0], reverse=True)
+                for size_diff, tb, size, count in growth[:self.top]:
+                    if size_diff > 0:
+                        report.write(f"  {tb}: size={size / 1024:.1f} KiB (+{size_diff / 1024:.1f} KiB), "
+                                     f"count={count} ({count - self._previous.get(tb, (0, 0))[1]:+d})\n")
+            report.flush()
+            self._previous = current_stats
+
+    def page_boundary(self, lane: Optional[str], page: int) -> None:
+        """一个搜索页的房源已全部交给输出 (DomainCrawler.checkpoint_page 调用)"""
+        with self._lock:
+            self._pages += 1
+            due = self._pages % self.snapshot_every == 0
+        if due: self.snapshot(f"{lane or 'main'}_p{page}")
+
+    # --- 开始 / 结束 ---
+    def start(self) -> 'RunProfiler':
+        (self.directory / 'memory').mkdir(parents=True, exist_ok=True)
+        if self.memory:
+            self._report = open(self.directory / 'memory_report.txt', 'w', encoding='utf-8')
+            gc.callbacks.append(self._gc_callback)
+            tracemalloc.start(self.memory_frames)
+            self.snapshot('start')
+        if self.cpu:
+            threading.setprofile(self._thread_hook)
+            self._main = cProfile.Profile(self.timer)
+            self._by_thread[threading.get_ident()] = self._main
+            self._main.enable()
+        logger.info(f"已开启性能剖析 (CPU: {self.cpu}, 内存: {self.memory})，输出目录: {self.directory}")
+        return self
+
+    def stop(self) -> Path:
+        """停止剖析并写出 cpu.prof / cpu.folded (先拍最后一个内存快照，不含汇总 CPU 统计本身的分配)；须在调用 start 的线程中调用"""
+        if self.memory and tracemalloc.is_tracing():
+            self.snapshot('finish')
+            tracemalloc.stop()
+            if self._gc_callback in gc.callbacks: gc.callbacks.remove(self._gc_callback)
+            self._report.close(); self._report = None; self._previous = {}
+            logger.info(f"内存剖析: {self._seq} 个快照, GC {self.gc_collections} 次共暂停 {self.gc_pause * 1000:.0f} ms")
+        if self.cpu and self._main is not None:
+            self._main.disable(); threading.setprofile(None)
+            stats = pstats.Stats(self._main)
+            with self._lock: profiles = list(self._thread_profiles)
+            for prof in profiles:
+                prof.snapshot_stats()
+                if prof.stats: stats.add(_StatsSnapshot(prof.stats))
+            stats.dump_stats(str(self.directory / 'cpu.prof'))
+            with open(self.directory / 'cpu.folded', 'w', encoding='utf-8') as f:
+                f.writelines(line + '\n' for line in folded_stacks(stats))
+            self._main = None; self._by_thread.clear()
+            logger.info(f"CPU 剖析: {len(profiles) + 1} 个线程, 耗时最多的函数 (自身耗时): {self.top_functions(stats, 5)}")
+        logger.info(f"性能剖析文件已写入: {self.directory}")
+        return self.directory
+
+    @staticmethod
+    def top_functions(stats: pstats.Stats, n: int) -> str:
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+        return '; '.join(f"{_func_label(func)} {entry[2]:.2f}s" for func, entry in rows)
+
+
+# =============================================================================
+# 命令行: 对比两次剖析结果 / 重新生成折叠栈
+# =============================================================================
+def diff_cpu(old_path: str, new_path: str, top: int) -> None:
+    old, new = pstats.Stats(old_path).stats, pstats.Stats(new_path).stats
+    rows = []
+    for func in set(old) | set(new):
+        o, c = old.get(func), new.get(func)
+        o_tt, o_ct = (o[2], o[3]) if o else (0.0, 0.0)
+        n_tt, n_ct = (c[2], c[3]) if c else (0.0, 0.0)
+        rows.append((n_tt - o_tt, n_ct - o_ct, o_tt, n_tt, func))
+    rows.sort(key=lambda r: abs(r[0]), reverse=True)
+    print(f"{'自身耗时变化':>12s} {'累计耗时变化':>12s} {'旧自身':>9s} {'新自身':>9s}  函数")
+    for d_tt, d_ct, o_tt, n_tt, func in rows[:top]:
+        print(f"{d_tt:+12.3f}s {d_ct:+12.3f}s {o_tt:9.3f} {n_tt:9.3f}  {_func_label(func)}")
+
+
+def diff_memory(old_path: str, new_path: str, top: int) -> None:
+    own = tuple(tracemalloc.Filter(False, path) for path in _OWN_FILES)
+    old, new = tracemalloc.Snapshot.load(old_path).filter_traces(own), tracemalloc.Snapshot.load(new_path).filter_traces(own)
+    stats = new.compare_to(old, 'traceback' if new.traceback_limit > 1 else 'lineno')
+    print(f"总计: {sum(s.size for s in stats) / 1024 / 1024:.1f} MB ({sum(s.size_diff for s in stats) / 1024 / 1024:+.1f} MB)")
+    for stat in stats[:top]:
+        print(stat)
+        if new.traceback_limit > 1:
+            for line in stat.traceback.format(): print(f"    {line}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="性能剖析结果工具")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_diff = sub.add_parser('diff', help="对比两个 cpu.prof 或两个 .tracemalloc 快照")
+    p_diff.add_argument('old'); p_diff.add_argument('new')
+    p_diff.add_argument('--top', type=int, default=25)
+    p_fold = sub.add_parser('folded', help="把 pstats 文件转换为折叠调用栈 (输出到标准输出)")
+    p_fold.add_argument('prof')
+    args = parser.parse_args()
+    if args.command == 'folded':
+        sys.stdout.writelines(line + '\n' for line in folded_stacks(pstats.Stats(args.prof)))
+    elif args.old.endswith('.tracemalloc'):
+        diff_memory(args.old, args.new, args.top)
+    else:
+        diff_cpu(args.old, args.new, args.top)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
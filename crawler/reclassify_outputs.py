@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+离线批量重新分类: 修改 furniture_keywords.yaml / aircon_keywords.yaml / features_config.yaml 后，
+用已有输出文件 (CSV/XLSX) 中的 property_headline、property_description、property_features
+重新运行 FeatureExtractor，只改写特征列，无需重新抓取。
+- 文件按块流式读写 (CSV: pandas chunksize; XLSX: openpyxl 只读/只写模式)
+- 特征提取在进程池中并行 (默认使用全部 CPU 核)
+- 默认写到 <原文件名>_reclassified.<扩展名>，--in-place 时先写临时文件再原子替换原文件
+- 输出文件未保存 __NEXT_DATA__ 中的 structuredFeatures，无法判断已有的 True 是否来自它，因此布尔特征列与原值取或
+  (已为 True 的保持 True)，文本得不到空调类型 ('none') 时保留原空调类型；furnishing_status 只按文本重新判断。
+  重新分类只会新增特征，关键词删除后要去掉的特征需重新抓取
+
+用法:
+    python reclassify_outputs.py output/20250730_*_Combined_*.csv
+    python reclassify_outputs.py output/*.xlsx --in-place --workers 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import yaml
+from openpyxl import Workbook, load_workbook
+
+import v5_furniture as vf
+
+logger = vf.logger
+
+FEATURE_COLUMNS = [f.name for f in fields(vf.PropertyFeatures)]
+TEXT_COLUMNS = ['property_headline', 'property_description', 'property_features']
+
+# (headline, description, property_features JSON, 原特征值元组 (顺序同 FEATURE_COLUMNS，缺列为 None))
+TextRow = Tuple[str, str, str, Tuple[Any, ...]]
+
+# =============================================================================
+# 工作进程
+# =============================================================================
+_extractor: Optional[vf.FeatureExtractor] = None
+
+def _init_worker(features_path: Optional[str], quiet: bool = True) -> None:
+    global _extractor
+    if quiet: vf.logger.setLevel(logging.WARNING)
+    features_config = None
+    if features_path:
+        with open(features_path, 'r', encoding='utf-8') as f: features_config = yaml.safe_load(f)
+    _extractor = vf.FeatureExtractor(features_config)
+
+def _parse_feature_list(value: Any) -> List[str]:
+    if not value or not isinstance(value, str): return []
+    try:
+        items = json.loads(value)
+        return [str(x) for x in items] if isinstance(items, list) else []
+    except ValueError:
+        return []
+
+def _truthy(value: Any) -> bool:
+    """CSV 读入为字符串 ('True'/'False')，XLSX 为布尔值"""
+    return value is True or (isinstance(value, str) and value.strip().lower() == 'true')
+
+def _classify(rows: List[TextRow]) -> List[Tuple[Any, ...]]:
+    """返回与 rows 一一对应的特征值元组 (顺序同 FEATURE_COLUMNS)"""
+    results = []
+    for headline, description, features_json, previous in rows:
+        # 输出文件中没有 structuredFeatures，仅用标题/描述/特征列表；文本得不到的特征保留原值
+        feats = _extractor.extract({}, headline or "", description or "", _parse_feature_list(features_json)).to_dict()
+        old = dict(zip(FEATURE_COLUMNS, previous))
+        for col in FEATURE_COLUMNS:
+            if isinstance(feats[col], bool): feats[col] = feats[col] or _truthy(old[col])
+        if feats['air_conditioning_type'] == 'none' and old['air_conditioning_type'] not in (None, '', 'none'):
+            feats['air_conditioning_type'] = old['air_conditioning_type']
+        results.append(tuple(feats[c] for c in FEATURE_COLUMNS))
+    return results
+
+# =============================================================================
+# 分块读写
+# =============================================================================
+def _map_ordered(pool: Optional[Executor], chunks: Iterable[Tuple[Any, List[TextRow]]],
+                 max_pending: int) -> Iterator[Tuple[Any, List[Tuple[Any, ...]]]]:
+    """按输入顺序产出 (chunk, 特征结果)；最多 max_pending 个块在途，保证内存有界"""
+    if pool is None:
+        for chunk, rows in chunks: yield chunk, _classify(rows)
+        return
+    pending = deque()
+    for chunk, rows in chunks:
+        pending.append((chunk, pool.submit(_classify, rows)))
+        if len(pending) >= max_pending:
+            chunk, fut = pending.popleft(); yield chunk, fut.result()
+    while pending:
+        chunk, fut = pending.popleft(); yield chunk, fut.result()
+
+def _reclassify_csv(src: Path, dst: Path, pool: Optional[Executor], chunksize: int, max_pending: int) -> Tuple[int, int]:
+    reader = pd.read_csv(src, chunksize=chunksize, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    def chunks():
+        for df in reader:
+            missing = [c for c in TEXT_COLUMNS if c not in df.columns]
+            if missing: raise ValueError(f"缺少列: {missing}")
+            previous = zip(*(df[c] if c in df.columns else [None] * len(df) for c in FEATURE_COLUMNS))
+            yield df, list(zip(df['property_headline'], df['property_description'], df['property_features'], previous))
+    rows = changed = 0
+    with open(dst, 'w', encoding='utf-8-sig', newline='') as out:
+        for df, results in _map_ordered(pool, chunks(), max_pending):
+            cols = [c for c in FEATURE_COLUMNS if c in df.columns]
+            new = pd.DataFrame(results, columns=FEATURE_COLUMNS, index=df.index)[cols].astype(str)
+            changed += int((new != df[cols]).any(axis=1).sum())
+            df[cols] = new
+            df.to_csv(out, index=False, header=(rows == 0))
+            rows += len(df)
+    return rows, changed
+
+def _reclassify_xlsx(src: Path, dst: Path, pool: Optional[Executor], chunksize: int, max_pending: int) -> Tuple[int, int]:
+    wb_in = load_workbook(src, read_only=True)
+    ws_in = wb_in.active
+    row_iter = ws_in.iter_rows(values_only=True)
+    header = list(next(row_iter, None) or [])
+    missing = [c for c in TEXT_COLUMNS if c not in header]
+    if missing: wb_in.close(); raise ValueError(f"缺少列: {missing}")
+    text_idx = [header.index(c) for c in TEXT_COLUMNS]
+    feat_idx = [(header.index(c), i) for i, c in enumerate(FEATURE_COLUMNS) if c in header]
+    prev_idx = [header.index(c) if c in header else None for c in FEATURE_COLUMNS]
+
+    def cell(row: list, i: Optional[int]) -> Any:
+        return row[i] if i is not None and i < len(row) else None
+    def text_rows(block: List[list]) -> List[TextRow]:
+        return [tuple(cell(r, i) for i in text_idx) + (tuple(cell(r, i) for i in prev_idx),) for r in block]
+    def chunks():
+        block: List[list] = []
+        for row in row_iter:
+            block.append(list(row))
+            if len(block) >= chunksize:
+                yield block, text_rows(block); block = []
+        if block: yield block, text_rows(block)
+
+    wb_out = Workbook(write_only=True)
+    ws_out = wb_out.create_sheet(ws_in.title)
+    ws_out.append(header)
+    rows = changed = 0
+    try:
+        for block, results in _map_ordered(pool, chunks(), max_pending):
+            for row, feats in zip(block, results):
+                row += [None] * (len(header) - len(row))
+                if any(row[col] != feats[i] for col, i in feat_idx): changed += 1
+                for col, i in feat_idx: row[col] = feats[i]
+                ws_out.append(row)
+            rows += len(block)
+        wb_out.save(dst)
+    finally:
+        wb_in.close()
+    return rows, changed
+
+def reclassify_file(src: Path, pool: Optional[Executor], chunksize: int, max_pending: int, in_place: bool) -> Optional[Path]:
+    suffix = src.suffix.lower()
+    handler = {'.csv': _reclassify_csv, '.xlsx': _reclassify_xlsx}.get(suffix)
+    if handler is None:
+        logger.warning(f"跳过不支持的文件类型: {src}"); return None
+    final = src if in_place else src.with_name(f"{src.stem}_reclassified{src.suffix}")
+    tmp = final.with_name(f".{final.name}.tmp")
+    started = time.perf_counter()
+    try:
+        rows, changed = handler(src, tmp, pool, chunksize, max_pending)
+        os.replace(tmp, final)
+    except Exception as e:
+        logger.error(f"重新分类失败: {src}, 错误: {e}", exc_info=True)
+        tmp.unlink(missing_ok=True); return None
+    logger.info(f"重新分类完成: {src.name} -> {final.name}, {rows} 行 ({changed} 行特征有变化), 用时 {time.perf_counter() - started:.1f}s")
+    return final
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="用当前关键词配置重新计算已有输出文件的特征列 (无需重新抓取)")
+    parser.add_argument('files', nargs='+', type=Path, help="CSV/XLSX 输出文件")
+    parser.add_argument('--in-place', action='store_true', help="原子替换原文件 (默认写入 *_reclassified.*)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="工作进程数 (默认: CPU 核数)")
+    parser.add_argument('--chunksize', type=int, default=5000, help="每块行数")
+    parser.add_argument('--features', type=Path, help="替代的 features_config.yaml (例如 config/features_config_full.yaml)")
+    args = parser.parse_args()
+
+    features_path = str(args.features) if args.features else None
+    workers = max(1, args.workers)
+    pool: Optional[Executor] = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features_path,))
+    else:
+        _init_worker(features_path, quiet=False)
+    try:
+        done = [reclassify_file(path, pool, max(1, args.chunksize), workers * 2, args.in_place) for path in args.files]
+    finally:
+        if pool is not None: pool.shutdown()
+    return 0 if all(done) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
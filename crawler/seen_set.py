@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行级房源去重集合 (dedupe.enabled)
+- 多个搜索 URL (多区域 "+" URL、同一区域不同价格段等) 返回的相同房源只请求和写出一次
+- claim(key) 原子地"检查并领取"，并发处理多个 URL 时同一房源只会被其中一个 URL 领取；
+  领取只是暂时占用 (精确的 pending 集合)，产出记录后 confirm(key) 才正式登记，抓取失败时 release(key) 放回，
+  之后的页面/URL 仍可重新请求该房源 (布隆过滤器无法删除条目，因此待定的键不进入过滤器)
+- 条目数不超过 exact_limit 时使用精确集合；超过后转为布隆过滤器 (按 capacity / error_rate 定长分配)，
+  内存与房源数无关，代价是约 error_rate 比例的新房源被误判为已见而跳过
+- 可选持久化 (persist_file): 运行结束时保存已登记 (产出过记录) 的房源，下次运行加载，之前运行处理过的房源也会跳过
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, Optional, Set
+from urllib.parse import urlparse
+
+logger = logging.getLogger('domain_crawler_v2')
+
+_LISTING_ID_RE = re.compile(r'-(\d{7,})/?$')
+
+
+def listing_key(url: str) -> str:
+    """运行级去重键: 详情页 URL 末尾的房源 ID；没有 ID 时使用规范化的 URL (小写主机，去掉查询串/片段/末尾斜杠)"""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/')
+    m = _LISTING_ID_RE.search(path)
+    return f"id:{m.group(1)}" if m else f"url:{parsed.netloc.lower()}{path}"
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None, k: Optional[int] = None):
+        if bits is None:
+            bits = bytearray((max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2))) + 7) // 8)
+        self.bits = bits; self.m = len(bits) * 8
+        self.k = k or max(1, round(self.m / capacity * math.log(2)))
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # 双重哈希: 由一个 128 位摘要派生 k 个位置
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(key))
+
+    def add(self, key: str) -> bool:
+        """加入 key，返回加入前是否 (可能) 已存在"""
+        present = True
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False; self.bits[byte] |= 1 << bit
+        return present
+
+
+class SeenSet:
+    def __init__(self, exact_limit: int = 500000, capacity: int = 5000000, error_rate: float = 0.001,
+                 path: Optional[Path] = None):
+        self.exact_limit = exact_limit; self.capacity = capacity; self.error_rate = error_rate
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._exact: Optional[Set[str]] = set()
+        self._bloom: Optional[BloomFilter] = None
+        self._pending: Set[str] = set()  # 已领取、尚未产出记录的键
+        self.stats = {'claimed': 0, 'duplicates': 0, 'released': 0, 'loaded': 0}
+        if self.path and self.path.exists(): self._load()
+
+    def _to_bloom(self) -> None:
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        for key in self._exact: self._bloom.add(key)
+        self._exact = None
+        logger.info(f"去重集合超过 {self.exact_limit} 条，转为布隆过滤器 ({len(self._bloom.bits) / 1024 / 1024:.1f} MB, 误判率 {self.error_rate})")
+
+    def _contains(self, key: str) -> bool:
+        return key in self._exact if self._exact is not None else key in self._bloom
+
+    def claim(self, key: str) -> bool:
+        """key 既未登记也未被领取时领取并返回 True；否则返回 False。领取后须调用 confirm 或 release"""
+        with self._lock:
+            seen = key in self._pending or self._contains(key)
+            if seen: self.stats['duplicates'] += 1
+            else: self._pending.add(key)
+        return not seen
+
+    def confirm(self, key: str) -> None:
+        """房源已产出记录: 正式登记 (未经 claim 的键也可直接登记，如续跑时从预写日志恢复的房源)"""
+        with self._lock:
+            self._pending.discard(key)
+            if self._exact is not None:
+                if key in self._exact: return
+                self._exact.add(key)
+                if len(self._exact) > self.exact_limit: self._to_bloom()
+            elif self._bloom.add(key):
+                return
+            self.stats['claimed'] += 1
+
+    def release(self, key: str) -> None:
+        """抓取失败: 放回领取的键，之后的页面/URL 可以重新请求"""
+        with self._lock:
+            if key in self._pending:
+                self._pending.discard(key); self.stats['released'] += 1
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'rb') as f:
+                header = json.loads(f.readline())
+                payload = f.read()
+            if header.get('mode') == 'bloom':
+                self._bloom = BloomFilter(self.capacity, self.error_rate, bits=bytearray(payload), k=header['k'])
+                self._exact = None
+            else:
+                self._exact = set(filter(None, payload.decode('utf-8').split('\n')))
+                if len(self._exact) > self.exact_limit: self._to_bloom()
+            self.stats['loaded'] = header.get('count', 0)
+            logger.info(f"已加载去重集合: {self.path} ({self.stats['loaded']} 条)")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"加载去重集合失败，将从空集合开始: {self.path}, {e}")
+
+    def save(self) -> None:
+        """持久化已登记的键到 path (临时文件 + 原子替换)；待定的键不保存"""
+        if not self.path: return
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with self._lock:
+            count = self.stats['loaded'] + self.stats['claimed']
+            with open(tmp, 'wb') as f:
+                if self._exact is not None:
+                    f.write(json.dumps({'mode': 'exact', 'count': count}).encode('utf-8') + b'\n')
+                    f.write('\n'.join(self._exact).encode('utf-8'))
+                else:
+                    f.write(json.dumps({'mode': 'bloom', 'k': self._bloom.k, 'count': count}).encode('utf-8') + b'\n')
+                    f.write(bytes(self._bloom.bits))
+        os.replace(tmp, self.path)
+
+    def summary(self) -> str:
+        st = self.stats
+        mode = '精确集合' if self._exact is not None else '布隆过滤器'
+        return (f"{mode}, 新房源 {st['claimed']}, 重复跳过 {st['duplicates']} (未重复请求/写出), "
+                f"抓取失败放回 {st['released']}, 历史加载 {st['loaded']}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试公用的本地模拟站点与抓取运行器
+- site: 本地 http.server，提供搜索页 (含 __NEXT_DATA__ 与结果列表，分页) 和详情页，并记录收到的请求路径
+- crawl: 在临时配置/输出目录中用指定引擎抓取模拟站点，返回 {不含时间戳的文件名: 文件内容}
+"""
+
+import copy
+import json
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+CRAWLER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CRAWLER_DIR))
+
+import v5_furniture as vf  # noqa: E402
+
+# =============================================================================
+# 模拟站点
+# =============================================================================
+REGIONS = {'epping-nsw-2121': 23, 'ultimo-nsw-2007': 6}
+PAGE_SIZE = 10
+
+
+def _listing_ids(region):
+    offset = sorted(REGIONS).index(region) * 1000
+    return [str(2019000000 + offset + i) for i in range(REGIONS[region])]
+
+
+def _search_html(base, region, page):
+    ids = _listing_ids(region)
+    chunk = ids[(page - 1) * PAGE_SIZE: page * PAGE_SIZE]
+    suburb, postcode = region.split('-')[0], region.split('-')[-1]
+    listings, items = {}, []
+    for lid in chunk:
+        i = int(lid) % 100
+        path = f"/{i}-foo-st-{region}-{lid}"
+        listings[lid] = {'id': int(lid), 'listingType': 'listing', 'listingModel': {
+            'url': path, 'price': f"${500 + i} per week", 'features': {'beds': i % 4, 'baths': 1, 'parking': 1},
+            'address': {'street': f"{i} Foo St", 'suburb': suburb.upper(), 'state': 'NSW', 'postcode': postcode}}}
+        items.append(f'<li><a class="address" href="{base}{path}">{i} Foo St</a><p>${500 + i} per week</p></li>')
+    next_data = {'props': {'pageProps': {'componentProps': {
+        'listingSearchResultIds': [int(x) for x in chunk], 'listingsMap': listings, 'totalListings': len(ids),
+        'totalPages': (len(ids) + PAGE_SIZE - 1) // PAGE_SIZE, 'currentPage': page}}}}
+    return (f"<html><body><ul data-testid='results'>{''.join(items)}</ul>"
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script></body></html>')
+
+
+def _detail_html(base, region, lid):
+    i = int(lid) % 100
+    suburb, postcode = region.split('-')[0], region.split('-')[-1]
+    description = ("<p>Fully furnished apartment with ducted air conditioning.</p><p>Close to station.</p>"
+                   if i % 3 == 0 else "<p>Unfurnished unit, split system, dishwasher and balcony.</p>")
+    next_data = {'props': {'pageProps': {'componentProps': {
+        'rootGraphQuery': {'listingByIdV2': {
+            'listingId': lid, 'headline': f"Lovely home {lid}", 'description': description,
+            'propertyType': 'Apartment / Unit / Flat' if i % 4 else '',
+            'agents': [{'fullName': 'Jane Agent', 'phoneNumber': '' if i % 5 == 0 else '02 9999 0000',
+                        'email': 'jane@example.com', 'profileUrl': f"{base}/real-estate-agent/jane",
+                        'agency': {'logoUrl': '' if i % 7 == 0 else 'https://img.example/logo.png'}}],
+            'agency': {'name': 'Best Realty'},
+            'displayableAddress': {'suburbName': suburb.title(), 'state': 'NSW', 'postcode': postcode,
+                                   'geolocation': {'latitude': -33.7, 'longitude': 151.1}},
+            'largeMedia': [{'url': f"https://img.example/{lid}/{k}.jpg"} for k in range(3)],
+            'priceDetails': {'bond': 2600},
+            'dateAvailableV2': {'isoDate': '2099-01-01T00:00:00'},
+            'structuredFeatures': [{'name': 'Gym'}]}},
+        'listingSummary': {'address': f"{i} Foo St, {suburb.title()}", 'title': f"${500 + i} per week",
+                           'beds': i % 4, 'baths': 1, 'parking': 1},
+        'inspectionDetails': {'inspections': [{'startTime': '2099-01-02T10:00', 'endTime': '2099-01-02T10:15'}]}}}}}
+    inspections = ('<div data-testid="listing-details__inspections-block">'
+                   '<span data-testid="listing-details__inspections-block-day">Sat 02 Jan</span>'
+                   '<span data-testid="listing-details__inspections-block-time">10:00am - 10:15am</span></div>') if i % 2 else ''
+    return ("<!DOCTYPE html><html><head><title>listing</title></head><body>"
+            "<div id='property-features'><ul><li>Dishwasher</li><li>Built in wardrobes</li></ul></div>"
+            f'<div data-testid="listing-details__agent-details-cta-box">'
+            f'<form data-testid="listing-details__oneform-button-form" action="/enquiry/{lid}"></form></div>'
+            '<a data-testid="listing-details__phone-cta-button" href="tel:0400000000"><span>Call</span></a>'
+            f"{inspections}"
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script></body></html>')
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.server.lock: self.server.requests.append(self.path)
+        base = f"http://{self.headers['Host']}"
+        search = re.match(r'^/rent/([^/?]+)/?(?:\?(.*))?$', self.path)
+        detail = re.match(r'^/\d+-foo-st-(.+)-(\d+)$', self.path)
+        if search and search.group(1) in REGIONS:
+            query = dict(p.split('=', 1) for p in (search.group(2) or '').split('&') if '=' in p)
+            body = _search_html(base, search.group(1), int(query.get('page', 1)))
+        elif detail and detail.group(1) in REGIONS:
+            body = _detail_html(base, detail.group(1), detail.group(2))
+        else:
+            self.send_response(404); self.end_headers(); return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockSite:
+    regions = REGIONS
+
+    def __init__(self, server: ThreadingHTTPServer):
+        self.server = server
+        self.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def search_urls(self) -> List[str]:
+        return [f"{self.url}/rent/{region}/" for region in REGIONS]
+
+    def detail_requests(self) -> List[str]:
+        with self.server.lock: return [p for p in self.server.requests if not p.startswith('/rent/')]
+
+    def reset(self) -> None:
+        with self.server.lock: self.server.requests.clear()
+
+
+@pytest.fixture(scope='module')
+def site():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SiteHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock(); server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield MockSite(server)
+    server.shutdown(); server.server_close()
+
+
+# =============================================================================
+# 运行
+# =============================================================================
+@pytest.fixture
+def crawl(site, monkeypatch) -> Callable[..., Dict[str, bytes]]:
+    """
+    crawl(engine, workdir, urls=None, prepare=None, **sections): 以 workdir 为配置/输出目录运行一次 DomainCrawler。
+    同一 workdir 再次运行时沿用其输出目录 (预写日志、队列文件)；sections 覆盖对应配置段的键；
+    prepare(crawler) 在 run() 之前调用 (例如注入崩溃)
+    """
+    def run(engine: str, workdir: Path, urls: Optional[List[str]] = None,
+            prepare: Optional[Callable[[Any], None]] = None, **sections: Dict[str, Any]) -> Dict[str, bytes]:
+        config_dir = workdir / 'config'; config_dir.mkdir(parents=True, exist_ok=True)
+        for name in ('features_config.yaml', 'furniture_keywords.yaml', 'aircon_keywords.yaml'):
+            (config_dir / name).write_bytes((CRAWLER_DIR / 'config' / name).read_bytes())
+        (config_dir / 'url.txt').write_text(''.join(f"{url}\n" for url in urls or site.search_urls()), encoding='utf-8')
+        output_dir = workdir / 'output'
+
+        config = copy.deepcopy(vf.CONFIG)
+        config['network'].update(base_url=site.url)
+        config['output'].update(mode='hybrid', per_url_format='csv', combined_format='csv')
+        config['performance'].update(engine=engine, url_concurrency=1, max_workers=3, parse_workers=0,
+                                     requests_per_second=1000, random_delay_factor=0,
+                                     delay_min=0, delay_max=0, page_delay_min=0, page_delay_max=0,
+                                     inter_url_delay_min=0, inter_url_delay_max=0)
+        config['politeness'] = {'search_rps': 1000, 'detail_rps': 1000}
+        for section in ('cache', 'index', 'archive', 'profiling', 'distributed'):
+            if isinstance(config.get(section), dict): config[section]['enabled'] = False
+        config.setdefault('metrics', {})['write_summary'] = False
+        for section, values in sections.items(): config.setdefault(section, {}).update(values)
+
+        monkeypatch.setattr(vf, 'CONFIG', config)
+        monkeypatch.setattr(vf, 'CONFIG_DIR', config_dir)
+        monkeypatch.setattr(vf, 'PROJECT_ROOT', workdir)
+        monkeypatch.setattr(vf, 'OUTPUT_DIR', output_dir)
+        monkeypatch.setattr(vf, 'DATA_DIR', output_dir / 'data')
+        monkeypatch.setattr(vf, 'SITE_BASE_URL', site.url)
+        monkeypatch.setattr(vf, 'SITE_HOST', re.sub(r'^https?://', '', site.url))
+
+        crawler = vf.DomainCrawler()
+        if prepare is not None: prepare(crawler)
+        files = crawler.run()
+        return {Path(f).name.split('_', 2)[2]: Path(f).read_bytes() for f in files}
+    return run
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+预写日志 (crawl_journal) 测试: 末行截断、崩溃后断点续跑 (已记录的房源不再请求、输出从日志重建)、正常结束时压缩
+"""
+
+import json
+
+import pytest
+
+from crawl_journal import CrawlJournal
+
+URLS = ['https://example.test/rent/a/', 'https://example.test/rent/b/']
+
+
+class _Crash(BaseException):
+    """模拟进程崩溃: 越过所有 except Exception，日志不会被压缩"""
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_begin_truncates_half_written_last_line(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CrawlJournal(path)
+    assert journal.begin(URLS) is False
+    journal.record_item('url1', 'https://example.test/1', '{"listing_id": "1"}')
+    journal.record_page('url1', 1)
+    journal.close()
+    good_size = path.stat().st_size
+    with open(path, 'ab') as f: f.write(b'{"lane": "url1", "link": "https://example.test/2", "it')
+
+    resumed = CrawlJournal(path)
+    assert resumed.begin(URLS) is True
+    assert path.stat().st_size == good_size
+    assert resumed.has('https://example.test/1') and not resumed.has('https://example.test/2')
+    assert resumed.cursor('url1') == 1
+    resumed.record_item('url1', 'https://example.test/2', '{"listing_id": "2"}')
+    resumed.close()
+    assert [link for link, _ in CrawlJournal(path).replay()] == ['https://example.test/1', 'https://example.test/2']
+
+
+def test_begin_with_different_urls_starts_over(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CrawlJournal(path)
+    journal.begin(URLS); journal.record_item('url1', 'https://example.test/1', '{}'); journal.close()
+
+    other = CrawlJournal(path)
+    assert other.begin(URLS[:1]) is False
+    assert not other.has('https://example.test/1')
+    assert _records(path)[0]['run']['urls'] == URLS[:1] and len(_records(path)) == 1
+
+
+def test_compact_keeps_only_cursors_and_done_markers(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CrawlJournal(path)
+    journal.begin(URLS)
+    for i in range(3): journal.record_item('url1', f"https://example.test/{i}", '{}')
+    journal.record_page('url1', 1); journal.record_page('url1', 2); journal.record_done('url1')
+    journal.record_item('url2', 'https://example.test/9', '{}'); journal.record_page('url2', 1)
+    journal.compact()
+
+    records = _records(path)
+    assert records[0]['run']['completed'] is True and records[0]['run']['listings'] == 4
+    assert records[1:] == [{'lane': 'url1', 'page': 2}, {'lane': 'url2', 'page': 1}, {'lane': 'url1', 'done': True}]
+    assert not list(tmp_path.glob('.*.tmp'))
+    # 已完成的运行不再续跑
+    assert CrawlJournal(path).begin(URLS) is False
+
+
+@pytest.mark.parametrize('dedupe', [True, False])
+def test_resume_after_crash_skips_journaled_listings(site, crawl, tmp_path, dedupe):
+    reference = crawl('threads', tmp_path / 'reference', dedupe={'enabled': dedupe})
+    total = sum(site.regions.values())
+    crash_after = 15
+
+    def crash(crawler):
+        parse, parsed = crawler.parse_detail, [0]
+        def parse_detail(*args, **kwargs):
+            parsed[0] += 1
+            if parsed[0] > crash_after: raise _Crash()
+            return parse(*args, **kwargs)
+        crawler.parse_detail = parse_detail
+
+    workdir = tmp_path / 'resume'
+    site.reset()
+    with pytest.raises(_Crash):
+        crawl('threads', workdir, prepare=crash, performance={'max_workers': 1}, dedupe={'enabled': dedupe})
+    first = site.detail_requests()
+    assert len(first) == crash_after + 1
+    journal_path = workdir / 'output' / 'crawl_journal.jsonl'
+    assert sum('item' in rec for rec in _records(journal_path)) == crash_after
+
+    site.reset()
+    resumed = crawl('threads', workdir, dedupe={'enabled': dedupe})
+    second = site.detail_requests()
+    assert len(second) == total - crash_after
+    assert not set(first[:crash_after]) & set(second)
+    assert resumed == reference
+    run = _records(journal_path)[0]['run']
+    assert run['completed'] is True and run['listings'] == total
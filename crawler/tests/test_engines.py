@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+抓取引擎一致性测试: 同一组 URL 分别用 threads 与 asyncio 引擎抓取本地模拟站点 (conftest.site)，
+输出文件 (不含时间戳的文件名与内容) 应完全一致
+"""
+
+import pytest
+
+
+def test_asyncio_engine_matches_threads(site, crawl, tmp_path):
+    pytest.importorskip('aiohttp')
+    threaded = crawl('threads', tmp_path / 'threads')
+    asynchronous = crawl('asyncio', tmp_path / 'asyncio')
+
+    regions = site.regions
+    total = sum(regions.values())
+    assert sorted(threaded) == sorted([f"Epping_{regions['epping-nsw-2121']}properties.csv",
+                                       f"Ultimo_{regions['ultimo-nsw-2007']}properties.csv",
+                                       f"Combined_{total}properties.csv"])
+    assert threaded[f"Combined_{total}properties.csv"].count(b'\n') > total
+    assert asynchronous == threaded
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+离线重新分类测试: 文本得出的特征被重新计算，仅由 structuredFeatures 得出的特征 (输出文件中没有来源) 保留原值
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+CRAWLER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CRAWLER_DIR))
+
+import reclassify_outputs as ro  # noqa: E402
+import v5_furniture as vf  # noqa: E402
+
+
+@pytest.fixture(scope='module', autouse=True)
+def extractor():
+    ro._init_worker(None)
+
+
+def _frame():
+    rows = []
+    for i, (description, gym) in enumerate([("<p>Unfurnished unit with dishwasher and balcony.</p>", True),
+                                            ("<p>Unfurnished unit with dishwasher.</p>", False)]):
+        row = {c: '' for c in vf.EXPECTED_COLUMNS}
+        row.update(vf.PropertyFeatures(has_gym=gym, air_conditioning_type='ducted' if gym else 'none',
+                                       has_air_conditioning=gym).to_dict())
+        row.update(listing_id=str(2019000000 + i), property_headline=f"Home {i}", property_description=description,
+                   property_features='["Dishwasher"]')
+        rows.append(row)
+    return pd.DataFrame(rows, columns=vf.EXPECTED_COLUMNS)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_reclassify_keeps_flags_text_cannot_produce(tmp_path, suffix):
+    src = tmp_path / f"listings{suffix}"
+    if suffix == '.csv': _frame().to_csv(src, index=False, encoding='utf-8-sig')
+    else: _frame().to_excel(src, index=False, engine='openpyxl')
+
+    out = ro.reclassify_file(src, None, chunksize=1, max_pending=2, in_place=False)
+    df = (pd.read_csv(out, dtype=str, keep_default_na=False) if suffix == '.csv' else pd.read_excel(out).astype(str))
+
+    assert list(df['has_gym']) == ['True', 'False']
+    assert list(df['air_conditioning_type']) == ['ducted', 'none']
+    assert list(df['has_air_conditioning']) == ['True', 'False']
+    assert list(df['has_balcony']) == ['True', 'False']
+    assert list(df['has_dishwasher']) == ['True', 'True']
+    assert list(df['furnishing_status']) == ['unfurnished', 'unfurnished']
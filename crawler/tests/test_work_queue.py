@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+租约式任务队列 (work_queue) 与多节点引擎测试: 租约过期后重新入队、超过 max_attempts 标记失败、
+失去租约后提交被拒绝、进程数写入队列，以及关闭 dedupe 时多节点输出与单机一致
+"""
+
+import time
+
+import pytest
+
+from work_queue import WorkQueue
+
+URLS = ['https://example.test/rent/a/']
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = WorkQueue(tmp_path / 'queue.sqlite3', max_attempts=2)
+    q.begin(URLS, rate_share=3)
+    yield q
+    q.close()
+
+
+def test_begin_seeds_first_search_page_and_rate_share(queue):
+    task = queue.claim('w1', lease_seconds=60)
+    assert (task.kind, task.url, task.lane, task.page, task.attempts) == ('search', URLS[0], 1, 1, 1)
+    assert queue.rate_share() == 3 and queue.state() == 'running'
+    assert queue.claim('w2', lease_seconds=60) is None
+    assert not queue.drained()
+
+
+def test_expired_lease_is_requeued_and_late_complete_is_rejected(queue):
+    first = queue.claim('w1', lease_seconds=0.05)
+    time.sleep(0.1)
+    second = queue.claim('w2', lease_seconds=60)
+    assert second.id == first.id and second.attempts == 2
+
+    assert queue.complete(first, 'w1', None) is False
+    assert queue.counts() == {'search.leased': 1}
+    assert queue.complete(second, 'w2', None) is True
+    assert queue.drained()
+
+
+def test_heartbeat_extends_lease(queue):
+    task = queue.claim('w1', lease_seconds=0.2)
+    for _ in range(3):
+        time.sleep(0.1); assert queue.heartbeat('w1', lease_seconds=0.2) == 1
+    assert queue.claim('w2', lease_seconds=60) is None
+    assert queue.complete(task, 'w1', None) is True
+
+
+def test_failed_task_is_retried_until_max_attempts(queue):
+    task = queue.claim('w1', lease_seconds=60)
+    queue.fail(task, 'w1')
+    assert queue.counts() == {'search.pending': 1}
+    task = queue.claim('w1', lease_seconds=60)
+    assert task.attempts == 2
+    queue.fail(task, 'w1')
+    assert queue.counts() == {'search.failed': 1}
+    assert queue.claim('w1', lease_seconds=60) is None and queue.drained()
+
+
+def test_expired_lease_past_max_attempts_is_marked_failed(queue):
+    queue.claim('w1', lease_seconds=0.01); time.sleep(0.05)
+    queue.claim('w2', lease_seconds=0.01); time.sleep(0.05)
+    assert queue.claim('w3', lease_seconds=60) is None
+    assert queue.counts() == {'search.failed': 1}
+
+
+def test_duplicate_keys_are_ignored_and_results_ordered(queue):
+    search = queue.claim('w1', lease_seconds=60)
+    rows = [(f"k{seq}", f"https://example.test/{seq}", 1, 1, seq, False) for seq in (2, 0, 1)]
+    assert queue.add_many('detail', rows) == 3
+    assert queue.add_many('detail', rows[:1]) == 0
+    queue.complete(search, 'w1', None)
+    for _ in range(3):
+        task = queue.claim('w1', lease_seconds=60)
+        queue.complete(task, 'w1', f"result-{task.seq}")
+    assert list(queue.results(1)) == ['result-0', 'result-1', 'result-2']
+
+
+def test_resume_keeps_queue_for_same_urls(tmp_path):
+    path = tmp_path / 'queue.sqlite3'
+    q = WorkQueue(path); q.begin(URLS); q.complete(q.claim('w1', 60), 'w1', None); q.close()
+    q = WorkQueue(path)
+    assert q.begin(URLS) is True and q.counts() == {'search.done': 1}
+    assert q.begin(URLS + ['https://example.test/rent/b/']) is False
+    assert q.counts() == {'search.pending': 2}
+    q.close()
+
+
+@pytest.mark.parametrize('dedupe', [True, False])
+def test_distributed_matches_threads_for_overlapping_urls(site, crawl, tmp_path, dedupe):
+    # 两个 URL 返回相同的房源: 启用 dedupe 时只写出一次，关闭时两个 URL 各写一次
+    urls = [f"{site.url}/rent/ultimo-nsw-2007/", f"{site.url}/rent/ultimo-nsw-2007/?sort=price"]
+    sections = dict(urls=urls, output={'mode': 'single_file'}, dedupe={'enabled': dedupe}, journal={'enabled': False})
+    threaded = crawl('threads', tmp_path / 'threads', **sections)
+    distributed = crawl('threads', tmp_path / 'distributed', **sections,
+                        distributed={'enabled': True, 'local_workers': 0, 'poll_interval': 0.05})
+    rows = site.regions['ultimo-nsw-2007'] * (1 if dedupe else 2)
+    assert sorted(threaded) == [f"Combined_{rows}properties.csv"]
+    assert distributed == threaded
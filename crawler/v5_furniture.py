@@ -8,27 +8,48 @@
 - Prints the output CSV filename to stdout.
 """
 
+import argparse
+import csv
 import json
+import os
 import time
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Tuple, Set, Any
-from dataclasses import dataclass, field, fields
-from functools import wraps
+from urllib.parse import urlparse
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Union, Tuple, Set, Any
+from dataclasses import dataclass, field, fields, asdict
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import heapq
 import re
 import yaml
 import random
 import gc
 import sys # Added for printing to stdout
 
-import pandas as pd
+# pandas / openpyxl 只在写出时使用，延迟到对应函数内导入 (二者约占模块导入时间的 3/4)
+if TYPE_CHECKING:
+    import pandas as pd
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from requests.structures import CaseInsensitiveDict
+# lxml 保持在模块顶层导入: 详情页/搜索页的 XPath 选择器 (DETAIL_FIELDS、SEARCH_RESULT_ITEMS 等) 在导入时编译，每次抓取都要用到
 from lxml import etree # type: ignore
 
+from http_cache import CacheEntry, HttpCache
+from keyword_matcher import KeywordMatcher
+from keyword_cache import KeywordIndexCache, source_digest
+from listing_index import ListingIndex
+from page_archive import ArchivedPage, PageArchive
+from seen_set import SeenSet, listing_key
+from crawl_journal import CrawlJournal
+from metrics import METRICS, MetricsServer
+import parquet_output
+
 # =============================================================================
 # 项目路径配置
 # =============================================================================
@@ -39,12 +60,22 @@ CONFIG_DIR = CRAWLER_DIR / 'config'
 OUTPUT_DIR = CRAWLER_DIR / 'output'
 DATA_DIR = OUTPUT_DIR / 'data'
 
-for d_path in (LOG_DIR, CONFIG_DIR, OUTPUT_DIR, DATA_DIR):
-    d_path.mkdir(exist_ok=True)
+def ensure_dirs() -> None:
+    """创建输出目录 (导入模块时不创建，由写文件的组件在构造时调用)"""
+    for d_path in (OUTPUT_DIR, DATA_DIR):
+        d_path.mkdir(parents=True, exist_ok=True)
 
 # =============================================================================
 # 日志配置
 # =============================================================================
+class _LazyFileHandler(logging.FileHandler):
+    """首条日志写出时才创建日志目录和文件，只导入模块 (工具脚本、解析进程) 不会创建目录或留下空日志"""
+    def __init__(self, filename: Path, encoding: str = 'utf-8'):
+        super().__init__(filename, encoding=encoding, delay=True)
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
 def setup_logger(name: str = 'domain_crawler_v2') -> logging.Logger: # Changed logger name
     logger_instance = logging.getLogger(name)
     logger_instance.setLevel(logging.DEBUG)
@@ -55,7 +86,7 @@ def setup_logger(name: str = 'domain_crawler_v2') -> logging.Logger: # Changed l
     ch.setLevel(logging.INFO)
     ch.setFormatter(fmt)
     log_file = LOG_DIR / f"domain_crawler_v2_{datetime.now():%Y%m%d_%H%M%S}.log" # Changed log file name
-    fh = logging.FileHandler(log_file, encoding='utf-8')
+    fh = _LazyFileHandler(log_file)
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(fmt)
     logger_instance.addHandler(ch)
@@ -67,18 +98,21 @@ logger = setup_logger()
 # =============================================================================
 # 配置加载
 # =============================================================================
+# libyaml 可用时使用 C 实现的解析器 (比纯 Python 实现快约 10 倍)，结果相同
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 def load_config() -> dict:
     config_path = CONFIG_DIR / 'crawler_config.yaml'
     if not config_path.exists():
         default_config_content = {
             'network': {'max_retries': 3, 'backoff_factor': 0.5, 'retry_statuses': [500, 502, 503, 504], 'timeout': 20},
             'headers': {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36'},
-            'performance': {'requests_per_second': 1.5, 'batch_size': 50, 'results_per_page_threshold': 10,
-                            'delay_min': 0.8, 'delay_max': 2.2, 'page_delay_min': 2.0, 'page_delay_max': 3.5,
-                            'inter_url_delay_min': 3.0, 'inter_url_delay_max': 7.0},
+            'performance': {'requests_per_second': 1.5, 'batch_size': 50, 'results_per_page_threshold': 10},
+            'politeness': {'search_rps': 0.4, 'detail_rps': 0.7, 'min_rps': 0.1, 'max_rps': 2.0, 'burst': 1},
             'features': {'enable_advanced_features': True, 'enable_data_validation': True, 'enable_batch_write': True, 'from_property_features_list': True, 'preserve_description_format': True, 'translate_to_chinese': False}
         }
         try:
+            CONFIG_DIR.mkdir(exist_ok=True)
             with open(config_path, 'w', encoding='utf-8') as f_default_config:
                 yaml.dump(default_config_content, f_default_config, default_flow_style=False)
             logger.info(f"Default configuration file created at {config_path}. Please review it.")
@@ -86,7 +120,7 @@ def load_config() -> dict:
             logger.error(f"Configuration file not found: {config_path} and failed to create a default: {e_cfg}")
             raise FileNotFoundError(f"配置文件不存在: {config_path} and failed to create a default: {e_cfg}")
     with open(config_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YAML_LOADER)
 
 def load_furniture_keywords() -> Optional[dict]:
     """加载家具关键词配置文件"""
@@ -98,7 +132,7 @@ def load_furniture_keywords() -> Optional[dict]:
     
     try:
         with open(keywords_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=_YAML_LOADER)
     except Exception as e:
         logger.error(f"Failed to load furniture keywords: {e}. Using fallback keywords.")
         return None
@@ -113,7 +147,7 @@ def load_aircon_keywords() -> Optional[dict]:
     
     try:
         with open(keywords_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=_YAML_LOADER)
     except Exception as e:
         logger.error(f"Failed to load aircon keywords: {e}. Using fallback keywords.")
         return None
@@ -126,15 +160,35 @@ def load_features_config() -> Optional[Dict[str, Any]]:
         return None
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=_YAML_LOADER)
     except Exception as e:
         logger.error(f"Failed to load features config: {e}. Feature extraction will be limited.")
         return None
 
 CONFIG = load_config()
-FURNITURE_KEYWORDS = load_furniture_keywords()
-AIRCON_KEYWORDS = load_aircon_keywords()
-FEATURES_CONFIG = load_features_config()
+
+# FEATURES_CONFIG / FURNITURE_KEYWORDS / AIRCON_KEYWORDS 在首次访问时才解析
+# (热启动时 FeatureExtractor 直接加载缓存的关键词索引，不需要它们)
+_KEYWORD_CONFIG_LOADERS: Dict[str, Callable[[], Optional[dict]]] = {
+    'FEATURES_CONFIG': load_features_config,
+    'FURNITURE_KEYWORDS': load_furniture_keywords,
+    'AIRCON_KEYWORDS': load_aircon_keywords,
+}
+
+def _keyword_config(name: str) -> Optional[dict]:
+    module_globals = globals()
+    if name not in module_globals:
+        module_globals[name] = _KEYWORD_CONFIG_LOADERS[name]()
+    return module_globals[name]
+
+def __getattr__(name: str) -> Any:
+    if name in _KEYWORD_CONFIG_LOADERS:
+        return _keyword_config(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 目标站点根地址 (可在 network.base_url 中覆盖，例如指向本地测试服务器)
+SITE_BASE_URL = (CONFIG.get('network', {}).get('base_url') or 'https://www.domain.com.au').rstrip('/')
+SITE_HOST = re.sub(r'^https?://', '', SITE_BASE_URL)
 
 # =============================================================================
 # 辅助函数 - 从URL提取区域名称
@@ -177,9 +231,9 @@ def extract_region_from_url(url: str) -> str:
         return "Unknown_Region"
 
 # =============================================================================
-# 数据模型 (Unchanged from v1)
+# 数据模型 (slots: 实例不带 __dict__，每条记录内存更小)
 # =============================================================================
-@dataclass
+@dataclass(slots=True)
 class PropertyFeatures:
     furnishing_status: str = 'unfurnished'  # Replaces is_furnished. Can be 'furnished', 'unfurnished', or 'optional'.
     air_conditioning_type: str = 'none' # Replaces has_air_conditioning. Can be 'none', 'ducted', 'split_system', etc.
@@ -191,7 +245,7 @@ class PropertyFeatures:
     has_security_system: bool = False; has_storage: bool = False
     has_study_room: bool = False; has_garden: bool = False
     has_gas_cooking: bool = False
-    def to_dict(self) -> Dict[str, Union[bool, str]]: return {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+    def to_dict(self) -> Dict[str, Union[bool, str]]: return {name: getattr(self, name) for name in _FEATURE_FIELDS}
     def merge(self, other: 'PropertyFeatures') -> None:
         # Custom merge logic for the new furnishing_status
         if self.furnishing_status == 'unfurnished':
@@ -206,7 +260,7 @@ class PropertyFeatures:
                 if not getattr(self, fld):
                     setattr(self, fld, getattr(other, fld))
 
-@dataclass
+@dataclass(slots=True)
 class PropertyData:
     listing_id: str = ""; property_url: str = ""; address: str = ""
     suburb: str = ""; state: str = ""; postcode: str = ""
@@ -224,9 +278,7 @@ class PropertyData:
     enquiry_form_action: str = ""
     def to_dict(self) -> Dict[str, Any]:
         result = {}
-        # 使用 dataclasses.fields 来确保所有字段都被包含
-        for f in fields(self):
-            field_name = f.name
+        for field_name in _RECORD_FIELDS:
             field_value = getattr(self, field_name)
             if field_name == 'features':
                 result.update(field_value.to_dict())
@@ -235,6 +287,18 @@ class PropertyData:
             else:
                 result[field_name] = field_value
         return result
+    def to_json(self) -> str:
+        """无损序列化 (保留嵌套的 features 和 inspection_times 列表)，用于索引/日志等持久化"""
+        return json.dumps(asdict(self), ensure_ascii=False)
+    @classmethod
+    def from_json(cls, text: str) -> 'PropertyData':
+        d = json.loads(text)
+        feats = d.get('features') or {}
+        d['features'] = PropertyFeatures(**{k: v for k, v in feats.items() if k in PropertyFeatures.__dataclass_fields__})
+        return cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
+
+_FEATURE_FIELDS = tuple(f.name for f in fields(PropertyFeatures))
+_RECORD_FIELDS = tuple(f.name for f in fields(PropertyData))
 
 EXPECTED_COLUMNS = [
     'listing_id', 'property_url', 'address', 'suburb', 'state', 'postcode',
@@ -248,22 +312,41 @@ EXPECTED_COLUMNS = [
     'agent_logo_url', 'enquiry_form_action', 'image_1', 'image_2', 'image_3', 'image_4'
 ]
 
+# 输出列的 Python 类型 (Parquet schema 使用)；inspection_times 等列表字段以 '; ' 拼接为字符串，不在数据类中的列按字符串处理
+_FIELD_TYPES = {f.name: f.type for f in fields(PropertyData) + fields(PropertyFeatures)}
+OUTPUT_COLUMN_TYPES: Dict[str, type] = {col: _FIELD_TYPES[col] if isinstance(_FIELD_TYPES.get(col), type) else str
+                                        for col in EXPECTED_COLUMNS}
+# 默认字典编码的低基数列 (可由 output.parquet.dictionary_columns 覆盖)
+PARQUET_DICTIONARY_COLUMNS = ['state', 'postcode', 'property_type', 'bedroom_display', 'agency_name', 'agent_logo_url',
+                              'furnishing_status', 'air_conditioning_type']
+
 # =============================================================================
 # 特征提取, 数据清洗 & 验证
 # =============================================================================
 class FeatureExtractor:
-    def __init__(self):
+    def __init__(self, features_config: Optional[dict] = None, furniture_keywords: Optional[dict] = None,
+                 aircon_keywords: Optional[dict] = None):
+        if features_config is None and furniture_keywords is None and aircon_keywords is None:
+            # 默认关键词配置: 使用进程内/磁盘缓存的索引 (匹配器构建后只读，可在实例间共享)
+            self.__dict__.update(_default_keyword_index())
+            return
+        self._build(_keyword_config('FEATURES_CONFIG') if features_config is None else features_config,
+                    _keyword_config('FURNITURE_KEYWORDS') if furniture_keywords is None else furniture_keywords,
+                    _keyword_config('AIRCON_KEYWORDS') if aircon_keywords is None else aircon_keywords)
+
+    def _build(self, features_config: Optional[dict], furniture_keywords: Optional[dict], aircon_keywords: Optional[dict]) -> None:
         self.compiled_patterns = {}
-        if FEATURES_CONFIG and 'features' in FEATURES_CONFIG:
-            for feature_config in FEATURES_CONFIG['features']:
+        self._feature_matcher: Optional[KeywordMatcher] = None
+        if features_config and 'features' in features_config:
+            feature_keywords: Dict[str, List[str]] = {}
+            for feature_config in features_config['features']:
                 column_name = feature_config.get('column_name')
                 keywords = feature_config.get('keywords', [])
-                if column_name and keywords:
-                    # 生成一个安全的正则表达式，将特殊字符转义
-                    # 使用 \b 来确保匹配整个单词
-                    patterns = [r'\b' + re.escape(kw) + r'\b' for kw in keywords]
-                    self.compiled_patterns[column_name] = [re.compile(p, re.IGNORECASE) for p in patterns]
-            logger.info(f"成功从 features_config.yaml 加载并编译了 {len(self.compiled_patterns)} 个特征的关键词。")
+                if column_name and keywords and column_name in PropertyFeatures.__dataclass_fields__:
+                    feature_keywords.setdefault(column_name, []).extend(keywords)
+            # 所有特征的关键词合并为一个匹配器，对文本只扫描一遍 (等价于逐个 r'\b关键词\b' 忽略大小写搜索)
+            self._feature_matcher = KeywordMatcher(feature_keywords, word_boundary=True, ignore_case=True)
+            logger.info(f"成功从 features_config.yaml 加载并编译了 {len(feature_keywords)} 个特征的 {self._feature_matcher.keyword_count} 个关键词。")
         else:
             logger.warning("features_config.yaml 未找到或格式不正确，将使用旧的硬编码模式。")
             # Fallback to old hardcoded patterns if config is not available
@@ -288,11 +371,11 @@ class FeatureExtractor:
         self._positive_keywords = set()
         self._negative_keywords = set()
         self._optional_keywords = set()
-        if FURNITURE_KEYWORDS:
+        if furniture_keywords:
             for key, keyword_set in [('positive_keywords', self._positive_keywords), 
                                      ('negative_keywords', self._negative_keywords), 
                                      ('optional_keywords', self._optional_keywords)]:
-                config = FURNITURE_KEYWORDS.get(key, {})
+                config = furniture_keywords.get(key, {})
                 if config:
                     for category_keywords in config.values():
                         keyword_set.update(kw.lower() for kw in category_keywords)
@@ -300,17 +383,19 @@ class FeatureExtractor:
             logger.info(f"Loaded {len(self._positive_keywords)} positive, {len(self._negative_keywords)} negative, and {len(self._optional_keywords)} optional furniture keywords.")
         else:
             logger.warning("Furniture keywords configuration not found or empty. Furnished detection will be degraded.")
+        self._furniture_matcher = KeywordMatcher({'negative': self._negative_keywords, 'optional': self._optional_keywords,
+                                                  'positive': self._positive_keywords})
 
         # Load and process all aircon keywords
         self._aircon_keywords: Dict[str, Set[str]] = {}
         self._aircon_keyword_order: List[str] = []
-        if AIRCON_KEYWORDS:
+        if aircon_keywords:
             self._aircon_keyword_order = [
                 'negative_keywords', 'ducted_keywords', 'reverse_cycle_keywords', 
                 'split_system_keywords', 'general_keywords', 'other_keywords'
             ]
             for key in self._aircon_keyword_order:
-                config = AIRCON_KEYWORDS.get(key, {})
+                config = aircon_keywords.get(key, {})
                 if config:
                     self._aircon_keywords[key] = set()
                     for category_keywords in config.values():
@@ -318,6 +403,7 @@ class FeatureExtractor:
             logger.info(f"Loaded {sum(len(s) for s in self._aircon_keywords.values())} air conditioning keywords across {len(self._aircon_keywords)} categories.")
         else:
             logger.warning("Aircon keywords configuration not found or empty. AC detection will be degraded.")
+        self._aircon_matcher = KeywordMatcher(self._aircon_keywords)
 
     def _get_furnishing_status(self, text: str) -> str:
         """
@@ -325,10 +411,10 @@ class FeatureExtractor:
         Logic: Negative > Optional > Positive. If no keywords found, defaults to Optional.
         """
         if not text: return 'optional' # Default to optional if no text is provided
-        text_lower = text.lower()
-        if any(keyword in text_lower for keyword in self._negative_keywords): return 'unfurnished'
-        if any(keyword in text_lower for keyword in self._optional_keywords): return 'optional'
-        if any(keyword in text_lower for keyword in self._positive_keywords): return 'furnished'
+        hits = self._furniture_matcher.labels(text.lower())
+        if 'negative' in hits: return 'unfurnished'
+        if 'optional' in hits: return 'optional'
+        if 'positive' in hits: return 'furnished'
         return 'optional' # Default to optional if no specific keywords are matched
 
     def _get_air_conditioning_type(self, text: str) -> str:
@@ -336,15 +422,13 @@ class FeatureExtractor:
         Determines air conditioning type based on a prioritized keyword search.
         """
         if not text or not self._aircon_keywords: return 'none'
-        text_lower = text.lower()
+        hits = self._aircon_matcher.labels(text.lower())
 
         for key in self._aircon_keyword_order:
-            if key in self._aircon_keywords:
-                for keyword in self._aircon_keywords[key]:
-                    if keyword in text_lower:
-                        if key == 'negative_keywords':
-                            return 'none'
-                        return key.replace('_keywords', '')
+            if key in hits:
+                if key == 'negative_keywords':
+                    return 'none'
+                return key.replace('_keywords', '')
         
         return 'none'
 
@@ -359,6 +443,9 @@ class FeatureExtractor:
         text_blob += " " + " ".join(s_features_set)
 
         # Centralized feature extraction for regex-based patterns
+        if self._feature_matcher is not None:
+            for feature_name in self._feature_matcher.labels(text_blob):
+                setattr(features, feature_name, True)
         for feature_name, patterns in self.compiled_patterns.items():
             if hasattr(features, feature_name):
                 if any(p.search(text_blob) for p in patterns):
@@ -380,14 +467,48 @@ class FeatureExtractor:
         
         return features
 
+_DEFAULT_KEYWORD_INDEX: Optional[Dict[str, Any]] = None
+
+def _keyword_index_sources() -> List[Path]:
+    """默认关键词索引所依赖的文件 (关键词 YAML 与构建索引的代码)，任一内容变化即缓存失效"""
+    return [CONFIG_DIR / 'features_config.yaml', CONFIG_DIR / 'furniture_keywords.yaml', CONFIG_DIR / 'aircon_keywords.yaml',
+            CRAWLER_DIR / 'keyword_matcher.py', Path(__file__)]
+
+def _default_keyword_index() -> Dict[str, Any]:
+    """
+    默认关键词配置构建的 FeatureExtractor 状态，进程内只构建一次。
+    keyword_cache.enabled 时按源文件内容哈希保存到 output 目录；热启动直接反序列化，不解析关键词 YAML、不重建匹配器
+    """
+    global _DEFAULT_KEYWORD_INDEX
+    if _DEFAULT_KEYWORD_INDEX is not None: return _DEFAULT_KEYWORD_INDEX
+    cache_cfg = CONFIG.get('keyword_cache', {}) or {}
+    cache: Optional[KeywordIndexCache] = None
+    digest = ''
+    if cache_cfg.get('enabled', True):
+        cache = KeywordIndexCache(OUTPUT_DIR / cache_cfg.get('dir', 'cache'))
+        digest = source_digest(_keyword_index_sources())
+        state = cache.load(digest)
+        if state is not None:
+            logger.info(f"从缓存加载关键词索引: {cache.path_for(digest).name}")
+            _DEFAULT_KEYWORD_INDEX = state
+            return state
+    extractor = FeatureExtractor.__new__(FeatureExtractor)
+    extractor._build(_keyword_config('FEATURES_CONFIG'), _keyword_config('FURNITURE_KEYWORDS'), _keyword_config('AIRCON_KEYWORDS'))
+    _DEFAULT_KEYWORD_INDEX = dict(extractor.__dict__)
+    if cache is not None and cache.store(digest, _DEFAULT_KEYWORD_INDEX):
+        logger.debug(f"关键词索引已缓存: {cache.path_for(digest)}")
+    return _DEFAULT_KEYWORD_INDEX
+
 class DataCleaner:
     @staticmethod
+    @METRICS.timed('clean')
     def clean_price(price: str) -> float:
         if not price: return 0.0
         try: return float(re.sub(r'[^\d.]', '', price))
         except (ValueError, TypeError): return 0.0
     
     @staticmethod
+    @METRICS.timed('clean')
     def clean_available_date(date_str: str) -> str:
         """
         专门处理入住日期的智能清理
@@ -435,12 +556,19 @@ class DataCleaner:
             return "Available Now"
 
     @staticmethod
+    @METRICS.timed('clean')
     def clean_text(text: str) -> str:
+        return DataCleaner._clean_text(text)
+
+    @staticmethod
+    def _clean_text(text: str) -> str:
+        """clean_text 的实现 (不计时)，供其它清洗方法内部调用，避免 clean 阶段重复计时"""
         if not text: return ""
         text = re.sub(r'<[^>]+>', '', text); text = ' '.join(text.split())
         return text.strip()
     
     @staticmethod
+    @METRICS.timed('clean')
     def clean_description(text: str, preserve_format: bool = True) -> str:
         """
         专门用于清理房源描述的方法
@@ -462,7 +590,7 @@ class DataCleaner:
             text = re.sub(r'^\s+|\s+$', '', text)
             return text.strip()
         else:
-            return DataCleaner.clean_text(text)
+            return DataCleaner._clean_text(text)
 
 class DataValidator:
     @staticmethod
@@ -480,125 +608,811 @@ class DataValidator:
 # =============================================================================
 # 请求管理
 # =============================================================================
-def safe_request(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        retries = CONFIG['network']['max_retries']
-        backoff_factor = CONFIG['network']['backoff_factor']
-        last_exception = None
-        for i_retry in range(retries):
-            try: return func(*args, **kwargs)
-            except requests.exceptions.RequestException as e:
-                last_exception = e
-                if i_retry < retries - 1:
-                    wait_time = (2 ** i_retry) * backoff_factor
-                    logger.warning(f"请求失败 ({i_retry+1}/{retries})，{wait_time:.1f}s后重试: {e}"); time.sleep(wait_time)
-        logger.error(f"请求失败，已达到最大重试次数: {last_exception if last_exception else 'Unknown Error'}");
-        if last_exception: raise last_exception
-        raise RuntimeError("Request failed after max retries, no exception stored.")
-    return wrapper
+class CircuitOpenError(requests.exceptions.RequestException):
+    """主机熔断后放弃请求"""
+
+class RetryPolicy:
+    """
+    统一的重试/退避策略 (连接池层的 urllib3 Retry 已关闭，重试只在此处发生)。
+    - 仅对网络错误与 retry_statuses (含 429) 重试，优先遵守 Retry-After
+    - 每次运行有总重试预算 (network.retry_budget)，用尽后失败即放弃
+    """
+    def __init__(self, config: Dict[str, Any]):
+        net = config.get('network', {}) or {}
+        self.max_retries = int(net.get('max_retries', 3))
+        self.backoff_factor = float(net.get('backoff_factor', 0.3))
+        self.max_backoff = float(net.get('max_backoff', 60))
+        self.retry_statuses = set(net.get('retry_statuses', [500, 502, 503, 504])) | {429}
+        self.budget = int(net.get('retry_budget', 200))
+        self._lock = threading.Lock()
+        self.stats = {'retries': 0, 'retry_after_honoured': 0, 'giveups': 0, 'budget_exhausted': 0}
+    def is_retryable(self, status: Optional[int]) -> bool:
+        return status is None or status in self.retry_statuses
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value: return None
+        value = value.strip()
+        if value.isdigit(): return float(value)
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError, IndexError): return None
+    def next_delay(self, attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        返回第 attempt 次失败后的等待秒数 (attempt 从 0 计，即已重试的次数)；不应再重试时返回 None
+        max_retries 为首次请求之外的重试次数，max_retries=3 时最多请求 4 次
+        """
+        with self._lock:
+            if attempt >= self.max_retries:
+                self.stats['giveups'] += 1; return None
+            if self.budget <= 0:
+                self.stats['budget_exhausted'] += 1; self.stats['giveups'] += 1; return None
+            self.budget -= 1; self.stats['retries'] += 1
+            delay = self._parse_retry_after(retry_after)
+            if delay is not None: self.stats['retry_after_honoured'] += 1
+            else: delay = self.backoff_factor * (2 ** attempt) * random.uniform(1.0, 1.5)
+            return min(delay, self.max_backoff)
+    def summary(self) -> str:
+        st = self.stats
+        return f"重试 {st['retries']} 次 (遵守 Retry-After {st['retry_after_honoured']} 次), 放弃 {st['giveups']} 次, 预算耗尽 {st['budget_exhausted']} 次, 剩余预算 {self.budget}"
+
+class CircuitBreaker:
+    """
+    按主机的熔断器: 连续失败 failure_threshold 次后熔断 (open)，暂停该主机的所有请求；
+    冷却期后放行一个探测请求 (half-open)，成功则恢复，失败则冷却时间翻倍。
+    连续熔断 max_trips 次仍未恢复时放弃该主机 (抛出 CircuitOpenError)。
+    """
+    def __init__(self, config: Dict[str, Any]):
+        cb = (config.get('network', {}) or {}).get('circuit_breaker', {}) or {}
+        self.failure_threshold = int(cb.get('failure_threshold', 5))
+        self.cooldown = float(cb.get('cooldown', 30))
+        self.max_cooldown = float(cb.get('max_cooldown', 300))
+        self.max_trips = int(cb.get('max_trips', 5))
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'trips': 0, 'recoveries': 0, 'rejected': 0}
+    def _host(self, host: str) -> Dict[str, Any]:
+        return self._hosts.setdefault(host, {'state': 'closed', 'failures': 0, 'open_until': 0.0,
+                                             'cooldown': self.cooldown, 'trips': 0, 'probing': False})
+    def allow(self, host: str) -> float:
+        """返回需要等待的秒数 (0 表示可立即请求)；主机已被放弃时抛出 CircuitOpenError"""
+        with self._lock:
+            h = self._host(host)
+            if h['state'] == 'closed': return 0.0
+            if h['trips'] >= self.max_trips:
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(f"主机 {host} 连续熔断 {h['trips']} 次，已放弃")
+            now = time.monotonic()
+            if h['state'] == 'open' and now >= h['open_until']:
+                h['state'] = 'half_open'; h['probing'] = False
+            if h['state'] == 'half_open' and not h['probing']:
+                h['probing'] = True; return 0.0
+            return max(h['open_until'] - now, 1.0)
+    def wait(self, host: str) -> None:
+        while True:
+            w = self.allow(host)
+            if w <= 0: return
+            time.sleep(w)
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            h = self._host(host)
+            if h['state'] != 'closed':
+                self.stats['recoveries'] += 1
+                logger.info(f"主机 {host} 熔断恢复")
+            h.update(state='closed', failures=0, cooldown=self.cooldown, trips=0, probing=False)
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            h = self._host(host); h['failures'] += 1
+            if h['state'] == 'half_open' or (h['state'] == 'closed' and h['failures'] >= self.failure_threshold):
+                if h['state'] == 'half_open': h['cooldown'] = min(h['cooldown'] * 2, self.max_cooldown)
+                h.update(state='open', open_until=time.monotonic() + h['cooldown'], probing=False)
+                h['trips'] += 1; self.stats['trips'] += 1
+                logger.warning(f"主机 {host} 连续失败 {h['failures']} 次，熔断 {h['cooldown']:.0f}s")
+    def summary(self) -> str:
+        st = self.stats
+        return f"熔断 {st['trips']} 次, 恢复 {st['recoveries']} 次, 拒绝 {st['rejected']} 次"
+
+class TokenBucket:
+    """
+    线程安全的令牌桶。reserve() 只在锁内预约令牌并返回需要等待的秒数，
+    实际等待由调用方在锁外完成 (time.sleep 或 asyncio.sleep)。
+    """
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate; self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity; self._updated = time.monotonic(); self._lock = threading.Lock()
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate); self._updated = now
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic(); self._refill(now)
+            self.tokens -= 1.0
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic()); self.rate = rate
+    def drain(self) -> None:
+        """清空令牌，使后续请求按当前速率重新排队"""
+        with self._lock:
+            self._refill(time.monotonic()); self.tokens = min(self.tokens, 0.0)
+
+class FairShareGate:
+    """
+    多个搜索 URL (lane) 共享同一令牌桶时的加权公平排队 (start-time fair queuing)。
+    等待中的请求按虚拟开始时间排序，每次只放行一个请求去占用令牌桶的下一个时隙，
+    因此各 lane 获得的请求份额与权重成正比 (权重相同即轮转)，与各自的线程数无关。
+    """
+    def __init__(self):
+        self._cond = threading.Condition(); self._heap: List[Tuple[float, int]] = []; self._seq = 0
+        self._finish: Dict[str, float] = {}; self._vclock = 0.0; self._busy = False
+    def run(self, lane: str, weight: float, take_slot: Callable[[], None]) -> None:
+        """轮到该 lane 时在独占状态下执行 take_slot (预约并等待令牌)"""
+        with self._cond:
+            start = max(self._vclock, self._finish.get(lane, 0.0))  # 空闲的 lane 不积累额度
+            self._finish[lane] = start + 1.0 / weight
+            entry = (start, self._seq); self._seq += 1
+            heapq.heappush(self._heap, entry)
+            while self._busy or self._heap[0] != entry: self._cond.wait()
+            heapq.heappop(self._heap); self._busy = True; self._vclock = start
+        try:
+            take_slot()
+        finally:
+            with self._cond:
+                self._busy = False; self._cond.notify_all()
+
+class PolitenessController:
+    """
+    自适应礼貌控制器: 搜索页与详情页各有一个令牌桶。
+    响应快速且健康时加性提速，遇到 429/5xx/网络错误或延迟明显上升时乘性降速 (AIMD)。
+    所有请求节奏都经由此处，配置的速率即实际请求速率。
+    """
+    ENDPOINTS = ('search', 'detail')
+
+    def __init__(self, config: Dict[str, Any]):
+        perf = config.get('performance', {}) or {}
+        cfg = config.get('politeness', {}) or {}
+        base_rps = float(perf.get('requests_per_second', 1.0))
+        self.jitter = float(perf.get('random_delay_factor', 0.5))
+        self.increase_step = float(cfg.get('increase_step', 0.05))
+        self.decrease_factor = float(cfg.get('decrease_factor', 0.5))
+        self.latency_target = float(cfg.get('latency_target', 3.0))
+        self.latency_rise_ratio = float(cfg.get('latency_rise_ratio', 2.0))
+        self._lock = threading.Lock()
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.limits: Dict[str, Tuple[float, float]] = {}
+        self._latency_ewma: Dict[str, float] = {}
+        self._latency_floor: Dict[str, float] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        for ep in self.ENDPOINTS:
+            rate = float(cfg.get(f'{ep}_rps', base_rps))
+            self.buckets[ep] = TokenBucket(rate, float(cfg.get('burst', 1)))
+            self.limits[ep] = (float(cfg.get('min_rps', rate / 4)), float(cfg.get('max_rps', rate * 2)))
+            self.stats[ep] = {'requests': 0, 'speedups': 0, 'backoffs': 0}
+        self.gates: Dict[str, FairShareGate] = {ep: FairShareGate() for ep in self.ENDPOINTS}
+        self._lane = threading.local()
+
+    def reserve(self, endpoint: str) -> float:
+        """预约一个请求时隙，返回需要等待的秒数 (抖动不占用令牌，不降低平均速率)"""
+        bucket = self.buckets.get(endpoint) or self.buckets['detail']
+        wait = bucket.reserve()
+        return wait + random.uniform(0, self.jitter / bucket.rate) if self.jitter else wait
+
+    def bind_lane(self, lane: Optional[str], weight: float = 1.0) -> None:
+        """将当前线程的请求归入某个搜索 URL 的队列 (None 表示不参与公平排队)"""
+        self._lane.lane = lane; self._lane.weight = max(float(weight), 1e-3)
+
+    def current_lane(self) -> Optional[str]:
+        return getattr(self._lane, 'lane', None)
+
+    def lane_binding(self) -> Tuple[Optional[str], float]:
+        """当前线程的 (lane, 权重)，用于让工作线程继承所属 URL"""
+        return self.current_lane(), getattr(self._lane, 'weight', 1.0)
+
+    def acquire(self, endpoint: str) -> None:
+        lane = self.current_lane()
+        if lane is None:
+            wait = self.reserve(endpoint)
+            if wait > 0: time.sleep(wait)
+            return
+        # 已绑定 URL 的线程: 按权重轮流占用令牌桶时隙，抖动在放行之后单独等待，不影响其他 URL
+        bucket = self.buckets.get(endpoint) or self.buckets['detail']
+        def take_slot() -> None:
+            wait = bucket.reserve()
+            if wait > 0: time.sleep(wait)
+        self.gates.get(endpoint, self.gates['detail']).run(lane, self._lane.weight, take_slot)
+        if self.jitter: time.sleep(random.uniform(0, self.jitter / bucket.rate))
+
+    def _adjust(self, endpoint: str, factor: float = 1.0, step: float = 0.0) -> None:
+        bucket = self.buckets[endpoint]; lo, hi = self.limits[endpoint]
+        bucket.set_rate(min(hi, max(lo, bucket.rate * factor + step)))
+
+    def record(self, endpoint: str, status: Optional[int], latency: float) -> None:
+        """根据响应状态与耗时调整对应令牌桶的速率 (status 为 None 表示网络错误)"""
+        endpoint = endpoint if endpoint in self.buckets else 'detail'
+        with self._lock:
+            st = self.stats[endpoint]; st['requests'] += 1
+            if status is None or status == 429 or status >= 500:
+                st['backoffs'] += 1
+                self._adjust(endpoint, factor=self.decrease_factor); self.buckets[endpoint].drain()
+                return
+            ewma = self._latency_ewma.get(endpoint, latency) * 0.8 + latency * 0.2
+            self._latency_ewma[endpoint] = ewma
+            floor = min(self._latency_floor.get(endpoint, ewma), ewma) * 1.01  # 缓慢上浮，适应常态变化
+            self._latency_floor[endpoint] = floor
+            if ewma > self.latency_target or ewma > floor * self.latency_rise_ratio:
+                st['backoffs'] += 1; self._adjust(endpoint, factor=0.9)
+            else:
+                st['speedups'] += 1; self._adjust(endpoint, step=self.increase_step)
+
+    def backoff(self, endpoint: str) -> None:
+        """调用方遇到异常时主动降速"""
+        self.record(endpoint, None, 0.0)
+
+    def split(self, processes: int) -> None:
+        """多个进程共同抓取同一站点 (多节点模式): 本进程只使用配置速率的 1/processes，自适应上下限与提速步长同比缩小"""
+        if processes <= 1: return
+        with self._lock:
+            self.increase_step /= processes
+            for ep, bucket in self.buckets.items():
+                lo, hi = self.limits[ep]
+                self.limits[ep] = (lo / processes, hi / processes)
+                bucket.set_rate(bucket.rate / processes)
+
+    def summary(self) -> str:
+        return ", ".join(f"{ep}: {b.rate:.2f} req/s (请求 {self.stats[ep]['requests']}, 提速 {self.stats[ep]['speedups']}, 降速 {self.stats[ep]['backoffs']})"
+                         for ep, b in self.buckets.items())
 
 class RequestManager:
     def __init__(self):
-        self.session = self._create_session(); self.last_request_time = 0; self._lock = threading.Lock()
+        ensure_dirs()
+        self._local = threading.local(); self.politeness = PolitenessController(CONFIG)
+        self.retry_policy = RetryPolicy(CONFIG); self.circuit_breaker = CircuitBreaker(CONFIG)
+        cache_cfg = CONFIG.get('cache', {}) or {}
+        self.cache: Optional[HttpCache] = None
+        self.cache_ttl = {'search': float(cache_cfg.get('search_ttl', 3600)), 'detail': float(cache_cfg.get('detail_ttl', 86400))}
+        if cache_cfg.get('enabled', False):
+            self.cache = HttpCache(OUTPUT_DIR / cache_cfg.get('file', 'http_cache.sqlite3'), max_size_mb=cache_cfg.get('max_size_mb', 512))
+            logger.info(f"已启用HTTP缓存: {self.cache.path}")
+        archive_cfg = CONFIG.get('archive', {}) or {}
+        self.replay = bool(archive_cfg.get('replay', False))
+        self.archive: Optional[PageArchive] = None
+        if archive_cfg.get('enabled', False) or self.replay:
+            self.archive = PageArchive(OUTPUT_DIR / archive_cfg.get('dir', 'page_archive'),
+                                       segment_size_mb=archive_cfg.get('segment_size_mb', 256))
+            logger.info(f"{'回放模式: 从归档读取页面，不发网络请求' if self.replay else '已启用页面归档'}: {self.archive.directory}")
+    @property
+    def session(self) -> requests.Session:
+        """每个线程持有独立的连接池会话 (requests.Session 非线程安全)"""
+        s = getattr(self._local, 'session', None)
+        if s is None:
+            s = self._local.session = self._create_session()
+        return s
     def _create_session(self) -> requests.Session:
         s = requests.Session()
-        rs = Retry(total=CONFIG['network']['max_retries'], backoff_factor=CONFIG['network']['backoff_factor'], status_forcelist=CONFIG['network']['retry_statuses'])
-        a = HTTPAdapter(max_retries=rs); s.mount("http://", a); s.mount("https://", a)
+        # 重试由 RetryPolicy 统一负责，连接池层不再重试
+        a = HTTPAdapter(max_retries=Retry(total=0, raise_on_status=False)); s.mount("http://", a); s.mount("https://", a)
         s.headers.update(CONFIG['headers']); return s
-    def _wait_for_rate_limit(self):
-        with self._lock:
-            current_time = time.time(); elapsed = current_time - self.last_request_time
-            base_delay = 1.0 / CONFIG['performance']['requests_per_second']
-            random_delay_factor = CONFIG['performance'].get('random_delay_factor', 0.5)
-            random_delay = random.uniform(0, base_delay * random_delay_factor)
-            wait_time = base_delay + random_delay - elapsed
-            if wait_time > 0: time.sleep(wait_time)
-            self.last_request_time = time.time()
-    @safe_request
-    def get(self, url: str, **kwargs) -> requests.Response:
-        try:
-            self._wait_for_rate_limit()
-            resp = self.session.get(url, timeout=CONFIG['network']['timeout'], **kwargs)
-            resp.raise_for_status()
-            if not resp.content: raise requests.exceptions.RequestException("空响应内容")
-            ct = resp.headers.get('content-type', '')
-            if not ('text/html' in ct or 'application/json' in ct):
-                raise requests.exceptions.RequestException(f"意外的响应类型: {ct}")
-            return resp
-        except requests.Timeout as e_timeout: logger.error(f"请求超时: {url}"); raise e_timeout
-        except requests.HTTPError as e_http: logger.error(f"HTTP错误: {url}, 状态码: {e_http.response.status_code}"); raise e_http
-        except requests.exceptions.RequestException as e_req: logger.error(f"请求异常: {url}, 错误: {e_req}"); raise e_req
-        except Exception as e_generic: logger.error(f"未预期的错误 during GET: {url}, 错误: {e_generic}"); raise e_generic
+    @staticmethod
+    def _stored_response(url: str, body: bytes, content_type: str, encoding: str, source: str) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = 200; resp.url = url; resp._content = body
+        resp.headers = CaseInsensitiveDict({'content-type': content_type, 'x-cache': source})
+        resp.encoding = encoding or None
+        return resp
+    @classmethod
+    def _cached_response(cls, entry: CacheEntry) -> requests.Response:
+        return cls._stored_response(entry.url, entry.body, entry.content_type, entry.encoding, 'HIT')
+    def replay_page(self, url: str) -> Optional[ArchivedPage]:
+        page = self.archive.lookup(url)
+        if page is None: logger.warning(f"回放: 归档中没有该页面: {url}")
+        return page
+    def archive_page(self, url: str, endpoint: str, body: bytes, content_type: str, encoding: str) -> None:
+        if self.archive is not None and not self.replay:
+            self.archive.append(url, endpoint, body, content_type, encoding)
+    def _archived(self, url: str, endpoint: str, resp: requests.Response) -> requests.Response:
+        self.archive_page(url, endpoint, resp.content, resp.headers.get('content-type', ''), resp.encoding or '')
+        return resp
+    def get(self, url: str, endpoint: str = 'detail', **kwargs) -> Optional[requests.Response]:
+        if self.replay:
+            page = self.replay_page(url)
+            METRICS.inc('cache', endpoint=endpoint, result='archive' if page else 'archive_miss')
+            return self._stored_response(url, page.body, page.content_type, page.encoding, 'ARCHIVE') if page else None
+        host = urlparse(url).netloc
+        attempt = 0
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry:
+            if entry.fresh:
+                METRICS.inc('cache', endpoint=endpoint, result='hit')
+                return self._archived(url, endpoint, self._cached_response(entry))
+            kwargs['headers'] = {**kwargs.get('headers', {}), **entry.conditional_headers()}
+        while True:
+            try:
+                self.circuit_breaker.wait(host)
+                self.politeness.acquire(endpoint)
+                started = time.monotonic()
+                try:
+                    resp = self.session.get(url, timeout=CONFIG['network']['timeout'], **kwargs)
+                except requests.exceptions.RequestException as e_fetch:
+                    METRICS.observe(f'fetch.{endpoint}', time.monotonic() - started)
+                    METRICS.inc('http_errors', endpoint=endpoint, error=type(e_fetch).__name__)
+                    self.politeness.record(endpoint, None, time.monotonic() - started)
+                    self.circuit_breaker.record_failure(host); raise
+                elapsed = time.monotonic() - started
+                METRICS.observe(f'fetch.{endpoint}', elapsed)
+                METRICS.inc('http_responses', endpoint=endpoint, status=resp.status_code)
+                METRICS.inc('body_bytes', len(resp.content), endpoint=endpoint)
+                self.politeness.record(endpoint, resp.status_code, elapsed)
+                if resp.status_code == 304 and entry:
+                    METRICS.inc('cache', endpoint=endpoint, result='revalidated')
+                    self.circuit_breaker.record_success(host)
+                    return self._archived(url, endpoint, self._cached_response(self.cache.revalidated(
+                        entry, self.cache_ttl.get(endpoint, 0), resp.headers.get('ETag', ''), resp.headers.get('Last-Modified', ''))))
+                if self.retry_policy.is_retryable(resp.status_code) or (resp.status_code < 400 and not resp.content):
+                    self.circuit_breaker.record_failure(host)
+                    delay = self.retry_policy.next_delay(attempt, resp.headers.get('Retry-After'))
+                    if delay is None:
+                        resp.raise_for_status(); raise requests.exceptions.RequestException("空响应内容")
+                    logger.warning(f"请求失败 ({attempt+1}/{self.retry_policy.max_retries})，{delay:.1f}s后重试: {url}, 状态码: {resp.status_code}")
+                    METRICS.inc('retries', endpoint=endpoint)
+                    time.sleep(delay); attempt += 1; continue
+                self.circuit_breaker.record_success(host)
+                resp.raise_for_status()
+                ct = resp.headers.get('content-type', '')
+                if not ('text/html' in ct or 'application/json' in ct):
+                    raise requests.exceptions.RequestException(f"意外的响应类型: {ct}")
+                if self.cache:
+                    self.cache.store(url, resp.content, ct, resp.encoding or '', resp.headers.get('ETag', ''),
+                                     resp.headers.get('Last-Modified', ''), self.cache_ttl.get(endpoint, 0))
+                return self._archived(url, endpoint, resp)
+            except CircuitOpenError as e_circuit: logger.error(f"请求被熔断器拒绝: {url}, {e_circuit}"); raise e_circuit
+            except (requests.ConnectionError, requests.Timeout) as e_net:
+                delay = self.retry_policy.next_delay(attempt)
+                if delay is None:
+                    logger.error(f"请求失败，已达到最大重试次数: {url}, 错误: {e_net}"); raise e_net
+                logger.warning(f"请求失败 ({attempt+1}/{self.retry_policy.max_retries})，{delay:.1f}s后重试: {e_net}")
+                METRICS.inc('retries', endpoint=endpoint)
+                time.sleep(delay); attempt += 1
+            except requests.HTTPError as e_http: logger.error(f"HTTP错误: {url}, 状态码: {e_http.response.status_code}"); raise e_http
+            except requests.exceptions.RequestException as e_req: logger.error(f"请求异常: {url}, 错误: {e_req}"); raise e_req
+            except Exception as e_generic: logger.error(f"未预期的错误 during GET: {url}, 错误: {e_generic}"); raise e_generic
 
 # =============================================================================
 # 批量写入管理
 # =============================================================================
-class BatchWriter:
+# 重复率高的字符串列 (同一区域/中介的房源大量重复)，累积时驻留为同一个字符串对象
+INTERNED_COLUMNS = frozenset({'suburb', 'state', 'postcode', 'property_type', 'bedroom_display', 'available_date',
+                              'agency_name', 'agent_name', 'agent_phone', 'agent_email', 'agent_profile_url', 'agent_logo_url',
+                              'enquiry_form_action', 'furnishing_status', 'air_conditioning_type'})
+
+def _column_getter(col: str) -> Callable[[PropertyData], Any]:
+    if col in _FEATURE_FIELDS: return attrgetter(f'features.{col}')
+    if col == 'inspection_times': return lambda item: '; '.join(item.inspection_times)
+    if col in _RECORD_FIELDS: return attrgetter(col)
+    return lambda item: ""  # 不在数据类中的列 (image_1..4) 输出为空
+
+_COLUMN_GETTERS = [(col, _column_getter(col), col in INTERNED_COLUMNS) for col in EXPECTED_COLUMNS]
+
+
+class ColumnBatch:
+    """
+    按列累积的记录批次 (列顺序同 EXPECTED_COLUMNS): 追加时直接拆成各列的值，不生成每行 dict，
+    可一次构造 DataFrame 或按行迭代；重复的字符串列值驻留为同一对象。
+    """
+    __slots__ = ('columns', 'size')
     def __init__(self):
-        self.buffer: List[PropertyData] = []; self._lock = threading.Lock()
-    def add(self, item: PropertyData) -> None:
-        with self._lock: self.buffer.append(item)
-    def flush(self, region: str = "Unknown", total_count: int = 0, output_format: str = 'xlsx') -> Optional[str]:
-        if not self.buffer:
-            logger.info(f"缓冲区中无数据可刷新至 {output_format.upper()}。")
+        self.columns: Dict[str, list] = {col: [] for col in EXPECTED_COLUMNS}; self.size = 0
+    @classmethod
+    def from_items(cls, items: List[PropertyData]) -> 'ColumnBatch':
+        batch = cls()
+        for item in items: batch.append(item)
+        return batch
+    def __len__(self) -> int: return self.size
+    def append(self, item: PropertyData) -> None:
+        columns = self.columns
+        for col, getter, intern in _COLUMN_GETTERS:
+            value = getter(item)
+            columns[col].append(sys.intern(value) if intern and type(value) is str else value)
+        self.size += 1
+    def to_frame(self) -> 'pd.DataFrame':
+        import pandas as pd
+        return pd.DataFrame(self.columns, columns=EXPECTED_COLUMNS)
+    def rows(self) -> Iterator[tuple]:
+        return zip(*self.columns.values())
+
+
+class OutputStream:
+    """
+    单个输出文件的流式写入: 每个批次追加到 output 目录下的隐藏临时文件 (.part)，
+    finalize 时生成正式文件名 (含时间戳与总数) 并原子重命名。
+    CSV 直接以最终格式追加；XLSX / Parquet 无法追加，批次先以 JSON Lines 暂存 (保留数值/布尔类型)，finalize 时转换。
+    Parquet 输出为 output/<parquet.dir>/<区域>/ 下按抓取日期和 suburb 分区的数据集 (见 parquet_output)。
+    进程崩溃时最多丢失内存中尚未写出的一个批次，.part 文件保留在 output 目录中。
+    """
+    def __init__(self, region: str, output_format: str = 'xlsx'):
+        output_format = output_format.lower()
+        if output_format == 'parquet' and parquet_output.pa is None:
+            logger.error("parquet 输出需要安装 pyarrow (pip install pyarrow)，本次改为输出 CSV")
+            output_format = 'csv'
+        self.region = region; self.output_format = output_format; self.rows = 0
+        self.clean_region = re.sub(r'[^\w\s-]', '', region).replace(' ', '_')
+        spool_ext = 'csv' if self.output_format == 'csv' else 'jsonl'
+        self.part_path = OUTPUT_DIR / f".{datetime.now():%Y%m%d_%H%M%S}_{self.clean_region}_{id(self):x}.{spool_ext}.part"
+
+    def write(self, batch: ColumnBatch) -> None:
+        if not batch: return
+        if self.output_format == 'csv':
+            # 与 DataFrame.to_csv 输出相同 (QUOTE_MINIMAL, 行尾 os.linesep)，但没有每批构造 DataFrame 的开销
+            with open(self.part_path, 'a', encoding='utf-8-sig' if self.rows == 0 else 'utf-8', newline='') as f:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                if self.rows == 0: writer.writerow(EXPECTED_COLUMNS)
+                writer.writerows(batch.rows())
+        else:
+            # Parquet 按写出时的日期分区，日期随行暂存
+            extra = (datetime.now().strftime('%Y-%m-%d'),) if self.output_format == 'parquet' else ()
+            with open(self.part_path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(row + extra, ensure_ascii=False) + "\n" for row in batch.rows())
+        self.rows += len(batch)
+
+    def _spooled_rows(self) -> Iterator[list]:
+        with open(self.part_path, 'r', encoding='utf-8') as f:
+            for line in f: yield json.loads(line)
+
+    def _finalize_xlsx(self, path: Path) -> None:
+        """openpyxl 只写模式逐行写出，内存占用与行数无关；单元格内容与 pandas.to_excel 相同"""
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Sheet1')
+        ws.append(EXPECTED_COLUMNS)
+        for values in self._spooled_rows():
+            # 去除 Excel 不允许的控制字符 (pandas.to_excel 遇到时整个文件写入失败)
+            ws.append([ILLEGAL_CHARACTERS_RE.sub('', v) if isinstance(v, str) else v for v in values])
+        wb.save(path)
+
+    def _finalize_parquet(self, region: str, basename: str) -> Path:
+        pq_cfg = CONFIG.get('output', {}).get('parquet', {}) or {}
+        dataset_root = OUTPUT_DIR / pq_cfg.get('dir', 'parquet') / re.sub(r'[^\w\s-]', '', region).replace(' ', '_')
+        columns = EXPECTED_COLUMNS + ['crawl_date']
+        schema = parquet_output.arrow_schema({**OUTPUT_COLUMN_TYPES, 'crawl_date': str},
+                                             pq_cfg.get('dictionary_columns', PARQUET_DICTIONARY_COLUMNS))
+        writer = parquet_output.PartitionedParquetWriter(dataset_root, schema, ['crawl_date', 'suburb'], basename,
+                                                         compression=pq_cfg.get('compression', 'zstd'))
+        row_group_size = max(1, int(pq_cfg.get('row_group_size', 10000)))
+        try:
+            chunk: List[dict] = []
+            for values in self._spooled_rows():
+                chunk.append(dict(zip(columns, values)))
+                if len(chunk) >= row_group_size: writer.write(chunk); chunk = []
+            if chunk: writer.write(chunk)
+            files = writer.commit()
+        except Exception:
+            writer.abort(); raise
+        logger.info(f"Parquet 数据集 {dataset_root} 新增 {len(files)} 个分区文件")
+        return dataset_root
+
+    def finalize(self, region: Optional[str] = None, total_count: Optional[int] = None) -> Optional[str]:
+        if not self.rows:
+            logger.info(f"缓冲区中无数据可刷新至 {self.output_format.upper()}。")
+            self.part_path.unlink(missing_ok=True); return None
+        region = region or self.region
+        total_count = self.rows if total_count is None else total_count
+        clean_region = re.sub(r'[^\w\s-]', '', region).replace(' ', '_')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_filename = f"{timestamp}_{clean_region}_{total_count}properties.{self.output_format}"
+        output_file_path = OUTPUT_DIR / output_filename
+        try:
+            if self.output_format == 'csv':
+                os.replace(self.part_path, output_file_path)
+            elif self.output_format == 'parquet':
+                output_file_path = self._finalize_parquet(region, f"{timestamp}_{total_count}properties")
+                self.part_path.unlink(missing_ok=True)
+            else:
+                tmp_path = output_file_path.with_name(f".{output_filename}.tmp")
+                self._finalize_xlsx(tmp_path)
+                os.replace(tmp_path, output_file_path)
+                self.part_path.unlink(missing_ok=True)
+            logger.info(f"已成功保存 {self.rows} 条记录到: {output_file_path} (区域: {region}, 总房源数: {total_count})")
+            return str(output_file_path)
+        except Exception as e:
+            logger.error(f"写入 {self.output_format.upper()} 文件 ({output_filename}) 失败: {e}，已写出的数据保留在 {self.part_path}", exc_info=True)
             return None
-        with self._lock:
-            try:
-                data_dicts = [item.to_dict() for item in self.buffer]
-                temp_df = pd.DataFrame(data_dicts)
-                df_final = pd.DataFrame(columns=EXPECTED_COLUMNS)
-                for col in EXPECTED_COLUMNS:
-                    if col in temp_df.columns:
-                        df_final[col] = temp_df[col]
-                    else:
-                        df_final[col] = "" 
-                
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                clean_region = re.sub(r'[^\w\s-]', '', region).replace(' ', '_')
 
-                if output_format.lower() == 'csv':
-                    output_filename = f"{timestamp}_{clean_region}_{total_count}properties.csv"
-                    output_file_path = OUTPUT_DIR / output_filename
-                    df_final.to_csv(output_file_path, index=False, encoding='utf-8-sig')
-                else:
-                    output_filename = f"{timestamp}_{clean_region}_{total_count}properties.xlsx"
-                    output_file_path = OUTPUT_DIR / output_filename
-                    df_final.to_excel(output_file_path, index=False, engine='openpyxl')
 
-                logger.info(f"已成功保存 {len(df_final)} 条记录到: {output_file_path} (区域: {region}, 总房源数: {total_count})")
-                self.buffer = []
-                return str(output_file_path)
-            except Exception as e:
-                logger.error(f"写入 {output_format.upper()} 文件 ({output_filename if 'output_filename' in locals() else 'unknown'}) 失败: {e}", exc_info=True)
-                return None
+class BatchWriter:
+    """
+    按 performance.batch_size 分批写入: 记录按来源 URL (route) 分别按列累积 (ColumnBatch)，满一批即追加到
+    该 URL 自己的输出流以及所有共享输出流 (合并文件)，内存占用只与批次大小有关。
+    多个 URL 并发处理时，各 URL 的记录互不混入对方的单 URL 文件。
+    """
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = max(1, int(batch_size or CONFIG.get('performance', {}).get('batch_size', 20) or 20))
+        self.buffers: Dict[Optional[str], ColumnBatch] = {}; self._lock = threading.Lock()
+        self.streams: Dict[str, OutputStream] = {}
+        self.shared: Set[str] = set()
+        ensure_dirs()
+        leftovers = sorted(OUTPUT_DIR.glob('.*.part'))
+        if leftovers: logger.warning(f"发现上次未完成的输出临时文件 (可手动恢复): {[p.name for p in leftovers]}")
+    def open(self, key: str, region: str, output_format: str = 'xlsx', shared: bool = False) -> None:
+        """打开输出流: shared=True 时接收所有记录 (合并文件)，否则只接收 route 为 key 的记录"""
+        with self._lock:
+            if shared:
+                for route in list(self.buffers): self._write_batch(route)
+                self.shared.add(key)
+            else:
+                self._write_batch(key)
+            self.streams[key] = OutputStream(region, output_format)
+    def add(self, item: PropertyData, route: Optional[str] = None) -> None:
+        """route 为记录所属 URL 的输出流 key；route 为 None 时记录只进入共享输出流"""
+        with self._lock:
+            if route not in self.streams and not self.shared:
+                raise ValueError(f"没有可接收记录的输出流 (route={route!r})，请先 open() 对应的输出流或共享输出流")
+            batch = self.buffers.get(route)
+            if batch is None: batch = self.buffers[route] = ColumnBatch()
+            batch.append(item)
+            if len(batch) >= self.batch_size: self._write_batch(route)
+    def _write_batch(self, route: Optional[str]) -> None:
+        batch = self.buffers.pop(route, None)
+        if not batch: return
+        with METRICS.timer('write'):
+            for key, stream in self.streams.items():
+                if key == route or key in self.shared: stream.write(batch)
+        METRICS.inc('listings_written', len(batch))
+    def rows(self, key: str) -> int:
+        with self._lock:
+            stream = self.streams.get(key)
+            pending = sum(map(len, self.buffers.values())) if key in self.shared else len(self.buffers.get(key) or ())
+            return (stream.rows if stream else 0) + pending
+    def close(self, key: str, region: Optional[str] = None, total_count: Optional[int] = None) -> Optional[str]:
+        """写出剩余批次并生成 key 对应的正式输出文件"""
+        with self._lock:
+            for route in (list(self.buffers) if key in self.shared else [key]): self._write_batch(route)
+            self.shared.discard(key)
+            stream = self.streams.pop(key, None)
+            if stream is None: return None
+            with METRICS.timer('finalize'):
+                output_path = stream.finalize(region, total_count)
+            if output_path and (CONFIG.get('metrics', {}) or {}).get('write_summary', True):
+                METRICS.write_summary(output_path, rows=stream.rows, format=stream.output_format)
+            return output_path
 
 # =============================================================================
-# 爬虫核心
+# 页面解析 - 详情页快速路径
 # =============================================================================
-class DomainCrawler:
+_NEXT_DATA_RE = re.compile(rb'<script[^>]*\bid=["\']?__NEXT_DATA__["\']?[^>]*>(.*?)</script\s*>', re.S | re.I)
+_TAG_NAME_RE = re.compile(rb'<([a-zA-Z][\w-]*)')
+_TAG_BOUNDARY_RE: Dict[bytes, 're.Pattern[bytes]'] = {}
+_EMPTY_DOC = etree.HTML("<html><body></body></html>")
+
+def _attr_markers(attr: str, value: str) -> Tuple[bytes, ...]:
+    return (f'{attr}="{value}"'.encode(), f"{attr}='{value}'".encode())
+
+def _element_end(raw: bytes, start: int) -> int:
+    """从 start 处的开始标签起，按同名标签的嵌套深度找到元素结束位置"""
+    m = _TAG_NAME_RE.match(raw, start)
+    if not m: return start
+    tag = m.group(1).lower()
+    pattern = _TAG_BOUNDARY_RE.get(tag)
+    if pattern is None:
+        pattern = _TAG_BOUNDARY_RE[tag] = re.compile(rb'<(/?)' + re.escape(tag) + rb'\b[^>]*>', re.I)
+    depth = 0
+    for t in pattern.finditer(raw, start):
+        if t.group(1): depth -= 1
+        elif not t.group(0).endswith(b'/>'): depth += 1
+        if depth <= 0: return t.end()
+    return len(raw)
+
+class ParseStats:
+    """统计页面解析: 页面字节 vs 实际构建 DOM 的字节、耗时，以及每个 DOM 字段命中的选择器与耗时"""
     def __init__(self):
-        self.request_manager = RequestManager(); self.feature_extractor = FeatureExtractor()
-        self.data_cleaner = DataCleaner(); self.data_validator = DataValidator()
-        self.batch_writer = BatchWriter(); self._lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.pages = 0; self.page_bytes = 0; self.dom_bytes = 0; self.seconds = 0.0
+        self.field_hits: Dict[str, Dict[str, int]] = {}
+        self.field_seconds: Dict[str, float] = {}
+    def record(self, page: 'DetailPage', seconds: float) -> None:
+        with self._lock:
+            self.pages += 1; self.page_bytes += len(page.raw); self.dom_bytes += page.dom_bytes; self.seconds += seconds
+            for name, label, elapsed in page.field_hits: self._record_field(name, label, elapsed)
+    def record_field(self, name: str, label: Optional[str], seconds: float) -> None:
+        with self._lock: self._record_field(name, label, seconds)
+    def drain(self) -> Dict[str, Any]:
+        """取出并清零当前统计 (解析进程每页回传给主进程合并)"""
+        with self._lock:
+            snap = {'pages': self.pages, 'page_bytes': self.page_bytes, 'dom_bytes': self.dom_bytes, 'seconds': self.seconds,
+                    'field_hits': self.field_hits, 'field_seconds': self.field_seconds}
+            self.pages = 0; self.page_bytes = 0; self.dom_bytes = 0; self.seconds = 0.0
+            self.field_hits = {}; self.field_seconds = {}
+        return snap
+    def merge(self, snap: Dict[str, Any]) -> None:
+        with self._lock:
+            self.pages += snap['pages']; self.page_bytes += snap['page_bytes']
+            self.dom_bytes += snap['dom_bytes']; self.seconds += snap['seconds']
+            for name, hits in snap['field_hits'].items():
+                mine = self.field_hits.setdefault(name, {})
+                for label, n in hits.items(): mine[label] = mine.get(label, 0) + n
+            for name, sec in snap['field_seconds'].items(): self.field_seconds[name] = self.field_seconds.get(name, 0.0) + sec
+    def _record_field(self, name: str, label: Optional[str], seconds: float) -> None:
+        hits = self.field_hits.setdefault(name, {})
+        hits[label or '未命中'] = hits.get(label or '未命中', 0) + 1
+        self.field_seconds[name] = self.field_seconds.get(name, 0.0) + seconds
+    def summary(self) -> str:
+        fields_summary = "; ".join(
+            f"{name}[{', '.join(f'{label} {n}' for label, n in hits.items())}] 平均 {self.field_seconds[name] / sum(hits.values()) * 1000:.2f} ms"
+            for name, hits in self.field_hits.items()) or "无"
+        if not self.pages: return f"字段选择器: {fields_summary}"
+        n = self.pages
+        return (f"{n} 个详情页, 平均页面 {self.page_bytes / n / 1024:.0f} KB, 平均构建DOM {self.dom_bytes / n / 1024:.1f} KB, "
+                f"平均解析 {self.seconds / n * 1000:.1f} ms; 字段选择器: {fields_summary}")
+
+class DetailPage:
+    """
+    详情页快速解析: 直接在响应字节上定位并解码 __NEXT_DATA__，不构建整棵 DOM。
+    只存在于 HTML 中的字段 (房源特征列表、联系表单、电话按钮、看房时间块) 仅解析其所在元素的片段，
+    更少见的回退 (房源类型、中介 logo) 才惰性构建完整 DOM。fast=False 时始终使用完整 DOM。
+    """
+    def __init__(self, raw: Union[str, bytes], encoding: Optional[str] = None, fast: bool = True):
+        if isinstance(raw, str): raw, encoding = raw.encode('utf-8'), 'utf-8'
+        self.raw = raw; self.encoding = encoding or 'utf-8'; self.fast = fast
+        self._document: Optional[etree._Element] = None
+        self._fragments: Dict[Tuple[bytes, ...], etree._Element] = {}
+        self.dom_bytes = 0; self.field_hits: List[Tuple[str, Optional[str], float]] = []
+
+    @property
+    def document(self) -> etree._Element:
+        if self._document is None:
+            self._document = etree.HTML(self.raw.decode(self.encoding, errors='replace'))
+            self.dom_bytes += len(self.raw)
+        return self._document
+
+    def next_data(self) -> Optional[dict]:
+        if self.fast:
+            m = _NEXT_DATA_RE.search(self.raw)
+            payload = m.group(1).decode(self.encoding, errors='replace') if m else ""
+        else:
+            payload = "".join(_XPATH_NEXT_DATA(self.document))
+        return json.loads(payload) if payload.strip() else None
+
+    def context(self, markers: Tuple[bytes, ...]) -> etree._Element:
+        """选择器的查询上下文: markers 为空时为完整 DOM，否则为包含 markers 的元素片段 (同一页内缓存)"""
+        if not markers or not self.fast or self._document is not None: return self.document
+        frag = self._fragments.get(markers)
+        if frag is None: frag = self._fragments[markers] = self._fragment(markers)
+        return frag
+
+    def _fragment(self, markers: Tuple[bytes, ...]) -> etree._Element:
+        """返回由包含 markers 的所有元素组成的局部 DOM (保持文档顺序)"""
+        spans = []
+        for marker in markers:
+            pos = 0
+            while (idx := self.raw.find(marker, pos)) >= 0:
+                start = self.raw.rfind(b'<', 0, idx)
+                end = _element_end(self.raw, start) if start >= 0 else idx + len(marker)
+                if start >= 0 and end > idx: spans.append((start, end))
+                pos = max(end, idx + len(marker))
+        if not spans: return _EMPTY_DOC
+        spans.sort()
+        parts, last_end = [], -1
+        for start, end in spans:
+            if start >= last_end: parts.append(self.raw[start:end]); last_end = end
+        frag = b''.join(parts); self.dom_bytes += len(frag)
+        return etree.HTML('<html><body>' + frag.decode(self.encoding, errors='replace') + '</body></html>')
+
+# =============================================================================
+# 页面解析 - 声明式 DOM 字段提取
+# =============================================================================
+_XPATH_STRING = etree.XPath("string(.)", smart_strings=False)
+_XPATH_NEXT_DATA = etree.XPath(".//script[@id='__NEXT_DATA__']/text()", smart_strings=False)
+_XPATH_INSPECTION_DAY = etree.XPath('.//span[@data-testid="listing-details__inspections-block-day"]/text()', smart_strings=False)
+_XPATH_INSPECTION_TIME = etree.XPath('.//span[@data-testid="listing-details__inspections-block-time"]/text()', smart_strings=False)
+
+class FieldSelector:
+    """
+    字段的一个候选选择器，XPath 在注册时编译一次。
+    markers: 详情页中定位局部 DOM 的属性标记 (空表示需要完整 DOM)；
+    convert: 对每个结果做转换，返回 None 表示不接受该结果 (交给下一个选择器)。
+    """
+    __slots__ = ('label', 'xpath', 'markers', 'convert')
+    def __init__(self, label: str, expr: str, markers: Tuple[bytes, ...] = (), convert: Optional[Callable[[Any], Any]] = None):
+        self.label = label; self.markers = markers; self.convert = convert
+        self.xpath = etree.XPath(expr, smart_strings=False)
+
+class FieldExtractor:
+    """按顺序尝试各选择器，第一个有结果的即返回 (many=True 时返回该选择器的全部结果)"""
+    def __init__(self, name: str, *selectors: FieldSelector, many: bool = False):
+        self.name = name; self.selectors = selectors; self.many = many
+
+    def extract(self, context_for: Callable[[FieldSelector], etree._Element], **variables: Any) -> Tuple[Any, Optional[str]]:
+        for sel in self.selectors:
+            values = sel.xpath(context_for(sel), **variables)
+            if self.many:
+                if sel.convert: values = [v for v in map(sel.convert, values) if v is not None]
+                if values: return values, sel.label
+            elif values:
+                value = sel.convert(values[0]) if sel.convert else values[0]
+                if value: return value, sel.label
+        return ([] if self.many else ""), None
+
+    def extract_node(self, node: etree._Element, **variables: Any) -> Tuple[Any, Optional[str]]:
+        return self.extract(lambda sel: node, **variables)
+
+class FieldRegistry:
+    """详情页 DOM 字段注册表: 按注册顺序一次性解析所需字段，同一页内的局部 DOM 在字段间共享"""
+    def __init__(self, *extractors: FieldExtractor):
+        self.extractors = extractors
+
+    def extract(self, page: DetailPage, wanted: Set[str]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        for ex in self.extractors:
+            if ex.name not in wanted: continue
+            started = time.perf_counter()
+            results[ex.name], label = ex.extract(lambda sel: page.context(sel.markers))
+            page.field_hits.append((ex.name, label, time.perf_counter() - started))
+        return results
+
+def _strip_or_none(value: str) -> Optional[str]:
+    return value.strip() or None
+
+def _feature_text(li: etree._Element) -> Optional[str]:
+    text = _XPATH_STRING(li)
+    return text.strip() if text else None
+
+def _inspection_slot(block: etree._Element) -> Optional[str]:
+    d_el, t_el = _XPATH_INSPECTION_DAY(block), _XPATH_INSPECTION_TIME(block)
+    return f"{d_el[0].strip()}, {t_el[0].strip()}" if d_el and t_el else None
+
+def _tel_number(href: str) -> Optional[str]:
+    return href.replace("tel:", "").strip() if href.startswith("tel:") else None
+
+_CTA_BOX = _attr_markers('data-testid', 'listing-details__agent-details-cta-box')
+_PHONE_CTA = _attr_markers('data-testid', 'listing-details__phone-cta-button')
+
+DETAIL_FIELDS = FieldRegistry(
+    FieldExtractor('property_features',
+                   FieldSelector('feature_list', "//div[@id='property-features']//li", _attr_markers('id', 'property-features'), _feature_text),
+                   many=True),
+    FieldExtractor('enquiry_form',
+                   FieldSelector('apply_link', '//div[@data-testid="listing-details__agent-details-cta-box"]//a[contains(@href, "snug.com") or contains(@href, "2apply.com.au")]/@href', _CTA_BOX, _strip_or_none),
+                   FieldSelector('oneform', '//div[@data-testid="listing-details__agent-details-cta-box"]//form[@data-testid="listing-details__oneform-button-form"]/@action', _CTA_BOX, _strip_or_none),
+                   FieldSelector('css_form', '//div[@data-testid="listing-details__agent-details-cta-box"]//form[contains(@class, "css-")]/@action', _CTA_BOX, _strip_or_none),
+                   FieldSelector('legacy_form', "//form[@id='enquiry-form']/@action", _attr_markers('id', 'enquiry-form'), _strip_or_none)),
+    FieldExtractor('property_type',
+                   FieldSelector('type_span', '//span[@class="css-1efi8gv"]/text()', (), _strip_or_none)),
+    FieldExtractor('agent_phone',
+                   FieldSelector('tel_href', '//a[@data-testid="listing-details__phone-cta-button"]/@href', _PHONE_CTA, _tel_number),
+                   FieldSelector('button_text', '//a[@data-testid="listing-details__phone-cta-button"]/span[@class="css-1s26z8e"]/span/text()', _PHONE_CTA, _strip_or_none)),
+    FieldExtractor('agent_logo',
+                   FieldSelector('branding_img', '//a[@class="css-wrjy08"]/img[@data-testid="listing-details__agent-details-branding-lazy"]/@src', (), _strip_or_none)),
+    FieldExtractor('inspection_times',
+                   FieldSelector('inspection_block', '//div[@data-testid="listing-details__inspections-block"]',
+                                 _attr_markers('data-testid', 'listing-details__inspections-block'), _inspection_slot),
+                   many=True),
+)
+
+# 搜索结果页: $host 为站点主机名 (运行时传入，便于切换 network.base_url)
+SEARCH_RESULT_ITEMS = etree.XPath(".//ul[@data-testid='results']/li")
+SEARCH_LINKS = FieldExtractor('search_links',
+    FieldSelector('result_links', ".//ul[@data-testid='results']/li//a[contains(@href, $host) and string-length(@href) > 40]/@href"),
+    many=True)
+SEARCH_ITEM_LINK = FieldExtractor('search_item_link',
+    FieldSelector('card_link', ".//a[contains(@class, 'address') or @data-testid='listing-card-link' or contains(@href,'/1')]/@href"),
+    FieldSelector('qrqvvg_link', ".//div[@class='css-qrqvvg']/a/@href"),
+    FieldSelector('host_link', "(.//a[contains(@href, $host)])[1]/@href"))
+SEARCH_ITEM_HREFS = etree.XPath(".//a/@href", smart_strings=False)
+
+# =============================================================================
+# 详情页解析 (不涉及网络，可在解析进程中独立创建)
+# =============================================================================
+class DetailParser:
+    def __init__(self, fast: Optional[bool] = None):
+        self.feature_extractor = FeatureExtractor(); self.data_cleaner = DataCleaner(); self.data_validator = DataValidator()
+        self.fast_detail_parse = CONFIG.get('features', {}).get('fast_detail_parse', True) if fast is None else fast
+        self.parse_stats = ParseStats()
     
-    def _extract_inspection_times(self, document: etree._Element) -> List[str]:
-        times = []
-        for b in document.xpath('//div[@data-testid="listing-details__inspections-block"]'):
-            try:
-                d_el = b.xpath('.//span[@data-testid="listing-details__inspections-block-day"]/text()')
-                t_el = b.xpath('.//span[@data-testid="listing-details__inspections-block-time"]/text()')
-                if d_el and t_el: times.append(f"{d_el[0].strip()}, {t_el[0].strip()}")
-            except Exception as e: logger.debug(f"_extract_inspection_times method 1 error: {e}")
+    def _extract_inspection_times(self, dom_fields: Dict[str, Any], base_json: dict) -> List[str]:
+        times = list(dom_fields.get('inspection_times') or [])
         if not times:
             try:
-                js_txt = "".join(document.xpath(".//script[@id='__NEXT_DATA__']/text()"))
-                if js_txt:
-                    js_data = json.loads(js_txt)
-                    props = js_data.get("props", {}).get("pageProps", {}).get("componentProps", {})
-                    for i_item in props.get("inspectionDetails", {}).get("inspections", []):
-                        st, et = i_item.get("startTime", ""), i_item.get("endTime", "")
-                        if st and et: times.append(f"{st} - {et}")
+                props = base_json.get("props", {}).get("pageProps", {}).get("componentProps", {})
+                for i_item in props.get("inspectionDetails", {}).get("inspections", []):
+                    st, et = i_item.get("startTime", ""), i_item.get("endTime", "")
+                    if st and et: times.append(f"{st} - {et}")
             except Exception as e: logger.debug(f"_extract_inspection_times method 2 error: {e}")
         return times
     
@@ -625,17 +1439,15 @@ class DomainCrawler:
         logger.debug(f"卧室数为0但未找到Studio关键词，默认返回Studio")
         return "Studio"
     
-    def crawl_detail(self, house_href: str) -> Optional[PropertyData]:
+    def parse_detail(self, house_href: str, html: Union[str, bytes], encoding: Optional[str] = None) -> Optional[PropertyData]:
+        """解析详情页响应 (字节或文本) 为 PropertyData (不涉及网络，可供同步/异步引擎共用)"""
         try:
-            logger.info(f"正在抓取详情页: {house_href}")
-            response = self.request_manager.get(house_href)
-            if not response: return None
-            house_document = etree.HTML(response.text)
+            started = time.perf_counter()
+            page = DetailPage(html, encoding, fast=self.fast_detail_parse)
             
             try:
-                json_script = "".join(house_document.xpath(".//script[@id='__NEXT_DATA__']/text()"))
-                if not json_script: logger.error(f"__NEXT_DATA__ script tag not found: {house_href}"); return None
-                base_json = json.loads(json_script)
+                base_json = page.next_data()
+                if not base_json: logger.error(f"__NEXT_DATA__ script tag not found: {house_href}"); return None
             except Exception as e: logger.error(f"解析详情页JSON失败 for {house_href}: {e}", exc_info=True); return None
             
             comp_props = base_json.get("props", {}).get("pageProps", {}).get("componentProps", {})
@@ -644,13 +1456,22 @@ class DomainCrawler:
             agents_list = root_q.get("agents", []); agent_p = agents_list[0] if agents_list else {}
             addr_info = root_q.get("displayableAddress", {}) or {}; geo_info = addr_info.get("geolocation", {}) or {}
             
-            prop_feat_els = house_document.xpath("//div[@id='property-features']//li")
-            prop_feat_list = [li.xpath("string(.)").strip() for li in prop_feat_els if li.xpath("string(.)")]
+            agent_phone_val = agent_p.get("phoneNumber", "")
+            property_type_val = root_q.get("propertyType", "")
+            agent_logo_url_val = (agent_p.get("agency", {}) or {}).get("logoUrl", "")
+            # JSON 中缺失的字段才回退到 DOM，所需字段由注册表一次性解析
+            wanted = {'property_features', 'enquiry_form', 'inspection_times'}
+            if not agent_phone_val or agent_phone_val.strip().lower() == "call" or not agent_phone_val.strip(): wanted.add('agent_phone')
+            if not property_type_val: wanted.add('property_type')
+            if not agent_logo_url_val: wanted.add('agent_logo')
+            dom_fields = DETAIL_FIELDS.extract(page, wanted)
+            prop_feat_list = dom_fields['property_features']
             
             # 修正 2: 提取 headline 并将其传递给 extract 方法
             headline_text = root_q.get("headline", "")
             description_text = root_q.get("description", "")
-            features_obj = self.feature_extractor.extract(root_q, headline_text, description_text, prop_feat_list)
+            with METRICS.timer('extract'):
+                features_obj = self.feature_extractor.extract(root_q, headline_text, description_text, prop_feat_list)
             
             img_urls_raw = [img.get("url", "") for img in root_q.get("largeMedia", []) if img.get("url")]
             images_json = json.dumps(img_urls_raw)
@@ -658,44 +1479,10 @@ class DomainCrawler:
             cover_image_val = img_urls_raw[0] if img_urls_raw else ""
             property_features_json = json.dumps(prop_feat_list)
 
-            enquiry_form_action = ""
-            apply_link_el = house_document.xpath('//div[@data-testid="listing-details__agent-details-cta-box"]//a[contains(@href, "snug.com") or contains(@href, "2apply.com.au")]/@href')
-            if apply_link_el:
-                enquiry_form_action = apply_link_el[0].strip()
-            
-            if not enquiry_form_action:
-                oneform_action_el = house_document.xpath('//div[@data-testid="listing-details__agent-details-cta-box"]//form[@data-testid="listing-details__oneform-button-form"]/@action')
-                if not oneform_action_el:
-                    oneform_action_el = house_document.xpath('//div[@data-testid="listing-details__agent-details-cta-box"]//form[contains(@class, "css-")]/@action')
-                if oneform_action_el:
-                    enquiry_form_action = oneform_action_el[0].strip()
-            
-            if not enquiry_form_action:
-                original_enquiry_el = house_document.xpath("//form[@id='enquiry-form']/@action")
-                if original_enquiry_el:
-                    enquiry_form_action = original_enquiry_el[0].strip()
-
-            property_type_val = root_q.get("propertyType", "")
-            if not property_type_val:
-                property_type_elements = house_document.xpath('//span[@class="css-1efi8gv"]/text()')
-                if property_type_elements:
-                    property_type_val = property_type_elements[0].strip()
-
-            agent_phone_val = agent_p.get("phoneNumber", "")
-            if not agent_phone_val or agent_phone_val.strip().lower() == "call" or not agent_phone_val.strip():
-                agent_phone_href_el = house_document.xpath('//a[@data-testid="listing-details__phone-cta-button"]/@href')
-                if agent_phone_href_el and agent_phone_href_el[0].startswith("tel:"):
-                    agent_phone_val = agent_phone_href_el[0].replace("tel:", "").strip()
-                else:
-                    agent_phone_el_text = house_document.xpath('//a[@data-testid="listing-details__phone-cta-button"]/span[@class="css-1s26z8e"]/span/text()')
-                    if agent_phone_el_text:
-                         agent_phone_val = agent_phone_el_text[0].strip()
-
-            agent_logo_url_val = (agent_p.get("agency", {}) or {}).get("logoUrl", "") 
-            if not agent_logo_url_val:
-                agent_logo_el = house_document.xpath('//a[@class="css-wrjy08"]/img[@data-testid="listing-details__agent-details-branding-lazy"]/@src')
-                if agent_logo_el:
-                    agent_logo_url_val = agent_logo_el[0].strip()
+            enquiry_form_action = dom_fields['enquiry_form']
+            property_type_val = property_type_val or dom_fields.get('property_type', "")
+            agent_phone_val = dom_fields.get('agent_phone') or agent_phone_val
+            agent_logo_url_val = agent_logo_url_val or dom_fields.get('agent_logo', "")
 
             bedrooms_raw = list_sum.get("beds", 0)
             bedroom_display_val = self._generate_bedroom_display(
@@ -714,7 +1501,7 @@ class DomainCrawler:
                 parking_spaces=list_sum.get("parking", 0),
                 bedroom_display=bedroom_display_val,
                 available_date=self.data_cleaner.clean_available_date((root_q.get("dateAvailableV2", {}) or {}).get("isoDate", "")),
-                inspection_times=self._extract_inspection_times(house_document),
+                inspection_times=self._extract_inspection_times(dom_fields, base_json),
                 agency_name=(root_q.get("agency", {}) or {}).get("name", ""),
                 agent_name=agent_p.get("fullName", ""), 
                 cover_image=cover_image_val,
@@ -735,42 +1522,246 @@ class DomainCrawler:
             )
             
             if CONFIG['features'].get('enable_data_validation', False):
-                is_valid, errors = self.data_validator.validate_property(data_item)
+                with METRICS.timer('validate'):
+                    is_valid, errors = self.data_validator.validate_property(data_item)
                 if not is_valid: logger.warning(f"数据验证失败 for {house_href}: {errors}")
             
+            elapsed = time.perf_counter() - started
+            self.parse_stats.record(page, elapsed)
+            METRICS.observe('parse', elapsed); METRICS.inc('listings_parsed')
             logger.info(f"成功提取房源信息: ID={data_item.listing_id or 'N/A'} for URL: {house_href}")
-            if CONFIG['features']['enable_batch_write']: self.batch_writer.add(data_item)
             return data_item
+        except Exception as e:
+            METRICS.inc('parse_errors')
+            logger.error(f"解析详情页失败: {house_href}", exc_info=True); return None
+
+# =============================================================================
+# 爬虫核心
+# =============================================================================
+def distributed_queue_path() -> Path:
+    """多节点模式的共享队列文件 (distributed.queue_file；相对路径位于 output 目录)"""
+    path = Path((CONFIG.get('distributed', {}) or {}).get('queue_file') or 'work_queue.sqlite3')
+    return path if path.is_absolute() else OUTPUT_DIR / path
+
+_SEARCH_NEXT_DATA_RE = re.compile(r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.S)
+
+class DomainCrawler:
+    def __init__(self):
+        self.request_manager = RequestManager(); self.detail_parser = DetailParser()
+        self.data_cleaner = DataCleaner()
+        self.batch_writer = BatchWriter(); self._lock = threading.Lock()
+        self.max_workers = max(1, int(CONFIG.get('performance', {}).get('max_workers', 1) or 1))
+        self.engine = CONFIG.get('performance', {}).get('engine', 'threads')
+        self.parse_stats = self.detail_parser.parse_stats
+        index_cfg = CONFIG.get('index', {}) or {}
+        self.listing_index: Optional[ListingIndex] = None
+        if index_cfg.get('enabled', False) and self.request_manager.replay:
+            logger.info("回放模式下不使用增量索引，所有房源均从归档页面重新解析")
+        elif index_cfg.get('enabled', False):
+            self.listing_index = ListingIndex(OUTPUT_DIR / index_cfg.get('file', 'listing_index.sqlite3'),
+                                              max_age_days=index_cfg.get('max_age_days', 7))
+            logger.info(f"已启用增量抓取索引: {self.listing_index.path}")
+        dedupe_cfg = CONFIG.get('dedupe', {}) or {}
+        self.seen: Optional[SeenSet] = None
+        if dedupe_cfg.get('enabled', True):
+            persist_file = dedupe_cfg.get('persist_file') or None
+            self.seen = SeenSet(exact_limit=int(dedupe_cfg.get('exact_limit', 500000)), capacity=int(dedupe_cfg.get('capacity', 5000000)),
+                                error_rate=float(dedupe_cfg.get('error_rate', 0.001)), path=OUTPUT_DIR / persist_file if persist_file else None)
+        self.journal: Optional[CrawlJournal] = None  # run() 开始时按 journal 配置打开
+        self.profiler = None  # run() 开始时按 profiling 配置开启 (profiler.RunProfiler)
+    
+    def fetch_detail(self, house_href: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """下载详情页，返回 (响应字节, 编码)；失败时返回 None"""
+        try:
+            logger.info(f"正在抓取详情页: {house_href}")
+            response = self.request_manager.get(house_href)
+            if not response: return None
         except Exception as e:
             logger.error(f"抓取详情页失败: {house_href}", exc_info=True); return None
+        return response.content, response.encoding
+
+    def crawl_detail(self, house_href: str) -> Optional[PropertyData]:
+        fetched = self.fetch_detail(house_href)
+        return self.parse_detail(house_href, *fetched) if fetched else None
+
+    def parse_detail(self, house_href: str, html: Union[str, bytes], encoding: Optional[str] = None) -> Optional[PropertyData]:
+        return self.detail_parser.parse_detail(house_href, html, encoding)
     
+    def _crawl_detail_task(self, detail_url: str) -> Optional[PropertyData]:
+        """线程池任务: 抓取单个详情页 (节奏由 RequestManager 的礼貌控制器统一控制)"""
+        try:
+            return self.crawl_detail(detail_url)
+        except Exception as e:
+            logger.error(f"处理房源 {detail_url} 失败: {e}", exc_info=True)
+            self.request_manager.politeness.backoff('detail')
+            return None
+
+    def plan_details(self, links: List[str], cards: Optional[Dict[str, Dict[str, Any]]]) -> Tuple[List[str], Dict[str, str], Dict[str, str]]:
+        """
+        先去掉本次运行中已由其他页/其他 URL 领取过的房源 (不请求也不写出)，
+        再借助房源索引挑出需要请求详情页的链接，其余复用索引中的记录。
+        断点续跑时预写日志中已有的房源已从日志重建到输出，最先去掉。
+        """
+        if self.journal is not None:
+            pending = [link for link in links if not self.journal.has(link)]
+            if len(pending) < len(links): logger.info(f"断点续跑: 跳过 {len(links) - len(pending)}/{len(links)} 个预写日志中已完成的房源")
+            links = pending
+        if self.seen is not None:
+            fresh = [link for link in links if self.seen.claim(listing_key(link))]
+            if len(fresh) < len(links): logger.info(f"跨URL去重: 跳过 {len(links) - len(fresh)}/{len(links)} 个本次运行已处理的房源")
+            links = fresh
+        if self.listing_index is None or cards is None:
+            return links, {}, {}
+        to_crawl, reused, fingerprints = self.listing_index.partition(links, cards)
+        if reused: logger.info(f"增量抓取: {len(reused)}/{len(links)} 个房源未变化，复用索引记录")
+        return to_crawl, reused, fingerprints
+
+    def journal_detail(self, link: str, data_item: Optional[PropertyData], lane: Optional[str] = None) -> None:
+        """
+        单个详情页完成即写入预写日志 (不等所在搜索页写出)，崩溃后续跑时该房源从日志重建、不再请求。
+        lane 为 None 时取当前线程所属的 URL (pipeline 的解析线程未绑定 URL，需显式传入)
+        """
+        if self.journal is None or not data_item: return
+        self.journal.record_item(lane if lane is not None else self.request_manager.politeness.current_lane(), link, data_item.to_json())
+
+    def collect_details(self, links: List[str], crawled: Dict[str, Optional[PropertyData]],
+                        reused: Dict[str, str], fingerprints: Dict[str, str]) -> List[Optional[PropertyData]]:
+        """
+        按 links 顺序合并新抓取与复用的记录，更新索引并写入 BatchWriter。
+        新抓取的记录已由各引擎在完成时写入预写日志 (journal_detail)，这里只记录复用索引的房源
+        """
+        results: List[Optional[PropertyData]] = []
+        for link in links:
+            if link in reused:
+                data_item = PropertyData.from_json(reused[link])
+                data_item.available_date = self.data_cleaner.clean_available_date(data_item.available_date)
+            else:
+                data_item = crawled.get(link)
+                if data_item and self.listing_index is not None and fingerprints.get(link):
+                    self.listing_index.update(link, data_item.listing_id, fingerprints[link], data_item.to_json())
+            results.append(data_item)
+        if self.seen is not None:
+            # plan_details 领取的房源: 产出记录才正式登记，失败的放回，之后的页面/URL 仍可重试
+            for link, data_item in zip(links, results):
+                if link in crawled or link in reused:
+                    if data_item: self.seen.confirm(listing_key(link))
+                    else: self.seen.release(listing_key(link))
+        lane = self.request_manager.politeness.current_lane()
+        if self.journal is not None:
+            for link, data_item in zip(links, results):
+                if data_item and link in reused: self.journal.record_item(lane, link, data_item.to_json())
+        if CONFIG['features']['enable_batch_write']:
+            for data_item in results:
+                if data_item: self.batch_writer.add(data_item, lane)
+        return results
+
+    def checkpoint_page(self, page: int) -> None:
+        """该搜索页的房源已全部交给输出 (collect_details 之后调用)，在预写日志中记录游标 (续跑从下一页开始)"""
+        if self.journal is not None: self.journal.record_page(self.request_manager.politeness.current_lane(), page)
+        if self.profiler is not None: self.profiler.page_boundary(self.request_manager.politeness.current_lane(), page)
+
+    def resume_page(self) -> int:
+        """断点续跑时当前 URL 应从哪一页继续 (预写日志游标之后)"""
+        return self.journal.cursor(self.request_manager.politeness.current_lane()) + 1 if self.journal is not None else 1
+
+    def crawl_details(self, links: List[str], pool: Optional[ThreadPoolExecutor] = None,
+                      cards: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Optional[PropertyData]]:
+        """
+        并发抓取一页中的所有详情页。
+        所有 worker 共享同一个 RequestManager 的速率限制；结果按 links 顺序返回并写入 BatchWriter，
+        因此输出与串行运行一致。提供搜索卡片数据 (cards) 且启用索引时，未变化的房源不再请求。
+        """
+        to_crawl, reused, fingerprints = self.plan_details(links, cards)
+        crawled: Dict[str, Optional[PropertyData]] = {}
+        if pool is None or self.max_workers <= 1:
+            for i_idx, detail_url in enumerate(to_crawl):
+                logger.info(f"处理第{i_idx+1}/{len(to_crawl)}个房源: {detail_url}")
+                crawled[detail_url] = self._crawl_detail_task(detail_url)
+                self.journal_detail(detail_url, crawled[detail_url])
+        else:
+            logger.info(f"使用 {self.max_workers} 个线程并发处理 {len(to_crawl)} 个房源")
+            futures = {pool.submit(self._crawl_detail_task, detail_url): detail_url for detail_url in to_crawl}
+            for future in as_completed(futures):
+                crawled[futures[future]] = future.result()
+                self.journal_detail(futures[future], crawled[futures[future]])
+        return self.collect_details(links, crawled, reused, fingerprints)
+
+    def fetch_search_page(self, url: str) -> Optional[str]:
+        try:
+            resp = self.request_manager.get(url, endpoint='search')
+            return resp.text if resp else None
+        except Exception as e: logger.error(f"处理搜索页面失败: {url}", exc_info=True); return None
+
     def process_search_page(self, url: str) -> List[str]:
+        html_text = self.fetch_search_page(url)
+        return self.parse_search_page(url, html_text) if html_text else []
+
+    @staticmethod
+    def _search_component_props(html_text: str) -> Dict[str, Any]:
+        m = _SEARCH_NEXT_DATA_RE.search(html_text)
+        return json.loads(m.group(1)).get("props", {}).get("pageProps", {}).get("componentProps", {}) if m else {}
+
+    def parse_total_pages(self, html_text: str, page_size: int) -> Optional[int]:
+        """从搜索页 __NEXT_DATA__ 读取总页数 (totalPages，缺失时由 totalListings 和本页房源数推算)；无法确定时返回 None"""
+        try:
+            comp_props = self._search_component_props(html_text)
+            if comp_props.get("totalPages"): return int(comp_props["totalPages"])
+            total = comp_props.get("totalListings")
+            if total is not None and page_size > 0: return max(1, -(-int(total) // page_size))
+        except Exception as e: logger.debug(f"解析搜索结果总数失败: {e}")
+        return None
+
+    def parse_search_cards(self, html_text: str) -> Dict[str, Dict[str, Any]]:
+        """
+        提取搜索页中每个房源卡片的摘要 (价格/卧室/标题等)，键为详情页 URL。
+        优先使用 __NEXT_DATA__ 的 listingsMap，缺失时退化为结果列表中每个卡片的文本。
+        """
+        cards: Dict[str, Dict[str, Any]] = {}
+        try:
+            comp_props = self._search_component_props(html_text)
+            for lid, listing in (comp_props.get("listingsMap") or {}).items():
+                model = (listing or {}).get("listingModel") or {}
+                url = model.get("url", "")
+                if not url: continue
+                if url.startswith("/"): url = SITE_BASE_URL + url
+                feats = model.get("features") or {}
+                cards[url] = {'listing_id': str(listing.get("id", lid)), 'price': model.get("price", ""),
+                              'beds': feats.get("beds"), 'baths': feats.get("baths"), 'parking': feats.get("parking"),
+                              'property_type': feats.get("propertyType", ""), 'headline': model.get("headline", "")}
+            if not cards:
+                for li in SEARCH_RESULT_ITEMS(etree.HTML(html_text)):
+                    hrefs = SEARCH_ITEM_HREFS(li)
+                    href = next((h for h in hrefs if h.startswith(SITE_BASE_URL + "/") or h.startswith("/")), None)
+                    if href:
+                        if href.startswith("/"): href = SITE_BASE_URL + href
+                        cards.setdefault(href, {'text': ' '.join(_XPATH_STRING(li).split())})
+        except Exception as e: logger.debug(f"解析搜索卡片失败: {e}")
+        return cards
+
+    def parse_search_page(self, url: str, html_text: str) -> List[str]:
+        """从搜索结果页 HTML 中提取房源详情链接 (不涉及网络)"""
         try:
-            resp = self.request_manager.get(url)
-            if not resp: return []
-            doc = etree.HTML(resp.text)
-            links = []
-            common_link_pattern = doc.xpath(".//ul[@data-testid='results']/li//a[contains(@href, 'www.domain.com.au') and string-length(@href) > 40]/@href")
-
-            if common_link_pattern:
-                links = [link for link in common_link_pattern if link.startswith("https://www.domain.com.au/")]
+            parse_started = time.perf_counter()
+            doc = etree.HTML(html_text)
+            started = time.perf_counter()
+            common_link_pattern, label = SEARCH_LINKS.extract_node(doc, host=SITE_HOST)
+            links = [link for link in common_link_pattern if link.startswith(SITE_BASE_URL + "/")]
+            self.parse_stats.record_field(SEARCH_LINKS.name, label if links else None, time.perf_counter() - started)
             
             if not links:
-                listing_items_xpath = ".//ul[@data-testid='results']/li"
-                link_xpath_inside_item = ".//a[contains(@class, 'address') or @data-testid='listing-card-link' or contains(@href,'/1')]/@href"
-                for item_element in doc.xpath(listing_items_xpath):
-                    href_list = item_element.xpath(link_xpath_inside_item)
-                    if not href_list: href_list = item_element.xpath(".//div[@class='css-qrqvvg']/a/@href")
-                    if not href_list: href_list = item_element.xpath("(.//a[contains(@href,'www.domain.com.au')])[1]/@href")
-
-                    if href_list:
-                        link_candidate = href_list[0]
-                        if link_candidate.startswith("/"): link_candidate = "https://www.domain.com.au" + link_candidate
-                        if link_candidate.startswith("https://www.domain.com.au/"): links.append(link_candidate)
+                for item_element in SEARCH_RESULT_ITEMS(doc):
+                    started = time.perf_counter()
+                    link_candidate, label = SEARCH_ITEM_LINK.extract_node(item_element, host=SITE_HOST)
+                    self.parse_stats.record_field(SEARCH_ITEM_LINK.name, label, time.perf_counter() - started)
+
+                    if link_candidate:
+                        if link_candidate.startswith("/"): link_candidate = SITE_BASE_URL + link_candidate
+                        if link_candidate.startswith(SITE_BASE_URL + "/"): links.append(link_candidate)
             
             if not links: logger.warning(f"在页面 {url} 上未找到房源链接，请检查XPath选择器。")
-            return list(set(links))
-        except Exception as e: logger.error(f"处理搜索页面失败: {url}", exc_info=True); return []
+            METRICS.observe('parse_search', time.perf_counter() - parse_started)
+            return list(dict.fromkeys(links))  # 去重并保持页面顺序，保证并发与串行结果一致
+        except Exception as e: logger.error(f"解析搜索页面失败: {url}", exc_info=True); return []
     
     def save_progress(self, url: str, page: int, progress_file_name: str) -> None:
         try:
@@ -787,66 +1778,199 @@ class DomainCrawler:
                 logger.info(f"从 {progress_file_name} 加载到上次进度: {prog.get('url','N/A')}, 页码 {prog.get('page','N/A')}"); return prog
         except Exception as e: logger.error(f"从 {progress_file_name} 加载进度失败: {e}"); return None
     
+    @staticmethod
+    def build_page_url(input_url: str, page: int) -> str:
+        # 修正 3: 正确地构造分页 URL
+        if '?' in input_url:
+            return f"{input_url}&page={page}"
+        if not input_url.endswith('/'):
+            input_url += '/'
+        return f"{input_url}?page={page}"
+
+    def load_search_page(self, s_url: str) -> Tuple[Optional[str], List[str], Optional[Dict[str, Dict[str, Any]]]]:
+        """抓取并解析一个搜索页，返回 (HTML, 房源链接, 搜索卡片 (仅启用索引时))"""
+        html_text = self.fetch_search_page(s_url)
+        if not html_text: return None, [], None
+        links = self.parse_search_page(s_url, html_text)
+        cards = self.parse_search_cards(html_text) if links and self.listing_index is not None else None
+        return html_text, links, cards
+
+    def iter_search_pages(self, input_url: str, prefix: str = "") -> Iterator[Tuple[int, List[str], Optional[Dict[str, Dict[str, Any]]]]]:
+        """
+        按页码顺序产出 (页码, 房源链接, 搜索卡片)。
+        第 1 页 __NEXT_DATA__ 中有总页数时，其余搜索页一次性全部调度并发抓取 (仍受搜索页速率限制)，
+        不再逐页试探末页；没有总页数时退回逐页抓取，无链接或少于 results_per_page_threshold 即结束。
+        断点续跑时第 1 页仍会抓取 (读取总页数)，但只产出预写日志游标之后的页。
+        """
+        res_thresh = CONFIG.get('performance', {}).get('results_per_page_threshold', 10)
+        start_page = self.resume_page()
+        s_url = self.build_page_url(input_url, 1)
+        logger.info(f"{prefix}正在抓取第1页: {s_url}")
+        html_text, links, cards = self.load_search_page(s_url)
+        if not links:
+            logger.info(f"第 1 页无房源链接或已达末页, 结束对 {input_url} 搜索."); return
+        total_pages = self.parse_total_pages(html_text, len(links))
+        del html_text
+        if start_page > 1:
+            logger.info(f"{prefix}断点续跑: 前 {start_page - 1} 页已完成，从第 {start_page} 页继续")
+        else:
+            yield 1, links, cards
+        first = max(2, start_page)
+
+        if total_pages is not None:
+            logger.info(f"{prefix}共 {total_pages} 页搜索结果，剩余 {max(0, total_pages - first + 1)} 页一次性调度")
+            if total_pages < first: return
+            lane = self.request_manager.politeness.lane_binding()
+            pool = ThreadPoolExecutor(max_workers=min(self.max_workers, total_pages - first + 1), thread_name_prefix='search',
+                                      initializer=self.request_manager.politeness.bind_lane, initargs=lane)
+            try:
+                futures = [(page, pool.submit(self.load_search_page, self.build_page_url(input_url, page)))
+                           for page in range(first, total_pages + 1)]
+                for page, future in futures:
+                    _, links, cards = future.result()
+                    if not links:
+                        logger.info(f"第 {page} 页无房源链接, 结束对 {input_url} 搜索."); return
+                    yield page, links, cards
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+            return
+
+        if len(links) < res_thresh:
+            logger.info(f"当前页房源数 ({len(links)}) < 阈值 ({res_thresh})，判断为最后一页."); return
+        page = first
+        while True:
+            s_url = self.build_page_url(input_url, page)
+            logger.info(f"{prefix}正在抓取第{page}页: {s_url}")
+            _, links, cards = self.load_search_page(s_url)
+            if not links:
+                logger.info(f"第 {page} 页无房源链接或已达末页, 结束对 {input_url} 搜索."); return
+            yield page, links, cards
+            if len(links) < res_thresh:
+                logger.info(f"当前页房源数 ({len(links)}) < 阈值 ({res_thresh})，判断为最后一页."); return
+            page += 1
+
     def search(self, input_url: str, using_temp_urls: bool) -> int:
-        page = 1
+        if self.engine == 'asyncio':
+            from async_engine import AsyncCrawlEngine
+            return AsyncCrawlEngine(self, CONFIG).search(input_url, using_temp_urls)
+        if self.engine == 'pipeline':
+            from pipeline import PipelineEngine
+            return PipelineEngine(self, CONFIG).search(input_url, using_temp_urls)
+
         total_links_processed = 0
         progress_file_name = "progress_temp.json" if using_temp_urls else "progress.json"
-        
-        res_thresh = CONFIG.get('performance', {}).get('results_per_page_threshold', 10)
-        delay_min = CONFIG.get('performance', {}).get('delay_min', 0.8)
-        delay_max = CONFIG.get('performance', {}).get('delay_max', 2.2)
-        page_delay_min = CONFIG.get('performance', {}).get('page_delay_min',2.0)
-        page_delay_max = CONFIG.get('performance', {}).get('page_delay_max',3.5)
 
-        while True:
-            # 修正 3: 正确地构造分页 URL
-            if '?' in input_url:
-                s_url = f"{input_url}&page={page}"
-            else:
-                if not input_url.endswith('/'):
-                    input_url += '/'
-                s_url = f"{input_url}?page={page}"
-
-            logger.info(f"正在抓取第{page}页: {s_url}")
-            links = self.process_search_page(s_url)
-            if not links: 
-                logger.info(f"第 {page} 页无房源链接或已达末页, 结束对 {input_url} 搜索.")
-                break
-            
-            logger.info(f"第{page}页找到{len(links)}个房源"); succ_count = 0
-            total_links_processed += len(links)
-            for i_idx, detail_url in enumerate(links):
-                try:
-                    logger.info(f"处理第{i_idx+1}/{len(links)}个房源: {detail_url}")
-                    if self.crawl_detail(detail_url): succ_count += 1
-                    time.sleep(random.uniform(delay_min, delay_max))
-                except Exception as e: logger.error(f"处理房源 {detail_url} 失败: {e}", exc_info=True); time.sleep(5.0)
-            
-            logger.info(f"本页成功处理{succ_count}/{len(links)}个房源")
-            
-            if not using_temp_urls:
-                self.save_progress(input_url, page + 1, progress_file_name)
+        # 每次搜索使用一个有界线程池 (performance.max_workers)，页与页之间复用
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='detail',
+                                  initializer=self.request_manager.politeness.bind_lane,
+                                  initargs=self.request_manager.politeness.lane_binding()) if self.max_workers > 1 else None
+        try:
+            for page, links, cards in self.iter_search_pages(input_url):
+                logger.info(f"第{page}页找到{len(links)}个房源")
+                total_links_processed += len(links)
+                succ_count = sum(1 for r in self.crawl_details(links, pool, cards) if r)
+                
+                logger.info(f"本页成功处理{succ_count}/{len(links)}个房源")
+                self.checkpoint_page(page)
+                
+                if not using_temp_urls:
+                    self.save_progress(input_url, page + 1, progress_file_name)
 
-            if page % 5 == 0: gc.collect(); logger.info("执行内存回收")
-            
-            if len(links) < res_thresh : 
-                logger.info(f"当前页房源数 ({len(links)}) < 阈值 ({res_thresh})，判断为最后一页.")
-                break
-            
-            logger.info(f"完成第{page}页处理"); page += 1
-            time.sleep(random.uniform(page_delay_min, page_delay_max))
+                if page % 5 == 0: gc.collect(); logger.info("执行内存回收")
+                logger.info(f"完成第{page}页处理")
+        finally:
+            if pool: pool.shutdown(wait=True)
         
-        logger.info(f"搜索完成，总共找到 {len(links)} 个房源链接")
+        logger.info(f"搜索完成，总共找到 {total_links_processed} 个房源链接")
         return total_links_processed
     
+    def process_url(self, i_url: int, url: str, n_urls: int, using_temp_urls: bool,
+                    per_url_output: bool, per_url_format: str) -> Optional[str]:
+        """抓取单个搜索 URL，返回其单 URL 输出文件 (如有)。本线程及其工作线程的请求和记录都归属于该 URL"""
+        lane = f"url{i_url}"
+        weights = CONFIG.get('performance', {}).get('url_weights') or {}
+        self.request_manager.politeness.bind_lane(lane, float(weights.get(url, 1.0)))
+        region_name = extract_region_from_url(url)
+        try:
+            if per_url_output:
+                self.batch_writer.open(lane, region_name, output_format=per_url_format)
+            if self.journal is not None and CONFIG['features']['enable_batch_write']:
+                # 断点续跑: 上次运行已完成的房源从预写日志重建到输出，不再请求
+                for _link, record_json in self.journal.replay(lane):
+                    self.batch_writer.add(PropertyData.from_json(record_json), lane)
+            try:
+                if self.journal is not None and self.journal.is_done(lane):
+                    logger.info(f"URL ({i_url}/{n_urls}) 在上次运行中已处理完毕，输出从预写日志重建: {url}")
+                else:
+                    logger.info(f"开始处理 ({i_url}/{n_urls}): {url}")
+                    self.search(url, using_temp_urls)
+                    if self.journal is not None: self.journal.record_done(lane)
+            except Exception as e:
+                logger.error(f"处理URL {url} 严重错误，跳过.", exc_info=True)
+
+            url_rows = self.batch_writer.rows(lane)
+            if per_url_output:
+                logger.info(f"完成处理URL: {url}，开始保存数据 (区域: {region_name}, 房源数: {url_rows})")
+            # 同时把该 URL 未满一批的记录写入合并文件
+            return self.batch_writer.close(lane, total_count=url_rows)
+        finally:
+            self.request_manager.politeness.bind_lane(None)
+
+    def merge_url_results(self, records: Iterator[str], i_url: int, url: str, n_urls: int, using_temp_urls: bool,
+                          per_url_output: bool, per_url_format: str) -> Optional[str]:
+        """多节点模式: 把共享队列中该 URL 的记录 (JSON) 按发现顺序写入常规输出，返回单 URL 输出文件 (如有)"""
+        lane = f"url{i_url}"
+        region_name = extract_region_from_url(url)
+        if per_url_output:
+            self.batch_writer.open(lane, region_name, output_format=per_url_format)
+        if CONFIG['features']['enable_batch_write']:
+            for record_json in records:
+                self.batch_writer.add(PropertyData.from_json(record_json), lane)
+        url_rows = self.batch_writer.rows(lane)
+        logger.info(f"合并URL ({i_url}/{n_urls}) 的队列结果: {url} (区域: {region_name}, 房源数: {url_rows})")
+        return self.batch_writer.close(lane, total_count=url_rows)
+
+    def run_distributed(self, urls: List[str], tasks: List[Tuple[Any, ...]]) -> List[Optional[str]]:
+        """多节点模式: 经共享租约队列抓取 (本机 worker 进程与其他节点共同处理)，完成后合并输出"""
+        from distributed import DistributedEngine
+        queue_path = distributed_queue_path()
+        spawn_cmd = [sys.executable, str(Path(__file__).resolve()), '--worker', '--queue', str(queue_path)]
+        if self.profiler is not None: spawn_cmd.append('--profile')  # 本机 worker 进程各自写出剖析文件
+        engine = DistributedEngine(self, CONFIG, queue_path, spawn_cmd=spawn_cmd)
+        engine.crawl(urls)
+        url_outputs = [self.merge_url_results(engine.results(task[0]), *task) for task in tasks]
+        engine.finish()
+        return url_outputs
+
+    def start_profiler(self, label: str) -> None:
+        """profiling.enabled 时开启 CPU/内存剖析 (未开启时不导入剖析模块，也不安装任何钩子)"""
+        if not (CONFIG.get('profiling', {}) or {}).get('enabled', False): return
+        from profiler import RunProfiler
+        self.profiler = RunProfiler.from_config(CONFIG, OUTPUT_DIR, label).start()
+
+    def stop_profiler(self) -> None:
+        if self.profiler is None: return
+        try: self.profiler.stop()
+        except Exception as e: logger.error(f"写出性能剖析文件失败: {e}", exc_info=True)
+        self.profiler = None
+
     def run(self) -> List[str]:
         output_files = []
-        all_properties_buffer = []
         output_mode = CONFIG.get('output', {}).get('mode', 'per_url')
         combined_prefix = CONFIG.get('output', {}).get('single_file_prefix', 'Combined')
+        per_url_format = CONFIG.get('output', {}).get('per_url_format', 'xlsx')
+        combined_format = CONFIG.get('output', {}).get('combined_format', 'csv')
 
+        metrics_server: Optional[MetricsServer] = None
         try:
             logger.info("开始运行房源信息采集程序 (v2)...")
+            metrics_cfg = CONFIG.get('metrics', {}) or {}
+            if int(metrics_cfg.get('port', 0) or 0) > 0:
+                try:
+                    metrics_server = MetricsServer(METRICS, metrics_cfg.get('host', '127.0.0.1'), int(metrics_cfg['port'])).start()
+                    logger.info(f"运行指标端点: {metrics_server.url} (JSON: {metrics_server.url}.json)")
+                except OSError as e: logger.error(f"启动运行指标端点失败: {e}")
+            self.start_profiler('run')
             
             temp_url_file = CONFIG_DIR / 'temp_urls.txt'
             default_url_file = CONFIG_DIR / 'url.txt'
@@ -881,44 +2005,56 @@ class DomainCrawler:
             if not urls: logger.error(f"配置文件 {url_cfg_path} 中无有效URL."); return []
             
             logger.info(f"找到{len(urls)}个URL待处理 (来源: {'temp_urls.txt' if using_temp_urls else 'url.txt'}): {urls}")
-            inter_url_delay_min = CONFIG['performance'].get('inter_url_delay_min', 3.0)
-            inter_url_delay_max = CONFIG['performance'].get('inter_url_delay_max', 7.0)
 
-            for i_url, url in enumerate(urls, 1):
-                try:
-                    logger.info(f"开始处理 ({i_url}/{len(urls)}): {url}")
-                    total_count = self.search(url, using_temp_urls)
-                    
-                    region_name = extract_region_from_url(url)
-                    logger.info(f"完成处理URL: {url}，开始保存数据 (区域: {region_name}, 房源数: {len(self.batch_writer.buffer)})")
-                    
-                    if CONFIG['features']['enable_batch_write']:
-                        if output_mode in ['single_file', 'hybrid']:
-                            all_properties_buffer.extend(self.batch_writer.buffer)
-                        
-                        if output_mode in ['per_url', 'hybrid']:
-                            output_file = self.batch_writer.flush(region=region_name, total_count=len(self.batch_writer.buffer))
-                            if output_file:
-                                output_files.append(output_file)
-                        
-                        elif output_mode == 'single_file':
-                            self.batch_writer.buffer = []
-                    
-                    if i_url < len(urls):
-                        inter_url_delay = random.uniform(inter_url_delay_min, inter_url_delay_max)
-                        logger.info(f"下一个URL前延迟 {inter_url_delay:.1f} 秒...")
-                        time.sleep(inter_url_delay)
-                except Exception as e: 
-                    logger.error(f"处理URL {url} 严重错误，跳过.", exc_info=True)
-
-            if CONFIG['features']['enable_batch_write'] and output_mode in ['single_file', 'hybrid'] and all_properties_buffer:
+            # 预写日志: 上次运行中途退出且URL列表相同时断点续跑
+            journal_cfg = CONFIG.get('journal', {}) or {}
+            distributed = (CONFIG.get('distributed', {}) or {}).get('enabled', False)
+            if journal_cfg.get('enabled', True) and not distributed:  # 多节点模式由共享队列保存进度
+                self.journal = CrawlJournal(OUTPUT_DIR / journal_cfg.get('file', 'crawl_journal.jsonl'), fsync=journal_cfg.get('fsync', 'page'))
+                if self.journal.begin(urls):
+                    logger.info("输出文件将从预写日志重建，上次运行遗留的 .part 临时文件可删除")
+                    if self.seen is not None:
+                        for link in list(self.journal.links): self.seen.confirm(listing_key(link))
+
+            # 输出流: 合并文件贯穿所有 URL，单 URL 文件在该 URL 开始处理时打开；数据每满 batch_size 条即追加写出
+            batch_write = CONFIG['features']['enable_batch_write']
+            if batch_write and output_mode in ['single_file', 'hybrid']:
+                self.batch_writer.open('combined', combined_prefix, output_format=combined_format, shared=True)
+
+            # 多个 URL 可并发处理 (performance.url_concurrency)，所有 URL 共享同一礼貌预算，按权重公平轮转
+            url_concurrency = min(len(urls), max(1, int(CONFIG.get('performance', {}).get('url_concurrency', 1) or 1)))
+            per_url_output = batch_write and output_mode in ['per_url', 'hybrid']
+            tasks = [(i_url, url, len(urls), using_temp_urls, per_url_output, per_url_format) for i_url, url in enumerate(urls, 1)]
+            if distributed:
+                url_outputs = self.run_distributed(urls, tasks)
+            elif url_concurrency > 1:
+                logger.info(f"同时处理 {url_concurrency} 个URL (共享请求速率，按权重轮转)")
+                with ThreadPoolExecutor(max_workers=url_concurrency, thread_name_prefix='url') as url_pool:
+                    url_outputs = list(url_pool.map(lambda task: self.process_url(*task), tasks))
+            else:
+                url_outputs = [self.process_url(*task) for task in tasks]
+            output_files.extend(f for f in url_outputs if f)
+
+            if batch_write and output_mode in ['single_file', 'hybrid']:
                 logger.info(f"开始保存所有URL的合并数据...")
-                self.batch_writer.buffer = all_properties_buffer
-                combined_file = self.batch_writer.flush(region=combined_prefix, total_count=len(all_properties_buffer), output_format='csv')
+                combined_file = self.batch_writer.close('combined')
                 if combined_file:
                     output_files.append(combined_file)
 
             unique_files = list(set(output_files))
+            logger.info(f"请求速率统计: {self.request_manager.politeness.summary()}")
+            logger.info(f"重试统计: {self.request_manager.retry_policy.summary()}; 熔断统计: {self.request_manager.circuit_breaker.summary()}")
+            if self.request_manager.cache: logger.info(f"HTTP缓存统计: {self.request_manager.cache.summary()}")
+            if self.request_manager.archive: logger.info(f"页面归档统计: {self.request_manager.archive.summary()}")
+            if self.listing_index is not None: logger.info(f"增量索引统计: {self.listing_index.summary()}")
+            if self.seen is not None:
+                self.seen.save()
+                logger.info(f"跨URL去重统计: {self.seen.summary()}")
+            if self.journal is not None:
+                logger.info(f"预写日志统计: {self.journal.summary()}")
+                self.journal.compact()
+            logger.info(f"页面解析统计: {self.parse_stats.summary()}")
+            logger.info(f"各阶段耗时: {METRICS.summary()}")
             logger.info(f"所有URL处理完毕，共生成 {len(unique_files)} 个输出文件")
             for output_file in unique_files:
                 logger.info(f"生成的文件: {output_file}")
@@ -931,18 +2067,39 @@ class DomainCrawler:
             if CONFIG['features']['enable_batch_write']:
                 logger.info("尝试在程序异常退出前保存已收集的数据...")
                 try:
-                    output_csv_path_on_exc = self.batch_writer.flush(region="Error_Recovery", total_count=0)
-                    if output_csv_path_on_exc:
-                        output_files.append(output_csv_path_on_exc)
+                    for key in list(self.batch_writer.streams):
+                        output_path_on_exc = self.batch_writer.close(key, region=None if key in self.batch_writer.shared else "Error_Recovery")
+                        if output_path_on_exc:
+                            output_files.append(output_path_on_exc)
                 except Exception as save_exc:
                     logger.error(f"异常处理中保存数据失败: {save_exc}")
+            if self.journal is not None:
+                self.journal.close(); logger.info(f"预写日志已保留，重新运行将从断点继续: {self.journal.path}")
             return list(set(output_files))
         finally:
+            self.stop_profiler()
+            if metrics_server is not None: metrics_server.stop()
             logger.info("房源信息采集程序 (v2) 结束。")
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="房源信息采集程序 (v2)")
+    arg_parser.add_argument('--worker', action='store_true', help="多节点模式的 worker: 从共享队列领取任务，队列完成后退出")
+    arg_parser.add_argument('--worker-id', help="worker 标识 (默认 主机名-进程号)")
+    arg_parser.add_argument('--queue', help="共享队列文件 (默认 distributed.queue_file)")
+    arg_parser.add_argument('--profile', action='store_true', help="本次运行开启性能剖析 (等同 profiling.enabled: true)")
+    args, _ = arg_parser.parse_known_args()
+    if args.profile: CONFIG['profiling'] = {**(CONFIG.get('profiling', {}) or {}), 'enabled': True}
     crawler = DomainCrawler()
+    if args.worker:
+        from distributed import QueueWorker
+        from work_queue import WorkQueue
+        queue = WorkQueue(Path(args.queue) if args.queue else distributed_queue_path(),
+                          max_attempts=int((CONFIG.get('distributed', {}) or {}).get('max_attempts', 3)))
+        crawler.start_profiler('worker')
+        try: QueueWorker(crawler, CONFIG, queue, args.worker_id).run()
+        finally: crawler.stop_profiler()
+        sys.exit(0)
     output_files = crawler.run()
     if output_files:
         print(f"生成了 {len(output_files)} 个输出文件:")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多节点共享的租约式任务队列 (distributed.enabled)
+- SQLite 文件 (WAL 模式)，同一台机器或共享存储上的多个 worker 进程共用；领取任务使用 BEGIN IMMEDIATE 保证原子性
+- 任务分两类: 'search' (搜索 URL 的某一页) 与 'detail' (详情页)；同一去重键只入队一次。详情页的键由 worker 决定:
+  启用 dedupe 时为房源键 (重叠的搜索 URL 之间去重)，关闭时加上 URL 序号 (各 URL 分别抓取)
+- worker 领取任务时获得 lease_seconds 的租约，并由心跳线程定期续约；进程崩溃或失联后租约过期，
+  任务被下一次领取操作重新放回队列 (超过 max_attempts 次则标记为失败)
+- 完成任务时校验租约仍属于自己，过期后被他人重新领取的任务不会被重复提交
+- 详情页结果 (PropertyData JSON) 保存在队列中，由协调进程按 URL、页码、页内顺序合并到输出
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+logger = logging.getLogger('domain_crawler_v2')
+
+
+@dataclass
+class QueueTask:
+    id: int
+    kind: str
+    url: str
+    lane: int
+    page: int
+    seq: int
+    chain: bool
+    attempts: int
+
+
+class WorkQueue:
+    def __init__(self, path: Path, max_attempts: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, key TEXT NOT NULL, url TEXT NOT NULL,
+            lane INTEGER, page INTEGER, seq INTEGER, chain INTEGER DEFAULT 0,
+            state TEXT NOT NULL DEFAULT 'pending', owner TEXT, lease_until REAL, attempts INTEGER DEFAULT 0,
+            result TEXT, updated REAL, UNIQUE(kind, key))""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks(state, lease_until)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_lane ON tasks(kind, lane, page, seq)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _write(self, fn):
+        """在一个 IMMEDIATE 事务内执行 fn(conn) (跨进程互斥)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK"); raise
+
+    # --- 运行元数据 ---
+    def _meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def state(self) -> Optional[str]:
+        """'running' - 已有运行在进行；'completed' - 上次运行已合并输出；None - 从未使用"""
+        return self._meta('state')
+
+    def rate_share(self) -> int:
+        """共同抓取的进程总数 (协调进程开始运行时写入)，每个进程的请求速率为配置值的 1/该值"""
+        return max(1, int(self._meta('rate_share') or 1))
+
+    def begin(self, urls: Sequence[str], rate_share: int = 1) -> bool:
+        """
+        协调进程开始一次运行: 上次运行未完成且 URL 列表相同时保留队列继续 (返回 True)，
+        否则清空队列并为每个 URL 放入第 1 页搜索任务
+        """
+        urls_json = json.dumps(list(urls), ensure_ascii=False)
+        def begin_tx(conn: sqlite3.Connection) -> bool:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rate_share', ?)", (str(max(1, int(rate_share))),))
+            row = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            if row.get('state') == 'running' and row.get('urls') == urls_json: return True
+            conn.execute("DELETE FROM tasks")
+            conn.executemany("INSERT INTO tasks (kind, key, url, lane, page, seq, chain, updated) VALUES ('search',?,?,?,1,0,0,?)",
+                             [(f"{lane}:1", url, lane, time.time()) for lane, url in enumerate(urls, 1)])
+            conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?,?)", [('urls', urls_json), ('state', 'running')])
+            return False
+        return self._write(begin_tx)
+
+    def finish(self) -> None:
+        self._write(lambda conn: conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('state', 'completed')"))
+
+    # --- 入队 / 领取 / 续约 / 完成 ---
+    def add_search(self, url: str, lane: int, page: int, chain: bool = False) -> None:
+        self.add_many('search', [(f"{lane}:{page}", url, lane, page, 0, chain)])
+
+    def add_many(self, kind: str, rows: Iterable[Tuple[str, str, int, int, int, bool]]) -> int:
+        """rows: (去重键, url, lane, page, seq, chain)；已存在的键被忽略，返回新入队数"""
+        now = time.time()
+        return self._write(lambda conn: conn.executemany(
+            "INSERT OR IGNORE INTO tasks (kind, key, url, lane, page, seq, chain, updated) VALUES (?,?,?,?,?,?,?,?)",
+            [(kind, key, url, lane, page, seq, int(chain), now) for key, url, lane, page, seq, chain in rows]).rowcount)
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute("SELECT id, owner, attempts FROM tasks WHERE state='leased' AND lease_until < ?", (now,)).fetchall()
+        for task_id, owner, attempts in expired:
+            state = 'failed' if attempts >= self.max_attempts else 'pending'
+            conn.execute("UPDATE tasks SET state=?, owner=NULL, updated=? WHERE id=?", (state, now, task_id))
+        if expired: logger.warning(f"{len(expired)} 个任务租约过期 (worker 崩溃或失联)，已重新入队: 原持有者 {sorted({o for _, o, _ in expired})}")
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional[QueueTask]:
+        """领取一个待处理任务 (详情页优先，使在途详情页数量有界)；没有时返回 None"""
+        def claim_tx(conn: sqlite3.Connection) -> Optional[QueueTask]:
+            now = time.time()
+            self._requeue_expired(conn, now)
+            row = conn.execute("SELECT id, kind, url, lane, page, seq, chain, attempts FROM tasks WHERE state='pending' "
+                               "ORDER BY kind='search', id LIMIT 1").fetchone()
+            if row is None: return None
+            conn.execute("UPDATE tasks SET state='leased', owner=?, lease_until=?, attempts=attempts+1, updated=? WHERE id=?",
+                         (worker, now + lease_seconds, now, row[0]))
+            task_id, kind, url, lane, page, seq, chain, attempts = row
+            return QueueTask(task_id, kind, url, lane, page, seq, bool(chain), attempts + 1)
+        return self._write(claim_tx)
+
+    def heartbeat(self, worker: str, lease_seconds: float) -> int:
+        """续约该 worker 持有的所有任务，返回续约数"""
+        return self._write(lambda conn: conn.execute(
+            "UPDATE tasks SET lease_until=? WHERE owner=? AND state='leased'", (time.time() + lease_seconds, worker)).rowcount)
+
+    def complete(self, task: QueueTask, worker: str, result: Optional[str] = None) -> bool:
+        """提交结果；租约已过期并被重新领取时返回 False (结果丢弃)"""
+        return self._write(lambda conn: conn.execute(
+            "UPDATE tasks SET state='done', owner=NULL, result=?, updated=? WHERE id=? AND owner=? AND state='leased'",
+            (result, time.time(), task.id, worker)).rowcount) == 1
+
+    def fail(self, task: QueueTask, worker: str) -> None:
+        """处理失败: 未超过 max_attempts 时放回队列，否则标记为失败"""
+        state = 'failed' if task.attempts >= self.max_attempts else 'pending'
+        self._write(lambda conn: conn.execute(
+            "UPDATE tasks SET state=?, owner=NULL, updated=? WHERE id=? AND owner=? AND state='leased'",
+            (state, time.time(), task.id, worker)))
+
+    # --- 查询 ---
+    def drained(self) -> bool:
+        """没有待处理和处理中的任务 (处理中的任务可能再产生新任务，因此两者都为 0 才算完成)"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tasks WHERE state IN ('pending', 'leased')").fetchone()[0] == 0
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, state, COUNT(*) FROM tasks GROUP BY kind, state").fetchall()
+        return {f"{kind}.{state}": n for kind, state, n in rows}
+
+    def results(self, lane: int) -> Iterator[str]:
+        """按页码和页内顺序产出该 URL 已完成详情页的记录 JSON"""
+        with self._lock:
+            rows = self._conn.execute("SELECT result FROM tasks WHERE kind='detail' AND lane=? AND state='done' "
+                                      "AND result IS NOT NULL ORDER BY page, seq, id", (lane,)).fetchall()
+        for (result,) in rows: yield result
+
+    def close(self) -> None:
+        with self._lock: self._conn.close()
+
+    def summary(self) -> str:
+        c = self.counts()
+        parts = [f"{kind}: " + ', '.join(f"{state} {c[f'{kind}.{state}']}" for state in ('done', 'failed', 'pending', 'leased')
+                                          if f"{kind}.{state}" in c) for kind in ('search', 'detail')]
+        return '; '.join(parts)